@@ -0,0 +1,199 @@
+import math
+import os
+
+import numpy as np
+
+from Batch import run_batch
+
+# Steganalysis of LSB embedding in images and audio. Three attacks are run over the carrier values:
+#   chi-square (Westfeld and Pfitzmann): LSB replacement evens out the counts of each value pair
+#     2k, 2k+1; the probability of embedding is the chi-square tail over the pairs. It is evaluated
+#     on growing prefixes of the carrier, so the extent of a sequential message shows. Runs of
+#     sparse pairs, as most of them are in 16-bit carriers, are pooled into one category. A
+#     histogram that is flat anyway, as in noise, looks embedded.
+#   RS analysis (Fridrich, Goljan and Du) and sample pair analysis (Dumitrescu, Wu and Wang):
+#     estimate the fraction of carrier values holding message bits from how LSB flips change
+#     the relation of neighbouring values, so they also see messages spread over the carrier.
+#     Both need neighbours close in value; carriers with too few, such as loud audio or noise,
+#     get no estimate.
+# Every statistic is a sum of counts, gathered a block at a time with NumPy, so a carrier of any
+# size is analysed in one streaming pass.
+SEGMENTS = 64  # the chi-square attack is evaluated on the first 1, 2, ... SEGMENTS parts of the carrier
+MIN_EXPECTED = 5  # expected values of a chi-square category; sparser value pairs are pooled
+MIN_CLOSE_PAIRS = 0.1  # share of neighbours at most one value pair apart that RS and SPA need
+# Scores over which a carrier is reported as suspicious
+CHI_SQUARE_THRESHOLD = 0.95
+CHI_SQUARE_EXTENT = 0.1
+RATE_THRESHOLD = 0.1
+# Smooth clean histograms can pass the chi-square test over a sizeable prefix, so where RS or SPA
+# give an estimate one of them has to see at least this rate too
+CHI_SQUARE_SUPPORT = 0.03
+
+
+def chi_square_tail(statistic, freedom):
+    """Return P(X >= statistic) for a chi-square distribution, by the Wilson-Hilferty approximation."""
+    if freedom < 1:
+        return 0.0
+    spread = 2 / (9 * freedom)
+    z = ((statistic / freedom) ** (1 / 3) - (1 - spread)) / math.sqrt(spread)
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def _pair_equality(counts):
+    """Return the chi-square probability that the value pairs 2k, 2k+1 of a histogram have equal counts."""
+    even, expected = counts[0::2], (counts[0::2] + counts[1::2]) / 2
+    # Consecutive pairs are pooled until they expect MIN_EXPECTED values; a dense pair stays alone
+    categories = ((np.cumsum(expected) - expected) // MIN_EXPECTED).astype(np.int64)
+    even, expected = np.bincount(categories, even), np.bincount(categories, expected)
+    used = expected >= MIN_EXPECTED
+    statistic = float(((even[used] - expected[used]) ** 2 / expected[used]).sum())
+    return chi_square_tail(statistic, int(used.sum()) - 1)
+
+
+def _smaller_root(a, b, c):
+    """Return the root of a x^2 + b x + c closest to zero, or 0 if there is none."""
+    if a == 0:
+        return -c / b if b else 0.0
+    discriminant = b * b - 4 * a * c
+    if discriminant < 0:
+        return -b / (2 * a)  # the vertex, as the nearest real estimate
+    roots = ((-b + math.sqrt(discriminant)) / (2 * a), (-b - math.sqrt(discriminant)) / (2 * a))
+    return min(roots, key=abs)
+
+
+class CarrierStatistics:
+    """Counts of the three attacks, gathered from the blocks of one carrier."""
+
+    def __init__(self, size, bits):
+        self.bins = 1 << bits
+        self.dtype = np.int16 if bits <= 8 else np.int32  # signed room for the differences of neighbours
+        self.segment = max(-(-size // SEGMENTS), 1)
+        self.histograms = np.zeros((SEGMENTS, self.bins), dtype=np.int64)
+        self.position = 0
+        # R and S counts of groups of 4 for the masks M and -M (flipping the middle two values), on the
+        # values and on the values with every LSB flipped
+        self.rs = np.zeros((2, 2, 2), dtype=np.int64)
+        self.groups = 0
+        self.pairs = np.zeros(4, dtype=np.int64)  # X, Y, Z and W of sample pair analysis
+        self.pair_count = 0
+        self.close_pairs = 0
+
+    def add(self, block):
+        """Add a block of carrier values shaped (lines, samples, channels), flat in embedding order.
+
+        Neighbours for RS and sample pair analysis are taken along the samples of each channel.
+        """
+        flat = block.reshape(-1)
+        start = 0
+        while start < len(flat):
+            index = min((self.position + start) // self.segment, SEGMENTS - 1)
+            stop = min((index + 1) * self.segment - self.position, len(flat))
+            self.histograms[index] += np.bincount(flat[start:stop], minlength=self.bins)
+            start = stop
+        self.position += len(flat)
+
+        lines = np.moveaxis(block, 2, 1).reshape(-1, block.shape[1]).astype(self.dtype)
+        self._add_rs(lines)
+        self._add_pairs(lines)
+
+    def _add_rs(self, lines):
+        groups = lines[:, :lines.shape[1] // 4 * 4].reshape(-1, 4)
+        self.groups += len(groups)
+        for flipped in (0, 1):
+            # Columns of the groups; the mask flips the middle two
+            first, second, third, fourth = (groups[:, column] ^ flipped for column in range(4))
+            variation = np.abs(second - first) + np.abs(third - second) + np.abs(fourth - third)
+            for negative, flip in enumerate((lambda x: x ^ 1, lambda x: ((x + 1) ^ 1) - 1)):
+                second_flipped, third_flipped = flip(second), flip(third)
+                difference = (np.abs(second_flipped - first) + np.abs(third_flipped - second_flipped)
+                              + np.abs(fourth - third_flipped) - variation)
+                self.rs[flipped, negative] += np.count_nonzero(difference > 0), np.count_nonzero(difference < 0)
+
+    def _add_pairs(self, lines):
+        u, v = lines[:, :-1], lines[:, 1:]
+        # Positive where v is even and u < v or v is odd and u > v (X), negative for the reverse (Y)
+        order = np.sign(v - u) * (1 - 2 * (v & 1))
+        halves = np.abs((v >> 1) - (u >> 1))
+        self.pairs += (np.count_nonzero(order > 0), np.count_nonzero(order < 0), np.count_nonzero(u == v),
+                       np.count_nonzero(halves == 0) - np.count_nonzero(u == v))
+        self.pair_count += u.size
+        self.close_pairs += np.count_nonzero(halves <= 1)
+
+    def chi_square(self):
+        """Return (probability of embedding at the start of the carrier, leading fraction of it that looks embedded)."""
+        prefixes = np.cumsum(self.histograms, axis=0)
+        probabilities = [_pair_equality(counts) for counts in prefixes]
+        # Sequential embedding starts at the first value, so the extent is the longest prefix that
+        # still looks embedded
+        embedded = np.flatnonzero(np.array(probabilities) >= 0.5)
+        parts = embedded[-1] + 1 if len(embedded) and probabilities[0] >= 0.5 else 0
+        return probabilities[0], min(float(parts * self.segment) / max(self.position, 1), 1.0)
+
+    def _conclusive(self):
+        """Return whether enough neighbours are close in value for RS and sample pair analysis."""
+        return self.pair_count and self.close_pairs >= MIN_CLOSE_PAIRS * self.pair_count
+
+    def rs_rate(self):
+        """Return the fraction of carrier values estimated to hold message bits by RS analysis, or None."""
+        if not self._conclusive() or not self.groups:
+            return None
+        rs = self.rs / self.groups
+        d0, d1 = rs[0, 0, 0] - rs[0, 0, 1], rs[1, 0, 0] - rs[1, 0, 1]
+        n0, n1 = rs[0, 1, 0] - rs[0, 1, 1], rs[1, 1, 0] - rs[1, 1, 1]
+        if d0 <= 0:
+            return 1.0  # R_M no longer exceeds S_M: every LSB is random
+        a, b, c = 2 * (d1 + d0), n0 - n1 - d1 - 3 * d0, d0 - n0
+        if b * b < 4 * a * c and b:
+            # Near full embedding a is lost in the noise, so the quadratic has no real root; the
+            # estimate is in its linear part
+            z = -c / b
+        else:
+            z = _smaller_root(a, b, c)
+        return min(max(float(z / (z - 0.5)), 0.0), 1.0) if z != 0.5 else 1.0
+
+    def pair_rate(self):
+        """Return the fraction of carrier values estimated to hold message bits by sample pair analysis, or None."""
+        if not self._conclusive():
+            return None
+        x, y, z, w = self.pairs / self.pair_count
+        return min(max(float(_smaller_root((w + z) / 2, 2 * x - 1, y - x)), 0.0), 1.0)
+
+    def scores(self):
+        """Return the scores of the carrier as a dict."""
+        probability, extent = self.chi_square()
+        scores = {"chi_square": probability, "chi_square_extent": extent, "rs": self.rs_rate(),
+                  "spa": self.pair_rate()}
+        rates = [rate for rate in (scores["rs"], scores["spa"]) if rate is not None]
+        chi_square = (probability >= CHI_SQUARE_THRESHOLD and extent >= CHI_SQUARE_EXTENT
+                      and (not rates or max(rates) >= CHI_SQUARE_SUPPORT))
+        scores["suspicious"] = chi_square or any(rate >= RATE_THRESHOLD for rate in rates)
+        return scores
+
+
+def analyze_values(size, bits, blocks):
+    """Return the scores of a carrier of size values of the given bits from its blocks."""
+    statistics = CarrierStatistics(size, bits)
+    for block in blocks:
+        statistics.add(block)
+    return statistics.scores()
+
+
+def analyze_file(path):
+    """Return the steganalysis scores of an image or 8/16-bit PCM WAV file.
+
+    chi_square is the probability of LSB embedding at the start of the carrier, chi_square_extent
+    the leading fraction of the carrier that looks embedded; rs and spa estimate the fraction of
+    carrier values holding message bits, or are None where the carrier gives them too little to go on.
+    """
+    if os.path.splitext(path)[1].lower() == ".wav":
+        from Aud import sample_blocks
+
+        return analyze_values(*sample_blocks(path))
+    from Img import carrier_bands
+
+    return analyze_values(*carrier_bands(path))
+
+
+def scan_files(paths, workers=None, ordered=True):
+    """Analyse files on a process pool and yield a BatchResult per file, its value the scores."""
+    return run_batch(analyze_file, ((path,) for path in paths), workers=workers, ordered=ordered)
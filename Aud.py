@@ -1,170 +1,236 @@
-import wave
-import numpy as np
-import tkinter as tk
-from tkinter import filedialog, messagebox
-
-END_MARKER = "#####END#####"  # Marker to indicate the end of the hidden message
-
-
-def lsb_hide_audio(wav_path, txt_path, output_path):
-    """Hide a message from a .txt file into a WAV file using LSB."""
-    # Read the text message from the txt file
-    with open(txt_path, 'r') as file:
-        message = file.read().strip()
-
-    message += END_MARKER
-    binary_message = ''.join(format(ord(char), '08b') for char in message)
-
-    try:
-        # Open the WAV file
-        with wave.open(wav_path, 'rb') as wav:
-            params = wav.getparams()
-            print("WAV Params:", params)  # Debugging output
-            frames = wav.readframes(params.nframes)
-
-            # Check if the WAV file has a compatible format (16-bit PCM)
-            if params.sampwidth != 2:  # sampwidth 2 means 16-bit PCM audio
-                raise ValueError("Unsupported sample width. This program works only with 16-bit PCM WAV files.")
-
-            audio_data = np.frombuffer(frames, dtype=np.int16)
-
-    except Exception as e:
-        messagebox.showerror("Error", f"Error reading WAV file: {e}")
-        print(f"Error reading WAV file: {e}")  # Debugging output
-        return
+import os
+import struct
 
-    if len(binary_message) > len(audio_data):
-        raise ValueError("Message too large to hide in this audio file.")
+import numpy as np
 
-    # Embed the message in the LSB
-    binary_message_index = 0
-    for i in range(len(audio_data)):
-        if binary_message_index < len(binary_message):
-            # Modify the least significant bit
-            audio_data[i] = (audio_data[i] & 0xFFFE) | int(binary_message[binary_message_index])
-            binary_message_index += 1
-
-    try:
-        # Write the modified audio data back to a new WAV file
-        with wave.open(output_path, 'wb') as output_wav:
-            output_wav.setparams(params)
-            output_wav.writeframes(audio_data.tobytes())
-        messagebox.showinfo("Success", f"Message hidden successfully in {output_path}")
-    except Exception as e:
-        messagebox.showerror("Error", f"Error writing WAV file: {e}")
-        print(f"Error writing WAV file: {e}")  # Debugging output
-        return
-
-
-def lsb_extract_audio(wav_path):
-    """Extract the hidden message from a WAV file using LSB."""
-    try:
-        with wave.open(wav_path, 'rb') as wav:
-            params = wav.getparams()
-            print("WAV Params (Extract):", params)  # Debugging output
-            frames = wav.readframes(params.nframes)
-            audio_data = np.frombuffer(frames, dtype=np.int16)
-
-    except Exception as e:
-        messagebox.showerror("Error", f"Error reading WAV file: {e}")
-        print(f"Error reading WAV file: {e}")  # Debugging output
-        return "Error reading file"
-
-    binary_message = ""
-    for sample in audio_data:
-        binary_message += str(sample & 1)  # Extract the LSB
-
-    hidden_message = ''.join(chr(int(binary_message[i:i + 8], 2)) for i in range(0, len(binary_message), 8))
-
-    end_index = hidden_message.find(END_MARKER)
-    if end_index != -1:
-        return hidden_message[:end_index]
-    return "No hidden message found!"
-
-
-# GUI Application
-class AudioSteganoApp:
-    def __init__(self, root):
-        self.root = root
-        self.root.title("Audio Steganography Tool")
-        self.root.configure(bg="black")
-        self.file_path = ""
-        self.message_file_path = ""
-
-        # Title
-        self.title_label = tk.Label(root, text="Audio Steganography Tool", fg="#00FF00", bg="black",
-                                    font=("Courier", 18, "bold"))
-        self.title_label.pack(pady=10)
-
-        # File Section
-        self.file_frame = tk.Frame(root, bg="black")
-        self.file_frame.pack(pady=5)
-
-        self.file_label = tk.Label(self.file_frame, text="Audio File (WAV):", fg="#00FF00", bg="black")
-        self.file_label.grid(row=0, column=0)
-        self.file_entry = tk.Entry(self.file_frame, width=40)
-        self.file_entry.grid(row=0, column=1)
-        self.file_button = tk.Button(self.file_frame, text="Browse", command=self.load_audio_file, fg="black",
-                                     bg="#00FF00")
-        self.file_button.grid(row=0, column=2)
-
-        # Message Section
-        self.message_frame = tk.Frame(root, bg="black")
-        self.message_frame.pack(pady=5)
-
-        self.message_label = tk.Label(self.message_frame, text="Select Text File for Hidden Message:", fg="#00FF00",
-                                      bg="black")
-        self.message_label.grid(row=0, column=0)
-        self.message_button = tk.Button(self.message_frame, text="Browse", command=self.load_message_file, fg="black",
-                                        bg="#00FF00")
-        self.message_button.grid(row=0, column=1)
-
-        # Buttons
-        self.encrypt_button = tk.Button(root, text="Hide Message", command=self.encrypt, fg="black", bg="#00FF00")
-        self.encrypt_button.pack(pady=5)
-        self.decrypt_button = tk.Button(root, text="Retrieve Message", command=self.decrypt, fg="black", bg="#00FF00")
-        self.decrypt_button.pack(pady=5)
-
-        # Result Section
-        self.result_label = tk.Label(root, text="", fg="#00FF00", bg="black", font=("Courier", 12, "bold"))
-        self.result_label.pack()
-
-    def load_audio_file(self):
-        self.file_path = filedialog.askopenfilename(filetypes=[("WAV files", "*.wav")])
-        if self.file_path:
-            self.file_entry.delete(0, tk.END)
-            self.file_entry.insert(0, self.file_path)
-
-    def load_message_file(self):
-        self.message_file_path = filedialog.askopenfilename(filetypes=[("Text files", "*.txt")])
-        if self.message_file_path:
-            messagebox.showinfo("File Selected", f"Message File: {self.message_file_path}")
-
-    def encrypt(self):
-        if not self.file_path:
-            messagebox.showerror("Error", "No audio file selected!")
+from Bits import CHUNK_SIZE, MAX_DEPTH, PlaneWriter, iter_chunks, pack_lsbs, values_needed
+from Cache import PLANES, cached_plane, decode_plane, keep_plane
+from Container import encode_payload, decode_payload
+from Progress import atomic_output, part, report, track
+from Spread import placer
+
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+# Sample formats that can carry a payload: (format tag, bytes per sample) -> description
+SAMPLE_FORMATS = {
+    (WAVE_FORMAT_PCM, 1): "8-bit unsigned PCM",
+    (WAVE_FORMAT_PCM, 2): "16-bit PCM",
+    (WAVE_FORMAT_PCM, 3): "24-bit PCM",
+    (WAVE_FORMAT_PCM, 4): "32-bit PCM",
+    (WAVE_FORMAT_IEEE_FLOAT, 4): "32-bit float",
+}
+SPREAD_MODES = ("interleaved", "per-channel")
+COPY_SIZE = 1 << 20  # Bytes copied at a time when a carrier is copied for embedding
+
+
+def _wav_layout(wav_path):
+    """Locate the fmt and data chunks of a RIFF/WAVE file without reading any samples."""
+    with open(wav_path, 'rb') as file:
+        header = file.read(12)
+        if len(header) < 12:
+            raise ValueError("Not a RIFF/WAVE file.")
+        riff, _, wave_id = struct.unpack("<4sI4s", header)
+        if riff != b"RIFF" or wave_id != b"WAVE":
+            raise ValueError("Not a RIFF/WAVE file.")
+
+        layout = {}
+        while "format" not in layout or "offset" not in layout:
+            head = file.read(8)
+            if len(head) < 8:
+                raise ValueError("WAV file has no fmt or data chunk.")
+            chunk_id, size = struct.unpack("<4sI", head)
+            if chunk_id == b"fmt ":
+                fmt = file.read(size)
+                if size < 16 or len(fmt) < size:
+                    raise ValueError("WAV file has a truncated fmt chunk.")
+                format_tag, channels, rate, _, block_align, _ = struct.unpack("<HHIIHH", fmt[:16])
+                if channels == 0 or block_align < channels:
+                    raise ValueError("WAV file has no channels or an invalid block size.")
+                if format_tag == WAVE_FORMAT_EXTENSIBLE and size >= 26:
+                    format_tag = struct.unpack("<H", fmt[24:26])[0]  # first field of the sub-format GUID
+                layout.update(format=format_tag, channels=channels, rate=rate,
+                              sampwidth=block_align // channels)
+                file.seek(size % 2, os.SEEK_CUR)  # chunks are padded to an even size
+            elif chunk_id == b"data":
+                layout["offset"] = file.tell()
+                # Streamed WAVs may leave the size unset, so never trust it past the end of the file
+                layout["size"] = min(size, os.path.getsize(wav_path) - layout["offset"])
+                file.seek(size + size % 2, os.SEEK_CUR)
+            else:
+                file.seek(size + size % 2, os.SEEK_CUR)
+
+    frames = layout["size"] // (layout["sampwidth"] * layout["channels"])
+    layout["samples"] = frames * layout["channels"]
+    return layout
+
+
+def _check_format(layout):
+    """Reject WAV files whose sample format cannot carry LSB payloads."""
+    if (layout["format"], layout["sampwidth"]) not in SAMPLE_FORMATS:
+        supported = ", ".join(SAMPLE_FORMATS.values())
+        raise ValueError(f"Unsupported WAV sample format. Supported formats: {supported}.")
+
+
+def _lsb_views(wav_path, layout, mode, spread):
+    """Memory-map the data chunk and return it with the byte views holding each sample's LSB.
+
+    Little-endian samples keep their least significant bit in the first byte, so one strided
+    uint8 view reaches the low bits of every format (8/16/24/32-bit PCM and 32-bit float) without
+    converting a single sample. The views are returned in embedding order: one view over all
+    samples when interleaved, one view per channel when spread per channel.
+    """
+    if spread not in SPREAD_MODES:
+        raise ValueError(f"Unknown spreading mode: {spread}")
+    if layout["samples"] == 0:
+        return None, []
+    data = np.memmap(wav_path, dtype=np.uint8, mode=mode, offset=layout["offset"],
+                     shape=(layout["samples"] * layout["sampwidth"],))
+    lsb = data[::layout["sampwidth"]]
+    if spread == "interleaved":
+        return data, [lsb]
+    channels = layout["channels"]
+    return data, [lsb[channel::channels] for channel in range(channels)]
+
+
+def _iter_view_chunks(views):
+    """Yield CHUNK_SIZE slices of each view in turn."""
+    for view in views:
+        yield from iter_chunks(view)
+
+
+def _embed_views(views, place, total, samples, progress=None):
+    """Write the message through the LSB views chunk by chunk, stopping after the last payload bit.
+
+    Progress is reported in samples passed, out of all samples.
+    """
+    done = 0
+    offset = 0
+    for chunk in _iter_view_chunks(views):
+        if done >= total:
             return
-        if not self.message_file_path:
-            messagebox.showerror("Error", "No message file selected!")
-            return
-
-        output_path = filedialog.asksaveasfilename(defaultextension=".wav", filetypes=[("WAV", "*.wav")])
-        try:
-            lsb_hide_audio(self.file_path, self.message_file_path, output_path)
-        except Exception as e:
-            messagebox.showerror("Error", str(e))
-
-    def decrypt(self):
-        if not self.file_path:
-            messagebox.showerror("Error", "No audio file selected!")
+        done += place(chunk, offset)
+        offset += chunk.size
+        report(progress, offset, samples)
+
+
+def _copy_file(source_path, output_path, progress=None):
+    """Copy a file COPY_SIZE bytes at a time, reporting the bytes copied."""
+    size = os.path.getsize(source_path)
+    copied = 0
+    with open(source_path, 'rb') as source, open(output_path, 'wb') as output:
+        for block in iter(lambda: source.read(COPY_SIZE), b""):
+            output.write(block)
+            copied += len(block)
+            report(progress, copied, size)
+
+
+def capacity(wav_path, method="lsb"):
+    """Return the number of bits the WAV file can carry, from its fmt and data chunk headers."""
+    if method != "lsb":
+        raise ValueError(f"Unknown audio method: {method}")
+    layout = _wav_layout(wav_path)
+    if (layout["format"], layout["sampwidth"]) not in SAMPLE_FORMATS:
+        return 0
+    return layout["samples"]
+
+
+# PCM formats steganalysis reads whole samples of: bytes per sample -> dtype and offset to unsigned
+ANALYSIS_FORMATS = {1: (np.uint8, 0), 2: (np.dtype("<i2"), 1 << 15)}
+
+
+def sample_blocks(wav_path):
+    """Return (samples, bits per sample, blocks) for steganalysis of 8- and 16-bit PCM WAV files.
+
+    The blocks yield the samples, offset to unsigned values, as arrays of shape
+    (1, frames, channels) of about CHUNK_SIZE samples each.
+    """
+    layout = _wav_layout(wav_path)
+    if layout["format"] != WAVE_FORMAT_PCM or layout["sampwidth"] not in ANALYSIS_FORMATS:
+        raise ValueError("Steganalysis supports 8- and 16-bit PCM WAV files.")
+    dtype, offset = ANALYSIS_FORMATS[layout["sampwidth"]]
+    channels = layout["channels"]
+
+    def blocks():
+        if layout["samples"] == 0:
             return
+        samples = np.memmap(wav_path, dtype=dtype, mode="r", offset=layout["offset"],
+                            shape=(layout["samples"] // channels, channels))
+        step = max(CHUNK_SIZE // channels, 1)
+        for start in range(0, len(samples), step):
+            # Adding the offset keeps each sample's parity and order
+            yield (samples[start:start + step].astype(np.int32) + offset)[None]
+
+    return layout["samples"], 8 * layout["sampwidth"], blocks()
+
+
+def lsb_hide_audio(wav_path, message, output_path, spread="interleaved", key=None, passphrase=None, fec=None,
+                   depth=1, progress=None):
+    """Hide a message (str or bytes) in a WAV file using LSB.
+
+    spread is "interleaved" (consecutive samples across all channels) or "per-channel"
+    (fill the first channel, then the next). With a key the bits are scattered over the whole
+    file at keyed pseudo-random positions instead. Extraction must use the same spread and key.
+    A passphrase encrypts the message, fec adds that many error correction bytes per 255-byte block
+    and depth (1-4) sets how many low bits of each sample carry the message.
+    """
+    binary_message = encode_payload(message, passphrase, fec, depth)
+    layout = _wav_layout(wav_path)
+    _check_format(layout)
+
+    total = values_needed(binary_message, depth)
+    if total > layout["samples"]:
+        raise ValueError("Message too large to hide in this audio file.")
 
-        hidden_message = lsb_extract_audio(self.file_path)
-
-        self.result_label.config(text=f"Hidden Message: {hidden_message}")
+    # Progress counts the bytes copied, then the bytes of the samples the embedding passes over
+    copy_bytes = os.path.getsize(wav_path)
+    sample_bytes = layout["samples"] * layout["sampwidth"]
+    work = copy_bytes + sample_bytes
+    with atomic_output(output_path) as partial_path:
+        # One file-level copy, then only the payload-bearing samples are edited in place
+        _copy_file(wav_path, partial_path, part(progress, 0, copy_bytes, work))
+        data, views = _lsb_views(partial_path, layout, "r+", spread)
+        place = placer(binary_message, key, layout["samples"], depth=depth)
+        _embed_views(views, place, total, layout["samples"], part(progress, copy_bytes, sample_bytes, work))
+        data.flush()
+        del data, views  # release the mapping before the file is moved into place
+    report(progress, work, work)
+
+
+def lsb_extract_audio(wav_path, spread="interleaved", key=None, passphrase=None, progress=None):
+    """Extract the hidden message from a WAV file using LSB.
+
+    Files read to the end are kept in the decode cache (see Cache), so extracting from them again
+    with the same spread does not read them again.
+    """
+    layout = _wav_layout(wav_path)
+    _check_format(layout)
+    cached = cached_plane(wav_path, f"audio {spread}")
+    if cached is not None:
+        return decode_plane(*cached, key, passphrase)
+    _, views = _lsb_views(wav_path, layout, "r", spread)
+    size = layout["samples"]
+    chunks = track(_iter_view_chunks(views), size, progress)
+    if key is not None:
+        # Keyed bits are spread over the whole file, so its low bit planes are read once, packed
+        plane = pack_lsbs(chunks, MAX_DEPTH)
+        keep_plane(wav_path, f"audio {spread}", size, plane)
+        return decode_plane(size, plane, key, passphrase)
+    # Only the pages holding the header and payload samples are read from disk
+    if not PLANES.fits(size):
+        return decode_payload(chunks, passphrase=passphrase)
+    writer = PlaneWriter(MAX_DEPTH)
+    message = decode_payload(writer.tee(chunks), passphrase=passphrase)
+    if writer.values == size:
+        keep_plane(wav_path, f"audio {spread}", size, writer.plane())
+    return message
 
 
 if __name__ == "__main__":
+    import tkinter as tk
+    from gui import AudioSteganoApp
+
     root = tk.Tk()
     app = AudioSteganoApp(root)
     root.mainloop()
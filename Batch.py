@@ -0,0 +1,65 @@
+import collections
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+# Outcome of one batch job: the job's arguments, the return value and the error
+# message (None when the job succeeded)
+BatchResult = collections.namedtuple("BatchResult", ["job", "value", "error"])
+
+
+def _call(function, job):
+    """Run one job, turning an exception into its message so it can cross process boundaries."""
+    try:
+        return function(*job), None
+    except Exception as e:
+        return None, str(e)
+
+
+def _collect(job, future):
+    """Build the BatchResult of a finished future."""
+    try:
+        value, error = future.result()
+    except Exception as e:  # the worker process itself died
+        value, error = None, str(e) or type(e).__name__
+    return BatchResult(job, value, error)
+
+
+def run_batch(function, jobs, workers=None, max_in_flight=None, ordered=True, threads=False):
+    """Run function(*job) for every job on a process pool and yield a BatchResult per job.
+
+    function must be importable by the worker processes (a module-level function).
+    workers defaults to the number of CPUs; workers=1 runs every job in this process.
+    Jobs are pulled from the iterable lazily and at most max_in_flight (default twice
+    the worker count) are submitted at a time. With ordered=False results are yielded
+    as soon as they finish instead of in job order. threads=True uses a thread pool
+    instead, for jobs that mostly wait on files; workers then defaults to CPUs + 4.
+    """
+    workers = workers or (os.cpu_count() or 1) + (4 if threads else 0)
+    if workers == 1:
+        for job in jobs:
+            yield BatchResult(job, *_call(function, job))
+        return
+
+    max_in_flight = max_in_flight or 2 * workers
+    jobs = iter(jobs)
+    with (ThreadPoolExecutor if threads else ProcessPoolExecutor)(max_workers=workers) as pool:
+        pending = collections.OrderedDict()  # future -> job, in submission order
+
+        def fill():
+            while len(pending) < max_in_flight:
+                job = next(jobs, None)
+                if job is None:
+                    return
+                pending[pool.submit(_call, function, job)] = job
+
+        fill()
+        while pending:
+            if ordered:
+                future = next(iter(pending))
+                done = [future]
+                wait(done)
+            else:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield _collect(pending.pop(future), future)
+            fill()
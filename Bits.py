@@ -0,0 +1,162 @@
+import numpy as np
+
+END_MARKER = "#####END#####"  # Marker to detect the end of the hidden message
+NOT_FOUND = "No hidden message found!"
+MAX_DEPTH = 4  # Most low bits of one carrier value that carry payload
+
+
+# Vectorized LSB access on flat integer arrays. At depth k each carrier value holds k bits in its
+# k low bits, most significant first; depth 1 is plain LSB embedding.
+def values_needed(bits, depth=1):
+    """Return how many carrier values hold the bits at depth bits per value."""
+    return -(-len(bits) // depth)
+
+
+def group_bits(bits, depth):
+    """Return the bits as one value per depth bits, the last one padded with zeros."""
+    if depth == 1:
+        return bits
+    padded = np.zeros(values_needed(bits, depth) * depth, dtype=np.uint8)
+    padded[:len(bits)] = bits
+    return np.packbits(padded.reshape(-1, depth), axis=1)[:, 0] >> (8 - depth)
+
+
+def embed_bits(carrier, bits, depth=1):
+    """Write bits into the low depth bits of the leading values of a flat carrier array, in place."""
+    bits = group_bits(bits, depth)
+    if len(bits) > carrier.size:
+        raise ValueError("Message too large to hide in this carrier.")
+    head = carrier[:len(bits)]
+    # XOR flips exactly the bits that differ from the message, for any integer dtype
+    head ^= (head ^ bits) & ((1 << depth) - 1)
+    return carrier
+
+
+def extract_bits(carrier, count=None, depth=1):
+    """Read the low depth bits of the leading values of a flat carrier array."""
+    if count is not None:
+        carrier = carrier[:count]
+    if depth == 1:
+        return (carrier & 1).astype(np.uint8)
+    low = (carrier & ((1 << depth) - 1)).astype(np.uint8)
+    return np.unpackbits(low[:, None], axis=1)[:, 8 - depth:].reshape(-1)
+
+
+# Streaming extraction
+CHUNK_SIZE = 1 << 20  # Carrier values decoded per step during extraction
+
+
+def iter_chunks(carrier, chunk_size=CHUNK_SIZE):
+    """Yield consecutive slices of a flat carrier array."""
+    for start in range(0, carrier.size, chunk_size):
+        yield carrier[start:start + chunk_size]
+
+
+class BitStream:
+    """Pull the low depth bits from an iterable of carrier chunks, reading only as far as requested."""
+
+    def __init__(self, chunks, depth=1):
+        self._chunks = iter(chunks)
+        self._depth = depth
+        self._pending = np.empty(0, dtype=np.uint8)  # bits decoded but not consumed yet
+
+    def read_bits(self, count):
+        """Return the next count bits, or fewer if the carrier runs out."""
+        parts = [self._pending]
+        available = len(self._pending)
+        while available < count:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            parts.append(extract_bits(chunk, depth=self._depth))
+            available += parts[-1].size
+        bits = np.concatenate(parts)
+        self._pending = bits[count:]
+        return bits[:count]
+
+
+def leading_values(chunks, count):
+    """Take chunks off an iterator until they hold count carrier values and return them joined."""
+    parts = []
+    size = 0
+    while size < count:
+        chunk = next(chunks, None)
+        if chunk is None:
+            break
+        parts.append(chunk)
+        size += chunk.size
+    if len(parts) == 1:
+        return parts[0]
+    return np.concatenate(parts) if parts else np.empty(0, dtype=np.uint8)
+
+
+def _pack_values(values, depth):
+    """Pack depth-bit values 8 // depth to a byte, the first one in the high bits; depth divides 8."""
+    per_byte = 8 // depth
+    padded = np.zeros(-(-len(values) // per_byte) * per_byte, dtype=np.uint8)
+    padded[:len(values)] = values
+    grouped = padded.reshape(-1, per_byte)
+    packed = grouped[:, 0].copy()
+    for column in grouped.T[1:]:
+        packed = (packed << depth) | column
+    return packed
+
+
+class PlaneWriter:
+    """Pack the low depth bits of carrier chunks into one bit plane as they come, depth bits per value."""
+
+    def __init__(self, depth=1):
+        self._depth = depth
+        # Depths of 2 and 4 pack whole values into each byte, other depths go through single bits
+        self._whole = depth > 1 and 8 % depth == 0
+        self._step = 8 // depth if self._whole else 8
+        self._parts = []
+        self._leftover = np.empty(0, dtype=np.uint8)  # values or bits that did not fill a whole byte yet
+        self.values = 0  # carrier values added so far
+
+    def add(self, chunk):
+        """Add the low bits of the next chunk of carrier values."""
+        depth = self._depth
+        units = (chunk & ((1 << depth) - 1)).astype(np.uint8) if self._whole else extract_bits(chunk, depth=depth)
+        units = np.concatenate((self._leftover, units))
+        usable = len(units) - len(units) % self._step
+        self._parts.append(_pack_values(units[:usable], depth) if self._whole else np.packbits(units[:usable]))
+        self._leftover = units[usable:]
+        self.values += chunk.size
+
+    def tee(self, chunks):
+        """Yield the chunks on, adding each as it passes."""
+        for chunk in chunks:
+            self.add(chunk)
+            yield chunk
+
+    def plane(self):
+        """Return the packed plane of every value added, the last byte padded with zeros."""
+        pad = _pack_values(self._leftover, self._depth) if self._whole else np.packbits(self._leftover)
+        return np.concatenate(self._parts + [pad])
+
+
+def pack_lsbs(chunks, depth=1):
+    """Read the low depth bits of every chunk into one packed bit plane, depth bits per carrier value."""
+    writer = PlaneWriter(depth)
+    for chunk in chunks:
+        writer.add(chunk)
+    return writer.plane()
+
+
+def extract_until_marker(chunks):
+    """Decode LSBs chunk by chunk and stop as soon as END_MARKER has been read."""
+    marker = END_MARKER.encode("latin-1")
+    data = bytearray()
+    leftover = np.empty(0, dtype=np.uint8)  # bits that did not fill a whole byte yet
+    for chunk in chunks:
+        bits = np.concatenate((leftover, extract_bits(chunk)))
+        usable = len(bits) - len(bits) % 8
+        leftover = bits[usable:]
+        # Resume the search just before the new bytes so a marker split across chunks is found
+        start = max(len(data) - len(marker) + 1, 0)
+        data += np.packbits(bits[:usable]).tobytes()
+        end_index = data.find(marker, start)
+        if end_index != -1:
+            return data[:end_index].decode("latin-1")
+    return NOT_FOUND
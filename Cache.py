@@ -0,0 +1,150 @@
+import collections
+import os
+import threading
+
+from Bits import MAX_DEPTH
+from Container import decode_payload
+from Matrix import decode_keyed, decode_matrix
+from Spread import Permutation, keyed_chunks, plane_chunks
+from Stamp import file_digest
+
+# Content-addressed cache of decoded carriers for repeated extraction. Extraction that reads a
+# whole carrier packs its low MAX_DEPTH bit planes into one plane (pack_lsbs) on the way, which
+# every method can decode from: LSB at any depth, parity and their keyed forms. Without a key, a
+# payload found in the leading values is cheap to read again, so only carriers read to the end
+# (keyed extraction, or the wrong method scanning for a marker) are kept. The most recently used
+# planes are kept within a byte budget, keyed by the SHA-256 of the file and the carrier layout
+# (the order its values are read in), so all methods on one file share an entry and a copy of the
+# file under another name hits it too. A file is only hashed once a plane is kept for it or a
+# cached one has its size, and digests are remembered per path, size, inode and modification
+# time, so an unchanged file is not hashed again.
+DEFAULT_BUDGET = 256 << 20  # Bytes of packed planes kept
+DIGESTS = 1024  # Paths whose digests are remembered
+
+
+class PlaneCache:
+    """LRU cache of (carrier values, packed plane) per file content and layout, shared across threads."""
+
+    def __init__(self, budget=DEFAULT_BUDGET):
+        self.budget = budget
+        self.hits = 0
+        self.misses = 0
+        self._planes = collections.OrderedDict()  # least recently used first
+        self._sizes = collections.Counter()  # file sizes of the cached planes
+        self._bytes = 0
+        self._digests = collections.OrderedDict()  # real path -> (stat, digest)
+        self._lock = threading.Lock()
+
+    def fits(self, values):
+        """Return whether the plane of a carrier of that many values fits in the budget."""
+        return -(-values * MAX_DEPTH // 8) <= self.budget
+
+    def _file(self, path):
+        """Return (real path, (size, inode, modification time)) of a file."""
+        path = os.path.realpath(path)
+        stat = os.stat(path)
+        return path, (stat.st_size, stat.st_ino, stat.st_mtime_ns)
+
+    def digest(self, path):
+        """Return the SHA-256 of a file, hashing it only if it changed since it was last seen."""
+        path, stamp = self._file(path)
+        with self._lock:
+            known = self._digests.get(path)
+        if known is not None and known[0] == stamp:
+            return known[1]
+        digest = file_digest(path)
+        with self._lock:
+            self._digests[path] = stamp, digest
+            self._digests.move_to_end(path)
+            while len(self._digests) > DIGESTS:
+                self._digests.popitem(last=False)
+        return digest
+
+    def get(self, path, layout):
+        """Return (carrier values, packed plane) of the file in layout, or None if it is not cached.
+
+        A file is hashed only if a cached one has its size, so a miss on a new file reads none of it.
+        """
+        with self._lock:
+            candidate = self._file(path)[1][0] in self._sizes
+        key = (self.digest(path), layout) if candidate else None
+        with self._lock:
+            entry = self._planes.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._planes.move_to_end(key)
+            self.hits += 1
+            return entry[1:]
+
+    def put(self, path, layout, size, plane):
+        """Keep the plane of the file in layout, evicting the least recently used ones until it fits.
+
+        Planes larger than the budget are not kept. The plane is made read-only, as later callers share it.
+        """
+        if plane.nbytes > self.budget:
+            return
+        plane.flags.writeable = False
+        key = (self.digest(path), layout)
+        file_size = self._file(path)[1][0]
+        with self._lock:
+            if key in self._planes:
+                return  # read by another thread meanwhile
+            self._planes[key] = file_size, size, plane
+            self._sizes[file_size] += 1
+            self._bytes += plane.nbytes
+            while self._bytes > self.budget:
+                _, (evicted_size, _, evicted) = self._planes.popitem(last=False)
+                self._sizes[evicted_size] -= 1
+                if not self._sizes[evicted_size]:
+                    del self._sizes[evicted_size]
+                self._bytes -= evicted.nbytes
+
+    def clear(self):
+        """Drop every plane and reset the counters."""
+        with self._lock:
+            self._planes.clear()
+            self._sizes.clear()
+            self._digests.clear()
+            self._bytes = 0
+            self.hits = self.misses = 0
+
+    def stats(self):
+        """Return the hits, misses, entries, bytes held and budget of the cache as a dict."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._planes), "bytes": self._bytes,
+                    "budget": self.budget}
+
+
+# The cache extraction uses within this process
+PLANES = PlaneCache()
+
+
+def cached_plane(path, layout):
+    """Return (carrier values, packed plane) of a file from the process cache, or None; see PlaneCache.get()."""
+    return PLANES.get(path, layout)
+
+
+def keep_plane(path, layout, size, plane):
+    """Keep the packed plane of a file in the process cache; see PlaneCache.put()."""
+    PLANES.put(path, layout, size, plane)
+
+
+def cache_stats():
+    """Return the counters of the process cache; see PlaneCache.stats()."""
+    return PLANES.stats()
+
+
+def decode_plane(size, plane, key=None, passphrase=None, matrix=False):
+    """Read the hidden payload from a carrier of size values by its packed MAX_DEPTH plane.
+
+    The arguments are those of the extraction that hid it; the payload's own depth or code is
+    found from the header.
+    """
+    if key is None:
+        chunks = plane_chunks(plane, size, depth=MAX_DEPTH)
+        return (decode_matrix if matrix else decode_payload)(chunks, passphrase=passphrase)
+    if matrix:
+        return decode_keyed(plane, key, size, passphrase, depth=MAX_DEPTH)
+    return decode_payload(keyed_chunks(plane, Permutation(key, size), depth=MAX_DEPTH), legacy=False,
+                          passphrase=passphrase)
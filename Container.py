@@ -0,0 +1,214 @@
+import hashlib
+import hmac
+import itertools
+import lzma
+import os
+import struct
+import zlib
+
+import numpy as np
+
+from Bits import MAX_DEPTH, NOT_FOUND, BitStream, extract_until_marker, leading_values
+from Fec import FRAME_BITS, protect, protected_size, read_frame, repair
+
+# Header written in front of every payload:
+# magic, version, flags, payload length in bytes, CRC32 of the payload
+MAGIC = b"STG\x00"
+VERSION = 1
+HEADER = struct.Struct(">4sBBII")
+HEADER_BITS = HEADER.size * 8
+
+FLAG_TEXT = 0x01  # Payload is UTF-8 text and is returned as str
+FLAG_ZLIB = 0x02  # Payload is zlib-compressed
+FLAG_LZMA = 0x04  # Payload is LZMA-compressed
+FLAG_ENCRYPTED = 0x08  # Payload is encrypted and authenticated with a passphrase
+DEPTH_SHIFT = 4  # Flag bits 4-5 hold the carrier bits per value the container is embedded at, minus one
+
+# An encrypted payload is salt + passphrase check + ciphertext + tag. The check sits in front so a
+# wrong passphrase is rejected as soon as it is read, before the rest of the carrier is decoded.
+SALT_SIZE = 16
+CHECK_SIZE = 4
+TAG_SIZE = 32  # HMAC-SHA256 over the flags, salt and ciphertext
+SCRYPT_PARAMS = {"n": 1 << 14, "r": 8, "p": 1}  # about 16 MB and a few tens of ms per derivation
+PROBE_SIZE = 1 << 16  # Leading bytes test-compressed to skip data that will not shrink
+
+
+def _compress(data):
+    """Return (flag, data) for the smallest of zlib, LZMA and the data left as it is."""
+    best = (0, data)
+    # Already compressed or encrypted files do not shrink; a fast probe spares the full attempt
+    probe = data[:PROBE_SIZE]
+    if len(zlib.compress(probe, 1)) >= len(probe):
+        return best
+    for flag, packed in ((FLAG_ZLIB, zlib.compress(data, 9)),
+                         (FLAG_LZMA, lzma.compress(data, format=lzma.FORMAT_ALONE))):
+        if len(packed) < len(best[1]):
+            best = (flag, packed)
+    return best
+
+
+def _decompress(flags, data):
+    """Undo _compress according to the header flags."""
+    if flags & FLAG_ZLIB:
+        return zlib.decompress(data)
+    if flags & FLAG_LZMA:
+        return lzma.decompress(data, format=lzma.FORMAT_ALONE)
+    return data
+
+
+def _derive_keys(passphrase, salt):
+    """Derive the cipher key, MAC key and passphrase check from a passphrase with scrypt."""
+    if isinstance(passphrase, str):
+        passphrase = passphrase.encode("utf-8")
+    material = hashlib.scrypt(passphrase, salt=salt, dklen=64 + CHECK_SIZE, **SCRYPT_PARAMS)
+    return material[:32], material[32:64], material[64:]
+
+
+def _keystream_xor(key, data):
+    """XOR data with a SHAKE-256 keystream; the same call encrypts and decrypts."""
+    stream = hashlib.shake_256(key).digest(len(data))
+    return np.bitwise_xor(np.frombuffer(data, dtype=np.uint8), np.frombuffer(stream, dtype=np.uint8)).tobytes()
+
+
+def _encrypt(flags, data, passphrase):
+    """Encrypt then MAC: return salt + check + ciphertext + tag."""
+    salt = os.urandom(SALT_SIZE)
+    cipher_key, mac_key, check = _derive_keys(passphrase, salt)
+    ciphertext = _keystream_xor(cipher_key, data)
+    tag = hmac.new(mac_key, bytes([flags]) + salt + ciphertext, hashlib.sha256).digest()
+    return salt + check + ciphertext + tag
+
+
+def seal(message, passphrase=None, depth=1):
+    """Return the container bytes for a str or bytes message: header + payload.
+
+    The payload is compressed when that makes it smaller and, with a passphrase, encrypted and
+    authenticated. depth records how many low bits of each carrier value it is embedded in.
+    """
+    if not 1 <= depth <= MAX_DEPTH:
+        raise ValueError(f"depth must be between 1 and {MAX_DEPTH} bits per carrier value.")
+    flags = (depth - 1) << DEPTH_SHIFT
+    if isinstance(message, str):
+        message = message.encode("utf-8")
+        flags |= FLAG_TEXT
+    compression, message = _compress(message)
+    flags |= compression
+    if passphrase is not None:
+        flags |= FLAG_ENCRYPTED
+        message = _encrypt(flags, message, passphrase)
+    return HEADER.pack(MAGIC, VERSION, flags, len(message), zlib.crc32(message)) + message
+
+
+def encode_payload(message, passphrase=None, fec=None, depth=1):
+    """Wrap a str or bytes message in the container and return its bits.
+
+    fec adds that many Reed-Solomon parity bytes per block of up to 255 bytes, so up to fec // 2
+    damaged bytes per block are corrected on extraction. depth is the number of low bits per
+    carrier value the bits will be embedded in.
+    """
+    data = seal(message, passphrase, depth)
+    if fec:
+        data = protect(data, fec)
+    return np.unpackbits(np.frombuffer(data, dtype=np.uint8))
+
+
+def payload_capacity(carrier_bits):
+    """Return how many payload bytes fit in a carrier with the given number of LSBs."""
+    return max(carrier_bits // 8 - HEADER.size, 0)
+
+
+def _read_bytes(stream, count):
+    """Read count bytes from a BitStream, or None if the carrier runs out first."""
+    bits = stream.read_bits(count * 8)
+    return np.packbits(bits).tobytes() if len(bits) == count * 8 else None
+
+
+def _read_encrypted(stream, length, passphrase):
+    """Read an encrypted payload, rejecting a wrong passphrase before reading past its check.
+
+    Returns (payload, (cipher key, MAC key)), or (None, None) if the carrier runs out first.
+    """
+    if passphrase is None:
+        raise ValueError("The hidden message is encrypted; a passphrase is needed.")
+    if length < SALT_SIZE + CHECK_SIZE + TAG_SIZE:
+        return None, None
+    prefix = _read_bytes(stream, SALT_SIZE + CHECK_SIZE)
+    if prefix is None:
+        return None, None
+    cipher_key, mac_key, check = _derive_keys(passphrase, prefix[:SALT_SIZE])
+    if not hmac.compare_digest(prefix[SALT_SIZE:], check):
+        raise ValueError("Wrong passphrase for the hidden message.")
+    rest = _read_bytes(stream, length - len(prefix))
+    if rest is None:
+        return None, None
+    return prefix + rest, (cipher_key, mac_key)
+
+
+def _decrypt(flags, payload, keys):
+    """Check the tag of an encrypted payload and return the plaintext."""
+    cipher_key, mac_key = keys
+    salt = payload[:SALT_SIZE]
+    ciphertext, tag = payload[SALT_SIZE + CHECK_SIZE:-TAG_SIZE], payload[-TAG_SIZE:]
+    expected = hmac.new(mac_key, bytes([flags]) + salt + ciphertext, hashlib.sha256).digest()
+    if not hmac.compare_digest(tag, expected):
+        raise ValueError("Hidden message failed authentication.")
+    return _keystream_xor(cipher_key, ciphertext)
+
+
+def _read_message(stream, depth, passphrase):
+    """Read a container, or an FEC frame around one, from a BitStream at depth bits per value.
+
+    Returns None if the stream does not start with either; depth None skips the depth check.
+    """
+    header_bits = stream.read_bits(HEADER_BITS)
+    if len(header_bits) == HEADER_BITS:
+        magic, version, flags, length, checksum = HEADER.unpack(np.packbits(header_bits).tobytes())
+        if magic == MAGIC and version == VERSION and depth in (None, ((flags >> DEPTH_SHIFT) & 3) + 1):
+            if flags & FLAG_ENCRYPTED:
+                payload, keys = _read_encrypted(stream, length, passphrase)
+            else:
+                payload = _read_bytes(stream, length)
+            if payload is None:
+                return NOT_FOUND
+            if zlib.crc32(payload) != checksum:
+                raise ValueError("Hidden message is corrupted (checksum mismatch).")
+            if flags & FLAG_ENCRYPTED:
+                payload = _decrypt(flags, payload, keys)
+            payload = _decompress(flags, payload)
+            return payload.decode("utf-8") if flags & FLAG_TEXT else payload
+
+    frame = read_frame(np.concatenate((header_bits, stream.read_bits(FRAME_BITS - len(header_bits)))))
+    if frame is not None:
+        parity, length = frame
+        protected = _read_bytes(stream, protected_size(parity, length))
+        if protected is None:
+            return NOT_FOUND
+        return unseal(repair(protected, parity, length), passphrase)
+    return None
+
+
+def decode_payload(chunks, legacy=True, passphrase=None):
+    """Read a container from carrier chunks, falling back to the END_MARKER format if legacy is set.
+
+    The depth a container was embedded at is found by trying each on the leading carrier values;
+    a container protected by encode_payload(fec=...) is recognized and repaired on the way.
+    """
+    chunks = iter(chunks)
+    head = leading_values(chunks, FRAME_BITS)
+    for depth in range(1, MAX_DEPTH + 1):
+        # The header fits in the leading values at any depth, so only the matching stream reads on
+        message = _read_message(BitStream(itertools.chain([head], chunks), depth), depth, passphrase)
+        if message is not None:
+            return message
+
+    if not legacy:
+        return NOT_FOUND
+    # Messages hidden before the container format end with END_MARKER instead
+    return extract_until_marker(itertools.chain([head], chunks))
+
+
+def unseal(data, passphrase=None):
+    """Read a container from bytes as written by seal(), or return NOT_FOUND if data is not one."""
+    bits = np.unpackbits(np.frombuffer(data, dtype=np.uint8))
+    message = _read_message(BitStream([bits]), None, passphrase)
+    return NOT_FOUND if message is None else message
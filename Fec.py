@@ -0,0 +1,175 @@
+import struct
+
+import numpy as np
+
+# Reed-Solomon forward error correction over GF(256), applied to the container bytes. Blocks are
+# interleaved byte by byte, so a burst of damaged carrier values is shared out over all blocks.
+MAGIC = b"STF"
+FRAME = struct.Struct(">3sBI")  # magic, parity bytes per block, length of the protected data
+REPEAT = 5  # The frame is written this many times and read back by majority vote
+FRAME_BITS = FRAME.size * 8 * REPEAT
+BLOCK_SIZE = 255  # Longest Reed-Solomon block over GF(256), parity included
+
+# Log and antilog tables of GF(256) with the primitive polynomial x^8 + x^4 + x^3 + x^2 + 1
+EXP = np.zeros(512, dtype=np.uint8)
+LOG = np.zeros(256, dtype=np.int64)
+_value = 1
+for _power in range(255):
+    EXP[_power] = _value
+    LOG[_value] = _power
+    _value <<= 1
+    if _value & 0x100:
+        _value ^= 0x11D
+EXP[255:510] = EXP[:255]  # LOG[a] + LOG[b] indexes without a modulo
+# Full product table for the vectorized paths, Python lists for the per-block repair
+MUL = np.where((np.arange(256)[:, None] > 0) & (np.arange(256) > 0),
+               EXP[LOG[:, None] + LOG], 0).astype(np.uint8)
+_EXP = EXP.tolist()
+_LOG = LOG.tolist()
+
+
+def _mul(a, b):
+    return _EXP[_LOG[a] + _LOG[b]] if a and b else 0
+
+
+def _div(a, b):
+    return _EXP[_LOG[a] - _LOG[b] + 255] if a else 0
+
+
+def _eval(poly, x):
+    """Evaluate a polynomial with its coefficients in ascending order at x."""
+    value = 0
+    for coef in reversed(poly):
+        value = _mul(value, x) ^ coef
+    return value
+
+
+def _generator(parity):
+    """Return the generator polynomial (x - 1)(x - a)...(x - a^(parity-1)), leading coefficient first."""
+    poly = np.ones(1, dtype=np.uint8)
+    for power in range(parity):
+        poly = np.append(poly, 0) ^ np.append(0, MUL[poly, EXP[power]])
+    return poly
+
+
+def _layout(parity, length):
+    """Return (blocks, data bytes per block) for length bytes protected by parity bytes per block."""
+    if not 1 <= parity < BLOCK_SIZE:
+        raise ValueError(f"FEC parity must be between 1 and {BLOCK_SIZE - 1} bytes per block.")
+    blocks = max(-(-length // (BLOCK_SIZE - parity)), 1)
+    # Equal, shortened blocks keep the padding under one byte per block
+    return blocks, max(-(-length // blocks), 1)
+
+
+def protected_size(parity, length):
+    """Return how many bytes follow the frame for length bytes of data."""
+    blocks, size = _layout(parity, length)
+    return blocks * (size + parity)
+
+
+def protect(data, parity):
+    """Return data behind an FEC frame, as interleaved Reed-Solomon blocks with parity bytes each.
+
+    Each block corrects up to parity // 2 damaged bytes.
+    """
+    blocks, size = _layout(parity, len(data))
+    message = np.zeros(blocks * size, dtype=np.uint8)
+    message[:len(data)] = np.frombuffer(data, dtype=np.uint8)
+    message = message.reshape(blocks, size)
+    # Systematic encoding: the parity bytes are the remainder of message * x^parity by the generator,
+    # computed for all blocks at once with one shift register step per data byte
+    generator = _generator(parity)[1:]
+    remainder = np.zeros((blocks, parity), dtype=np.uint8)
+    for column in message.T:
+        feedback = column ^ remainder[:, 0]
+        remainder[:, :-1] = remainder[:, 1:]
+        remainder[:, -1] = 0
+        remainder ^= MUL[feedback[:, None], generator]
+    codewords = np.hstack((message, remainder))
+    return FRAME.pack(MAGIC, parity, len(data)) * REPEAT + codewords.T.tobytes()
+
+
+def read_frame(bits):
+    """Return (parity, length) from the FRAME_BITS leading bits, or None if they are not an FEC frame."""
+    if len(bits) < FRAME_BITS:
+        return None
+    votes = bits[:FRAME_BITS].reshape(REPEAT, -1).sum(axis=0, dtype=np.int64)
+    magic, parity, length = FRAME.unpack(np.packbits(votes > REPEAT // 2).tobytes())
+    if magic != MAGIC or not 1 <= parity < BLOCK_SIZE:
+        return None
+    return parity, length
+
+
+def _syndromes(codewords, parity):
+    """Evaluate every block at 1, a, ..., a^(parity-1); all zero for an undamaged block."""
+    roots = EXP[:parity]
+    syndromes = np.zeros((len(codewords), parity), dtype=np.uint8)
+    for column in codewords.T:
+        syndromes = MUL[syndromes, roots] ^ column[:, None]
+    return syndromes
+
+
+def _error_locator(syndromes):
+    """Berlekamp-Massey: return the error locator polynomial, coefficients in ascending order."""
+    locator, previous = [1], [1]
+    errors, shift, scale = 0, 1, 1
+    for step, syndrome in enumerate(syndromes):
+        discrepancy = syndrome
+        for i in range(1, errors + 1):
+            discrepancy ^= _mul(locator[i], syndromes[step - i])
+        if not discrepancy:
+            shift += 1
+            continue
+        factor = _div(discrepancy, scale)
+        updated = locator + [0] * (len(previous) + shift - len(locator))
+        for i, coef in enumerate(previous):
+            updated[i + shift] ^= _mul(factor, coef)
+        if 2 * errors <= step:
+            previous, errors, scale, shift = locator, step + 1 - errors, discrepancy, 1
+        else:
+            shift += 1
+        locator = updated + [0] * (errors + 1 - len(updated))
+    return locator[:errors + 1]
+
+
+def _repair_block(block, syndromes):
+    """Correct one block in place from its syndromes; raise ValueError if it is beyond repair."""
+    syndromes = syndromes.tolist()
+    locator = _error_locator(syndromes)
+    errors = len(locator) - 1
+    if 2 * errors > len(syndromes):
+        raise ValueError("Hidden message is too damaged to repair.")
+    # Chien search, vectorized over the block: the damaged degree d is a root at a^-d
+    degrees = np.arange(len(block))
+    values = np.zeros(len(block), dtype=np.uint8)
+    for i, coef in enumerate(locator):
+        if coef:
+            values ^= EXP[(_LOG[coef] - degrees * i) % 255]
+    found = np.flatnonzero(values == 0)
+    if len(found) != errors:
+        raise ValueError("Hidden message is too damaged to repair.")
+    # Forney: magnitude = X * omega(1/X) / locator'(1/X), with omega = syndromes * locator mod x^parity
+    omega = [0] * len(syndromes)
+    for i, coef in enumerate(locator):
+        for j in range(len(syndromes) - i):
+            omega[i + j] ^= _mul(coef, syndromes[j])
+    derivative = [coef if i % 2 else 0 for i, coef in enumerate(locator)][1:]
+    for degree in found.tolist():
+        inverse = _EXP[(255 - degree) % 255]
+        slope = _eval(derivative, inverse)
+        if not slope:
+            raise ValueError("Hidden message is too damaged to repair.")
+        block[len(block) - 1 - degree] ^= _div(_mul(_EXP[degree % 255], _eval(omega, inverse)), slope)
+
+
+def repair(data, parity, length):
+    """Return the length bytes protected by protect(), correcting damaged bytes on the way.
+
+    The syndromes of all blocks are computed at once; only damaged blocks are repaired one by one.
+    """
+    blocks, size = _layout(parity, length)
+    codewords = np.frombuffer(data, dtype=np.uint8).reshape(size + parity, blocks).T.copy()
+    syndromes = _syndromes(codewords, parity)
+    for index in np.flatnonzero(syndromes.any(axis=1)):
+        _repair_block(codewords[index], syndromes[index])
+    return codewords[:, :size].tobytes()[:length]
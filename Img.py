@@ -1,209 +1,324 @@
-import tkinter as tk
-from tkinter import filedialog, messagebox
 from PIL import Image
+import numpy as np
 import os
+import struct
+
+from Bits import CHUNK_SIZE, MAX_DEPTH, BitStream, PlaneWriter, pack_lsbs, values_needed
+from Cache import PLANES, cached_plane, decode_plane, keep_plane
+from Container import encode_payload, decode_payload
+from Matrix import choose_code, covered_values, decode_matrix, flips, keyed_flips
+from Progress import atomic_output, report, track
+from Spread import embed_at, placer
+from Strips import PNG_SIGNATURE, PngWriter, open_png, open_raw
 
-END_MARKER = "#####END#####"  # Marker to detect the end of the hidden message
 #############################################
 ###############khaled changing###############
 #############################################
-# LSB Steganography
-def lsb_hide(image_path, message, output_path):
-    """Hide the message using LSB in PNG images."""
-    message += END_MARKER
-    binary_message = ''.join(format(ord(char), '08b') for char in message)
-    img = Image.open(image_path)
-    pixels = list(img.getdata())
-
-    if len(binary_message) > len(pixels) * 3:
-        raise ValueError("Message too large to hide in this image.")
-
-    data_index = 0
-    new_pixels = []
-    for pixel in pixels:
-        if data_index < len(binary_message):
-            new_pixel = list(pixel)
-            for i in range(3):  # R, G, B channels
-                if data_index < len(binary_message):
-                    new_pixel[i] = (new_pixel[i] & ~1) | int(binary_message[data_index])
-                    data_index += 1
-            new_pixels.append(tuple(new_pixel))
+# Modes embedded into directly -> number of leading channels that carry the message
+CARRIER_CHANNELS = {"L": 1, "LA": 1, "RGB": 3, "RGBA": 3, "I;16": 1}
+
+
+def _carrier_mode(img):
+    """Return the CARRIER_CHANNELS mode an opened image is embedded in; nothing is decoded.
+
+    32-bit images (modes I and F) are rejected: the PNG output holds at most 16 bits per value,
+    so converting them would clamp the pixels.
+    """
+    if img.mode in CARRIER_CHANNELS:
+        return img.mode
+    if img.mode == "1":
+        return "L"
+    if img.mode in ("I", "F"):
+        raise ValueError(f"32-bit images (mode {img.mode}) are not supported; the PNG output holds at most 16 bits.")
+    if img.mode.startswith("I;16"):
+        return "I;16"  # 16-bit grayscale in any byte order
+    # Palette indices and other color spaces become RGB(A), so a flipped LSB stays a tiny color change
+    return "RGBA" if "A" in img.getbands() or "transparency" in img.info else "RGB"
+
+
+def _normalize(img):
+    """Convert the image once, up front, to the mode it is embedded in."""
+    mode = _carrier_mode(img)
+    return img if img.mode == mode else img.convert(mode)
+
+
+def _channels(pixels, count):
+    """Return the leading count channels of a pixel array (the array itself for one band)."""
+    return pixels[..., :count] if pixels.ndim == 3 else pixels
+
+
+def _band_rows(width, count):
+    """Return how many rows make a band of about CHUNK_SIZE carrier values."""
+    return max(CHUNK_SIZE // max(width * count, 1), 1)
+
+
+def _embed_strip(pixels, count, place, offset):
+    """Embed the message bits that belong in a writable pixel band starting at carrier position offset.
+
+    Returns how many bits were written.
+    """
+    channels = _channels(pixels, count)
+    flat = channels.reshape(-1)  # a view for one-band/RGB, a copy when an alpha channel is skipped
+    written = place(flat, offset)
+    if written and not np.shares_memory(flat, pixels):
+        channels[...] = flat.reshape(channels.shape)
+    return written
+
+
+def _embed_png(png, place, total, file, progress=None):
+    """Stream a PNG strip by strip, decoding only the strips up to the last payload bit.
+
+    Progress is reported in rows written, out of the image height.
+    """
+    count = CARRIER_CHANNELS[png.mode]
+    rows = _band_rows(png.width, count)
+    writer = PngWriter(file, png.width, png.height, png.mode, png.leading)
+    done = 0
+    offset = 0
+    top = 0
+    changed = False  # whether the strip written last differs from the source
+    for block in png.strips(rows):
+        if done < total or changed:
+            # The strip after the payload is decoded too: its filters refer to the changed row above
+            pixels = np.array(png.unfilter(block))
+            written = _embed_strip(pixels, count, place, offset) if done < total else 0
+            changed = written > 0
+            done += written
+            offset += len(pixels) * png.width * count
+            writer.write_pixels(pixels)
         else:
-            new_pixels.append(pixel)
-
-    img.putdata(new_pixels)
+            # Past the payload the filtered scanlines are only recompressed
+            writer.write_filtered(block)
+        top = min(top + rows, png.height)
+        report(progress, top, png.height)
+    writer.close(png.trailing)
+
+
+def _embed_raw(raw, place, total, file, progress=None):
+    """Re-encode an uncompressed image as PNG a strip at a time, reporting rows written out of the height."""
+    count = CARRIER_CHANNELS[raw.mode]
+    writer = PngWriter(file, raw.width, raw.height, raw.mode)
+    done = 0
+    offset = 0
+    for strip in raw.strips(_band_rows(raw.width, count)):
+        if done < total:
+            done += _embed_strip(strip, count, place, offset)
+        offset += len(strip) * raw.width * count
+        writer.write_pixels(strip)
+        report(progress, offset // (raw.width * count), raw.height)
+    writer.close()
+
+
+def _embed_decoded(image_path, place, total, output_path, progress=None):
+    """Decode the whole image, change the bands up to the last payload bit in place and save it as PNG.
+
+    Progress is reported in rows, the bands changed and then all rows once the image is saved.
+    """
+    img = _normalize(Image.open(image_path))
+    count = CARRIER_CHANNELS[img.mode]
+    rows = _band_rows(img.width, count)
+    done = 0
+    top = 0
+    while done < total:
+        box = (0, top, img.width, min(top + rows, img.height))
+        pixels = np.array(img.crop(box))  # writable copy of one band, uint8 or uint16
+        written = _embed_strip(pixels, count, place, top * img.width * count)
+        if written:
+            img.paste(Image.fromarray(pixels), box)
+        done += written
+        top += rows
+        report(progress, min(top, img.height), img.height)
     img.save(output_path, format="PNG")
-    messagebox.showinfo("Success", f"Message hidden successfully in {output_path}")
+    report(progress, img.height, img.height)
+
+
+def _carrier_chunks(image_path):
+    """Return (carrier values, chunks), the chunks yielding the flat carrier channels band by band."""
+    mode, width, height, bands = _bands(image_path)
+    count = CARRIER_CHANNELS[mode]
+    return width * height * count, (_channels(pixels, count).reshape(-1) for pixels in bands)
+
+
+def carrier_bands(image_path):
+    """Return (carrier values, bits per value, bands) for steganalysis.
+
+    The bands yield the carrier channels top to bottom as arrays of shape (rows, width, channels),
+    whose flat order is the embedding order.
+    """
+    mode, width, height, bands = _bands(image_path)
+    count = CARRIER_CHANNELS[mode]
+    blocks = (pixels[..., :count] if pixels.ndim == 3 else pixels[..., None] for pixels in bands)
+    return width * height * count, 16 if mode == "I;16" else 8, blocks
+
+
+def _matrix_targets(image_path, binary_message, key=None):
+    """Return the sorted carrier positions whose LSBs matrix embedding flips, with their new LSBs.
+
+    The largest code the image has room for is used, so the fewest values change per message bit.
+    Only the bands holding the groups are read, or the whole image with a key.
+    """
+    size, chunks = _carrier_chunks(image_path)
+    code = choose_code(len(binary_message), size)
+    if key is None:
+        lsbs = BitStream(chunks).read_bits(covered_values(len(binary_message), code))
+        return flips(lsbs, binary_message, code)
+    return keyed_flips(pack_lsbs(chunks), key, size, binary_message, code)
+
+
+def _embed(image_path, binary_message, output_path, key=None, progress=None, depth=1, matrix=False):
+    """Write the bit array into the low depth bits of the carrier channels and save the image as PNG.
+
+    Without a key the bits fill the carrier from the first pixel, with a key they are spread over
+    the whole image at keyed pseudo-random positions. With matrix set the bits are the syndromes
+    of groups of LSBs instead (see Matrix). PNGs and uncompressed images (such as plain TIFF
+    scans) are streamed in strips, so memory use follows the strip size instead of the image
+    size; other formats are decoded whole.
+    """
+    # The header alone tells whether the message fits, so oversized messages skip the decode
+    size = capacity(image_path)
+    total = values_needed(binary_message, depth)
+    if total > size:
+        raise ValueError("Message too large to hide in this image.")
+    if matrix:
+        positions, bits = _matrix_targets(image_path, binary_message, key)
+        total = len(positions)
+
+        def place(carrier, offset):
+            return embed_at(carrier, offset, positions, bits)
+    else:
+        place = placer(binary_message, key, size, depth=depth)
+
+    png = open_png(image_path)
+    if png is not None and not png.copyable:
+        png = None  # chunks the stream cannot carry over: PIL re-encodes the image, keeping those it knows
+    raw = None if png is not None else open_raw(image_path)
+    with atomic_output(output_path) as partial_path:
+        if png is None and raw is None:
+            _embed_decoded(image_path, place, total, partial_path, progress)
+            return
+        with open(partial_path, 'wb') as file:
+            if png is not None:
+                _embed_png(png, place, total, file, progress)
+            else:
+                _embed_raw(raw, place, total, file, progress)
+
+
+def _decoded_bands(img, rows):
+    """Yield a decoded image a band of rows at a time."""
+    for top in range(0, img.height, rows):
+        yield np.asarray(img.crop((0, top, img.width, min(top + rows, img.height))))
+
+
+def _bands(image_path):
+    """Return (mode, width, height, bands), bands yielding the pixels top to bottom.
+
+    Like _embed, PNGs and uncompressed images are read a strip at a time.
+    """
+    png = open_png(image_path)
+    if png is not None:
+        rows = _band_rows(png.width, CARRIER_CHANNELS[png.mode])
+        return png.mode, png.width, png.height, (png.unfilter(block) for block in png.strips(rows))
+
+    raw = open_raw(image_path)
+    if raw is not None:
+        return raw.mode, raw.width, raw.height, raw.strips(_band_rows(raw.width, CARRIER_CHANNELS[raw.mode]))
+
+    img = _normalize(Image.open(image_path))
+    rows = _band_rows(img.width, CARRIER_CHANNELS[img.mode])
+    return img.mode, img.width, img.height, _decoded_bands(img, rows)
+
+
+def _extract(image_path, key=None, passphrase=None, progress=None, matrix=False):
+    """Read the hidden payload from the low bits of the carrier channels.
+
+    Without a key only as far as the payload reaches; keyed bits are spread over the whole image,
+    so its low bit planes are read once, packed. Images read to the end are kept in the decode
+    cache (see Cache), so extracting from them again with any method does not decode them again.
+    """
+    cached = cached_plane(image_path, "image")
+    if cached is not None:
+        return decode_plane(*cached, key, passphrase, matrix)
+    size, chunks = _carrier_chunks(image_path)
+    chunks = track(chunks, size, progress)
+    if key is not None:
+        plane = pack_lsbs(chunks, MAX_DEPTH)
+        keep_plane(image_path, "image", size, plane)
+        return decode_plane(size, plane, key, passphrase, matrix)
+    if not PLANES.fits(size):
+        return (decode_matrix if matrix else decode_payload)(chunks, passphrase=passphrase)
+    writer = PlaneWriter(MAX_DEPTH)
+    message = (decode_matrix if matrix else decode_payload)(writer.tee(chunks), passphrase=passphrase)
+    if writer.values == size:
+        keep_plane(image_path, "image", size, writer.plane())
+    return message
+
+
+# Carrier channels per PNG color type: gray, RGB, palette (embedded as RGB), gray + alpha, RGBA
+PNG_CHANNELS = {0: 1, 2: 3, 3: 3, 4: 1, 6: 3}
+CAPACITY_METHODS = ("lsb", "parity")
+
+
+def _png_header(image_path):
+    """Return (width, height, carrier channels) from a PNG's IHDR chunk, or None for other formats."""
+    with open(image_path, 'rb') as file:
+        head = file.read(26)  # signature, IHDR length and type, width, height, bit depth, color type
+    if len(head) < 26 or head[:8] != PNG_SIGNATURE or head[12:16] != b"IHDR":
+        return None
+    width, height, _, color_type = struct.unpack(">IIBB", head[16:26])
+    if color_type not in PNG_CHANNELS:
+        return None
+    return width, height, PNG_CHANNELS[color_type]
+
+
+def capacity(image_path, method="lsb"):
+    """Return the number of bits the image can carry; only the image header is read."""
+    if method not in CAPACITY_METHODS:
+        raise ValueError(f"Unknown image method: {method}")
+    header = _png_header(image_path)
+    if header is None:
+        # Other formats: PIL reads the header on open and decodes lazily
+        with Image.open(image_path) as img:
+            header = img.size + (CARRIER_CHANNELS[_carrier_mode(img)],)
+    width, height, channels = header
+    return width * height * channels
 
 
-def lsb_extract(image_path):
-    """Extract the hidden message using LSB."""
-    img = Image.open(image_path)
-    pixels = list(img.getdata())
+# LSB Steganography
+def lsb_hide(image_path, message, output_path, key=None, passphrase=None, fec=None, depth=1, progress=None):
+    """Hide the message (str or bytes) using LSB in PNG images.
 
-    binary_message = ""
-    for pixel in pixels:
-        for color in pixel[:3]:  # Extract R, G, B channels
-            binary_message += str(color & 1)
+    key spreads the bits over the image, passphrase encrypts the message and fec adds that many
+    error correction bytes per 255-byte block; all are optional. depth (1-4) is the number of low
+    bits per channel value that carry the message; extraction reads it from the header.
+    """
+    binary_message = encode_payload(message, passphrase, fec, depth)
+    _embed(image_path, binary_message, output_path, key, progress, depth)
 
-    hidden_message = ''.join(chr(int(binary_message[i:i + 8], 2)) for i in range(0, len(binary_message), 8))
-    end_index = hidden_message.find(END_MARKER)
-    if end_index != -1:
-        return hidden_message[:end_index]
-    return "No hidden message found!"
 
+def lsb_extract(image_path, key=None, passphrase=None, progress=None):
+    """Extract the hidden message using LSB, with the key and passphrase it was hidden with (if any)."""
+    return _extract(image_path, key, passphrase, progress)
 
-# Parity Steganography
-def parity_hide(image_path, message, output_path):
-    """Hide the message using parity bit manipulation in PNG images."""
-    message += END_MARKER
-    binary_message = ''.join(format(ord(char), '08b') for char in message)
-    img = Image.open(image_path)
-    pixels = list(img.getdata())
-
-    if len(binary_message) > len(pixels) * 3:
-        raise ValueError("Message too large to hide in this image.")
 
-    data_index = 0
-    new_pixels = []
-    for pixel in pixels:
-        if data_index < len(binary_message):
-            new_pixel = list(pixel)
-            for i in range(3):  # R, G, B channels
-                if data_index < len(binary_message):
-                    # Adjust parity: even or odd
-                    current_bit = int(binary_message[data_index])
-                    new_pixel[i] = (new_pixel[i] & ~1) | current_bit
-                    data_index += 1
-            new_pixels.append(tuple(new_pixel))
-        else:
-            new_pixels.append(pixel)
+# Parity Steganography
+def parity_hide(image_path, message, output_path, key=None, passphrase=None, fec=None, progress=None):
+    """Hide the message (str or bytes) in the parity of groups of channel values in PNG images.
 
-    img.putdata(new_pixels)
-    img.save(output_path, format="PNG")
-    messagebox.showinfo("Success", f"Message hidden successfully with parity in {output_path}")
-
-
-def parity_extract(image_path):
-    """Extract the hidden message using parity bit manipulation."""
-    img = Image.open(image_path)
-    pixels = list(img.getdata())
-
-    # Initialize the binary message
-    binary_message = ""
-
-    # Loop through all the pixels and all color channels (R, G, B)
-    for pixel in pixels:
-        for color in pixel[:3]:  # Check only R, G, B channels
-            binary_message += str(color & 1)  # Extract the LSB (parity bit) of each color channel
-
-    # Convert the binary message to string
-    hidden_message = ''.join(chr(int(binary_message[i:i + 8], 2)) for i in range(0, len(binary_message), 8))
-
-    # Check for the end marker and return the message
-    end_index = hidden_message.find(END_MARKER)
-    if end_index != -1:
-        return hidden_message[:end_index]
-    return "No hidden message found!"
-
-
-# GUI Application
-class ImageSteganoApp:
-    def __init__(self, root):
-        self.root = root
-        self.root.title("Image Steganography Tool")
-        self.root.configure(bg="black")
-        self.file_path = ""
-
-        # Title
-        self.title_label = tk.Label(root, text="Image Steganography Tool", fg="#00FF00", bg="black",
-                                    font=("Courier", 18, "bold"))
-        self.title_label.pack(pady=10)
-
-        # File Section
-        self.file_frame = tk.Frame(root, bg="black")
-        self.file_frame.pack(pady=5)
-
-        self.file_label = tk.Label(self.file_frame, text="Image File:", fg="#00FF00", bg="black")
-        self.file_label.grid(row=0, column=0)
-        self.file_entry = tk.Entry(self.file_frame, width=40)
-        self.file_entry.grid(row=0, column=1)
-        self.file_button = tk.Button(self.file_frame, text="Browse", command=self.load_file, fg="black", bg="#00FF00")
-        self.file_button.grid(row=0, column=2)
-
-        # Message Section
-        self.msg_label = tk.Label(root, text="Secret Message:", fg="#00FF00", bg="black")
-        self.msg_label.pack()
-        self.msg_entry = tk.Text(root, height=5, width=50)
-        self.msg_entry.pack()
-
-        # Technique Selection
-        self.technique_label = tk.Label(root, text="Select Technique:", fg="#00FF00", bg="black")
-        self.technique_label.pack(pady=5)
-        self.technique_var = tk.StringVar(value="LSB")
-
-        self.lsb_rb = tk.Radiobutton(root, text="LSB", variable=self.technique_var, value="LSB", fg="#00FF00",
-                                     bg="black")
-        self.lsb_rb.pack()
-        self.parity_rb = tk.Radiobutton(root, text="Parity", variable=self.technique_var, value="PARITY", fg="#00FF00",
-                                        bg="black")
-        self.parity_rb.pack()
-
-        # Buttons
-        self.encrypt_button = tk.Button(root, text="Hide Message", command=self.encrypt, fg="black", bg="#00FF00")
-        self.encrypt_button.pack(pady=5)
-        self.decrypt_button = tk.Button(root, text="Retrieve Message", command=self.decrypt, fg="black", bg="#00FF00")
-        self.decrypt_button.pack(pady=5)
-
-        # Result Section
-        self.result_label = tk.Label(root, text="", fg="#00FF00", bg="black", font=("Courier", 12, "bold"))
-        self.result_label.pack()
-
-    def load_file(self):
-        self.file_path = filedialog.askopenfilename(filetypes=[("PNG files", "*.png")])
-        if self.file_path:
-            self.file_entry.delete(0, tk.END)
-            self.file_entry.insert(0, self.file_path)
-
-    def encrypt(self):
-        if not self.file_path:
-            messagebox.showerror("Error", "No image file selected!")
-            return
-        message = self.msg_entry.get("1.0", tk.END).strip()
-        if not message:
-            messagebox.showerror("Error", "No secret message entered!")
-            return
-        output_path = filedialog.asksaveasfilename(defaultextension=".png", filetypes=[("PNG files", "*.png")])
-        if not output_path:
-            return
+    Each group holds several message bits and changes at most one LSB (Hamming matrix
+    embedding), so far fewer values change than with lsb_hide while the message fits.
+    """
+    _embed(image_path, encode_payload(message, passphrase, fec), output_path, key, progress, matrix=True)
 
-        technique = self.technique_var.get()
-        try:
-            if technique == "LSB":
-                lsb_hide(self.file_path, message, output_path)
-            elif technique == "PARITY":
-                parity_hide(self.file_path, message, output_path)
-        except Exception as e:
-            messagebox.showerror("Error", str(e))
-
-    def decrypt(self):
-        if not self.file_path:
-            messagebox.showerror("Error", "No image file selected!")
-            return
 
-        technique = self.technique_var.get()
-        try:
-            if technique == "LSB":
-                message = lsb_extract(self.file_path)
-            elif technique == "PARITY":
-                message = parity_extract(self.file_path)
-            self.result_label.config(text=f"Hidden Message: {message}")
-        except Exception as e:
-            messagebox.showerror("Error", str(e))
+def parity_extract(image_path, key=None, passphrase=None, progress=None):
+    """Extract the hidden message using parity bit manipulation; the group size is found from the header."""
+    return _extract(image_path, key, passphrase, progress, matrix=True)
 
 
-# Run Application
 if __name__ == "__main__":
+    import tkinter as tk
+    from gui import ImageSteganoApp
+
     root = tk.Tk()
     app = ImageSteganoApp(root)
     root.mainloop()
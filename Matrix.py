@@ -0,0 +1,139 @@
+import itertools
+
+import numpy as np
+
+from Bits import CHUNK_SIZE, NOT_FOUND, extract_bits, group_bits, leading_values
+from Container import decode_payload
+from Fec import FRAME_BITS
+from Spread import Permutation, gather, sorted_targets
+
+# Matrix embedding with binary Hamming codes: a group of 2^code - 1 carrier values holds code
+# message bits as the syndrome of its LSBs, the XOR of the (1-based) indices of the odd values.
+# Any syndrome is reached by flipping at most one LSB per group, so with code 3 each change
+# carries 3.4 bits on average instead of the 2 of plain LSB embedding. Code 1 is plain LSB.
+# With a key each group is a block of adjacent values at a keyed position, so only one position
+# per group is computed.
+MAX_CODE = 7
+
+
+def group_size(code):
+    """Return the number of carrier values in one group of the code."""
+    return (1 << code) - 1
+
+
+def covered_values(bit_count, code):
+    """Return how many carrier values the groups holding bit_count bits take."""
+    return -(-bit_count // code) * group_size(code)
+
+
+# Leading carrier values that hold the container header whatever the code
+HEAD_VALUES = max(covered_values(FRAME_BITS, code) for code in range(1, MAX_CODE + 1))
+
+
+def choose_code(bit_count, size):
+    """Return the largest code whose groups fit bit_count bits into size carrier values, or 0."""
+    for code in range(MAX_CODE, 0, -1):
+        if covered_values(bit_count, code) <= size:
+            return code
+    return 0
+
+
+def _syndromes(lsbs, code):
+    """Return the syndrome of each group of LSBs as one code-bit value per group."""
+    groups = lsbs.reshape(-1, group_size(code))
+    indices = np.arange(1, group_size(code) + 1, dtype=np.uint8)
+    return np.bitwise_xor.reduce(groups * indices, axis=1)
+
+
+def syndrome_bits(lsbs, code):
+    """Return the message bits held by whole groups of LSBs, most significant first per group."""
+    syndromes = _syndromes(lsbs, code)
+    return np.unpackbits(syndromes[:, None], axis=1)[:, 8 - code:].reshape(-1)
+
+
+def flips(lsbs, bits, code):
+    """Return (indices, new LSBs) of the values to flip so the groups of lsbs hold bits.
+
+    lsbs holds at least covered_values(len(bits), code) values; at most one index per group is
+    returned, in ascending order.
+    """
+    wanted = group_bits(bits, code)
+    size = group_size(code)
+    differ = _syndromes(lsbs[:len(wanted) * size], code) ^ wanted
+    changed = np.flatnonzero(differ)
+    # Flipping the value at index d toggles syndrome bits d, so the difference names the value
+    indices = changed * size + differ[changed].astype(np.int64) - 1
+    return indices, lsbs[indices] ^ 1
+
+
+def matrix_chunks(chunks, code):
+    """Yield the message bits held by consecutive groups of carrier values, chunk by chunk."""
+    size = group_size(code)
+    leftover = np.empty(0, dtype=np.uint8)  # LSBs of a group split across chunks
+    for chunk in chunks:
+        lsbs = np.concatenate((leftover, extract_bits(chunk)))
+        usable = len(lsbs) - len(lsbs) % size
+        leftover = lsbs[usable:]
+        yield syndrome_bits(lsbs[:usable], code)
+
+
+def _keyed_blocks(plane, key, size, code, count=None, depth=1):
+    """Yield (block indices, LSBs) of the first count keyed groups of a packed plane, a chunk at a time."""
+    group = group_size(code)
+    permutation = Permutation(key, size // group)
+    count = permutation.size if count is None else count
+    offsets = np.arange(group)
+    step = max(CHUNK_SIZE // group, 1)
+    # The groups holding the header come first on their own, so trying a code that does not match
+    # computes only their positions
+    head = min(-(-FRAME_BITS // code), count)
+    for start, stop in itertools.chain([(0, head)] if head else [],
+                                       ((start, min(start + step, count)) for start in range(head, count, step))):
+        blocks = permutation.positions(start, stop)
+        yield blocks, gather(plane, (blocks[:, None] * group + offsets).reshape(-1), depth) & 1
+
+
+def keyed_flips(plane, key, size, bits, code):
+    """Return the sorted carrier positions and new LSBs that hide bits in the keyed groups of a plane.
+
+    plane is the packed LSB plane of a carrier of size values, as from pack_lsbs().
+    """
+    group = group_size(code)
+    positions, values = [], []
+    start = 0
+    for blocks, lsbs in _keyed_blocks(plane, key, size, code, -(-len(bits) // code)):
+        stop = start + len(blocks)
+        indices, new = flips(lsbs, bits[start * code:stop * code], code)
+        positions.append(blocks[indices // group] * group + indices % group)
+        values.append(new)
+        start = stop
+    return sorted_targets(np.concatenate(positions), np.concatenate(values))
+
+
+def decode_keyed(plane, key, size, passphrase=None, depth=1):
+    """Read a container hidden by keyed matrix embedding from the packed plane of a carrier.
+
+    plane holds the low depth bits of each carrier value, as from pack_lsbs(); only the LSBs are read.
+    """
+    for code in range(MAX_CODE, 0, -1):
+        lsbs = (lsbs for _, lsbs in _keyed_blocks(plane, key, size, code, depth=depth))
+        message = decode_payload(matrix_chunks(lsbs, code), legacy=False, passphrase=passphrase)
+        if message != NOT_FOUND:
+            return message
+    return NOT_FOUND
+
+
+def decode_matrix(chunks, legacy=True, passphrase=None):
+    """Read a container hidden by matrix embedding from carrier chunks.
+
+    The code is found by trying each on the leading values, which hold the header for any code.
+    Code 1 goes last: it reads plain LSB messages and may fall back to the END_MARKER format.
+    """
+    chunks = iter(chunks)
+    head = leading_values(chunks, HEAD_VALUES)
+    for code in range(MAX_CODE, 0, -1):
+        message = decode_payload(matrix_chunks(itertools.chain([head], chunks), code), legacy and code == 1,
+                                 passphrase)
+        if message != NOT_FOUND:
+            return message
+    return NOT_FOUND
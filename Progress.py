@@ -0,0 +1,49 @@
+import contextlib
+import os
+
+
+class Cancelled(Exception):
+    """Raised from a progress callback to stop a running hide or extract."""
+
+
+def report(progress, done, total):
+    """Call the progress callback, if there is one, with the work done so far."""
+    if progress is not None:
+        progress(done, total)
+
+
+def part(progress, start, share, total):
+    """Return a callback reporting one part of an operation of total work, worth share and starting at start.
+
+    The part reports its own done and total, which are scaled into the whole operation.
+    """
+    if progress is None:
+        return None
+    return lambda done, of: report(progress, start + share * done / max(of, 1), total)
+
+
+def track(chunks, total, progress):
+    """Yield carrier chunks, reporting how many values have been handed out so far."""
+    done = 0
+    for chunk in chunks:
+        done += chunk.size
+        report(progress, done, total)
+        yield chunk
+
+
+@contextlib.contextmanager
+def atomic_output(output_path):
+    """Yield a temporary path next to output_path and move it into place only on success.
+
+    The temporary name keeps the extension, so writers that pick the format from it still work.
+    """
+    root, extension = os.path.splitext(output_path)
+    partial_path = f"{root}.partial{extension}"
+    try:
+        yield partial_path
+        os.replace(partial_path, output_path)
+    except BaseException:
+        # Cancelled or failed: never leave a half-written carrier behind
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+        raise
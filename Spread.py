@@ -0,0 +1,139 @@
+import hashlib
+
+import numpy as np
+
+from Bits import CHUNK_SIZE, embed_bits, group_bits, values_needed
+
+ROUNDS = 4  # Feistel rounds; four make a keyed pseudo-random permutation
+
+
+class Permutation:
+    """Keyed pseudo-random permutation of range(size), computed for any indices on demand.
+
+    A Feistel network over the smallest even number of bits covering size, with cycle walking
+    to stay below size, maps index i to position perm(i). Nothing of size size is allocated,
+    so the first few positions of a huge carrier cost only as much as computing them.
+    """
+
+    def __init__(self, key, size, tweak=b""):
+        if isinstance(key, str):
+            key = key.encode("utf-8")
+        self.size = size
+        self._half = max((max(size - 1, 1).bit_length() + 1) // 2, 1)
+        self._mask = np.uint32((1 << self._half) - 1)  # halves have at most 32 bits
+        digest = hashlib.sha256(tweak + b"\x00" + key).digest()
+        self._keys = np.frombuffer(digest, dtype="<u4")[:ROUNDS]
+
+    def _round(self, right, key):
+        """Mix one half block with a round key (MurmurHash3 finalizer, in uint32 arithmetic)."""
+        z = right ^ key
+        z ^= z >> np.uint32(16)
+        z *= np.uint32(0x85EBCA6B)
+        z ^= z >> np.uint32(13)
+        z *= np.uint32(0xC2B2AE35)
+        z ^= z >> np.uint32(16)
+        return z & self._mask
+
+    def _encrypt(self, values):
+        half = np.uint64(self._half)
+        left = (values >> half).astype(np.uint32)
+        right = (values & np.uint64(self._mask)).astype(np.uint32)
+        for key in self._keys:
+            left, right = right, left ^ self._round(right, key)
+        return (left.astype(np.uint64) << half) | right
+
+    def __call__(self, indices):
+        """Return the positions of the given indices as an int64 array."""
+        values = self._encrypt(np.asarray(indices, dtype=np.uint64))
+        # The network permutes up to 4x size values; re-encrypt the ones that land outside
+        outside = np.flatnonzero(values >= self.size)
+        while outside.size:
+            values[outside] = self._encrypt(values[outside])
+            outside = outside[values[outside] >= self.size]
+        return values.astype(np.int64)
+
+    def positions(self, start, stop):
+        """Return the positions of indices start to stop."""
+        return self(np.arange(start, stop, dtype=np.uint64))
+
+
+def placer(binary_message, key=None, size=0, tweak=b"", depth=1):
+    """Return place(carrier, offset), which embeds the message bits that belong in one carrier slice.
+
+    carrier is a flat slice starting at carrier position offset; place returns how many carrier
+    values it wrote, each holding depth bits. Without a key the message fills the carrier from its
+    start, with a key its values go to keyed pseudo-random positions spread over a carrier of size
+    values.
+    """
+    if key is None:
+        def place(carrier, offset):
+            bits = binary_message[offset * depth:(offset + carrier.size) * depth]
+            embed_bits(carrier, bits, depth)
+            return values_needed(bits, depth)
+        return place
+
+    values = group_bits(binary_message, depth)
+    positions, values = sorted_targets(Permutation(key, size, tweak).positions(0, len(values)), values, depth)
+    return lambda carrier, offset: embed_at(carrier, offset, positions, values, depth)
+
+
+def sorted_targets(positions, values, depth=1):
+    """Return the carrier positions of the depth-bit values and the values themselves, ordered by position.
+
+    Sorted targets let a carrier read in order (strips, chunks) take its values with two searches.
+    """
+    # Sorting position << depth | value keeps each value with its position and beats an argsort
+    targets = (positions << depth) | values
+    targets.sort()
+    return targets >> depth, (targets & ((1 << depth) - 1)).astype(np.uint8)
+
+
+def embed_at(carrier, offset, positions, values, depth=1):
+    """Write the sorted target values that fall into a flat carrier slice starting at offset.
+
+    Returns how many carrier values were written.
+    """
+    start, stop = np.searchsorted(positions, (offset, offset + carrier.size))
+    if start == stop:
+        return 0
+    targets = positions[start:stop] - offset
+    current = carrier[targets]
+    carrier[targets] = current ^ ((current ^ values[start:stop]) & ((1 << depth) - 1))
+    return stop - start
+
+
+def gather(plane, positions, depth=1):
+    """Read the depth-bit values at the given carrier positions of a packed plane from pack_lsbs()."""
+    if 8 % depth == 0:
+        # Values never straddle a byte: one lookup and shift each
+        per_byte = 8 // depth
+        shifts = (depth * (per_byte - 1 - positions % per_byte)).astype(np.uint8)
+        return (plane[positions // per_byte] >> shifts) & ((1 << depth) - 1)
+    values = np.zeros(len(positions), dtype=np.uint8)
+    for bit in range(depth):
+        index = positions * depth + bit
+        values = (values << 1) | ((plane[index >> 3] >> (7 - (index & 7)).astype(np.uint8)) & 1)
+    return values
+
+
+def plane_chunks(plane, size, chunk_size=CHUNK_SIZE, depth=1):
+    """Yield the first size values of a packed plane in carrier order, chunk_size values at a time."""
+    per_byte = 8 // depth
+    whole = 8 % depth == 0 and chunk_size % per_byte == 0
+    shifts = depth * np.arange(per_byte - 1, -1, -1)
+    # The values each byte unpacks to, as one word, so a lookup moves whole rows
+    table = ((np.arange(256)[:, None] >> shifts) & ((1 << depth) - 1)).astype(np.uint8)
+    table = table.view(f"u{per_byte}").reshape(-1) if whole else None
+    for start in range(0, size, chunk_size):
+        stop = min(start + chunk_size, size)
+        if whole:
+            # Chunks start on a byte, so they unpack byte by byte
+            yield table[plane[start // per_byte:-(-stop // per_byte)]].view(np.uint8)[:stop - start]
+        else:
+            yield gather(plane, np.arange(start, stop), depth)
+
+
+def keyed_chunks(plane, permutation, chunk_size=CHUNK_SIZE, depth=1):
+    """Yield the values of a packed plane in keyed order, chunk_size values at a time."""
+    for start in range(0, permutation.size, chunk_size):
+        yield gather(plane, permutation.positions(start, min(start + chunk_size, permutation.size)), depth)
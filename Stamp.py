@@ -0,0 +1,148 @@
+import collections
+import hashlib
+import json
+import os
+
+from Batch import run_batch
+from Progress import atomic_output
+
+# Incremental stamping of a tree of HTML files. A JSON manifest records, per file, the SHA-256 of
+# the source, the payload it was stamped with, the stamp written (the method and what its insert
+# function returned) and the size and modification time of the source and output. A file whose
+# source, payload and output are all unchanged is skipped; the size and modification time spare
+# hashing sources that were not touched.
+HTML_EXTENSIONS = (".html", ".htm")
+MANIFEST_NAME = ".stamp-manifest.json"
+MANIFEST_VERSION = 1
+HASH_BLOCK = 1 << 20  # Bytes read per step while hashing
+
+# Outcome of one file: its path relative to the tree, "stamped" or "unchanged", and the error
+# message (None when it succeeded)
+StampResult = collections.namedtuple("StampResult", ["path", "status", "error"])
+
+
+def file_digest(path):
+    """Return the SHA-256 of a file as hex, reading it a block at a time."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(HASH_BLOCK), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def payload_digest(method, message, passphrase=None):
+    """Return the SHA-256 naming a payload: the method, the message and the passphrase."""
+    digest = hashlib.sha256()
+    for part in (method, message, passphrase or ""):
+        data = part.encode("utf-8") if isinstance(part, str) else part
+        digest.update(len(data).to_bytes(8, "big") + data)
+    return digest.hexdigest()
+
+
+def _stat(path):
+    """Return [size, modification time in ns] of a file, or None if it does not exist."""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def html_files(source_dir, skip_dir=None):
+    """Yield the paths of the HTML files under source_dir relative to it, in a stable order.
+
+    skip_dir, such as an output directory inside the tree, is not walked.
+    """
+    skip_dir = skip_dir and os.path.realpath(skip_dir)
+    for dirpath, dirnames, filenames in os.walk(source_dir):
+        dirnames[:] = sorted(name for name in dirnames
+                             if os.path.realpath(os.path.join(dirpath, name)) != skip_dir)
+        for filename in sorted(filenames):
+            if os.path.splitext(filename)[1].lower() in HTML_EXTENSIONS:
+                yield os.path.relpath(os.path.join(dirpath, filename), source_dir)
+
+
+def load_manifest(manifest_path):
+    """Return the file entries of a manifest, or none if it is missing or from another version."""
+    try:
+        with open(manifest_path, 'r', encoding="utf-8") as file:
+            manifest = json.load(file)
+    except FileNotFoundError:
+        return {}
+    if manifest.get("version") != MANIFEST_VERSION:
+        return {}
+    return manifest["files"]
+
+
+def save_manifest(manifest_path, files):
+    """Write the file entries to the manifest, replacing it only once it is complete."""
+    with atomic_output(manifest_path) as partial_path:
+        with open(partial_path, 'w', encoding="utf-8") as file:
+            json.dump({"version": MANIFEST_VERSION, "files": files}, file, indent=1, sort_keys=True)
+
+
+def stamp_file(insert, removers, source_path, output_path, method, message, passphrase, payload, entry):
+    """Stamp one file unless its manifest entry shows it is up to date.
+
+    Returns (status, new manifest entry). Runs on a worker thread.
+    """
+    source_stat = _stat(source_path)
+    digest = None
+    if entry and entry["payload"] == payload and entry["output"] == _stat(output_path):
+        if entry["source_stat"] == source_stat:
+            return "unchanged", entry
+        # Touched, perhaps rewritten by the build: only the content decides
+        digest = file_digest(source_path)
+        if digest == entry["source"]:
+            return "unchanged", dict(entry, source_stat=source_stat)
+
+    digest = digest or file_digest(source_path)
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    in_place = os.path.realpath(source_path) == os.path.realpath(output_path)
+    stamp = entry and entry.get("stamp")
+    if in_place and stamp and stamp[0] in removers:
+        # Only the exact stamp recorded is taken out; a file rewritten since no longer has it
+        removers[stamp[0]](source_path, source_path, stamp[1])
+    added = insert(source_path, message, output_path, passphrase=passphrase)
+    output_stat = _stat(output_path)
+    # Stamped in place, the source now is the output
+    return "stamped", {"source": digest, "source_stat": output_stat if in_place else source_stat,
+                       "payload": payload, "output": output_stat,
+                       "stamp": None if added is None else [method, added]}
+
+
+def stamp_tree(source_dir, message, insert, method, output_dir=None, passphrase=None, manifest_path=None,
+               workers=None, removers=None):
+    """Stamp every HTML file under source_dir that changed since the last run and yield a StampResult each.
+
+    insert is a Txt *_insert_file function and method its name, recorded with the payload.
+    removers maps methods to the Txt *_remove_file function taking out what their insert function
+    returned: stamping in place, the stamp the manifest records for a file is taken out first, so
+    a file never carries two. Nothing else is removed, so a file without an entry keeps what it
+    has. Whitespace stamps need no remover, as whitespace_insert_file() replaces all trailing
+    whitespace.
+    Outputs keep their place in the tree under output_dir, or replace the sources without one.
+    The manifest (by default in the output directory) is rewritten when the run ends; files that
+    failed or no longer exist are left out of it, so they are processed again next time.
+    Files are processed on a thread pool of workers threads, as the work is mostly file I/O.
+    """
+    output_dir = output_dir or source_dir
+    manifest_path = manifest_path or os.path.join(output_dir, MANIFEST_NAME)
+    entries = load_manifest(manifest_path)
+    payload = payload_digest(method, message, passphrase)
+    removers = removers or {}
+    jobs = ((insert, removers, os.path.join(source_dir, path), os.path.join(output_dir, path), method, message,
+             passphrase, payload, entries.get(path))
+            for path in html_files(source_dir, None if output_dir == source_dir else output_dir))
+
+    files = {}
+    try:
+        for result in run_batch(stamp_file, jobs, workers=workers, threads=True):
+            path = os.path.relpath(result.job[2], source_dir)
+            if result.error is not None:
+                yield StampResult(path, None, result.error)
+                continue
+            status, files[path] = result.value
+            yield StampResult(path, status, None)
+    finally:
+        save_manifest(manifest_path, files)
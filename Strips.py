@@ -0,0 +1,243 @@
+import struct
+import zlib
+
+import numpy as np
+from PIL import Image
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+# (bit depth, color type) of the PNGs that can be streamed -> (PIL mode, PIL raw mode)
+PNG_MODES = {
+    (8, 0): ("L", "L"),
+    (16, 0): ("I;16", "I;16B"),
+    (8, 2): ("RGB", "RGB"),
+    (8, 4): ("LA", "LA"),
+    (8, 6): ("RGBA", "RGBA"),
+}
+READ_SIZE = 1 << 16  # Compressed bytes read from the file per step
+# Chunks besides the image data that stay valid when only pixel LSBs change, so a streamed PNG
+# keeps them: transparency, color management, resolution, background, text and Exif metadata
+COPY_CHUNKS = {b"PLTE", b"tRNS", b"iCCP", b"sRGB", b"gAMA", b"cHRM", b"sBIT", b"bKGD", b"pHYs", b"tEXt", b"zTXt",
+               b"iTXt", b"eXIf"}
+
+
+def _bytes_per_pixel(mode):
+    """Return the bytes per pixel of a PNG_MODES mode."""
+    return 2 if mode == "I;16" else Image.getmodebands(mode)
+
+
+def _raw_rows(pixels):
+    """Return pixel rows as PNG scanline bytes, one row per line of a uint8 array."""
+    if pixels.dtype.itemsize == 2:
+        pixels = pixels.astype(">u2")  # PNG stores 16-bit samples big-endian
+    return pixels.reshape(len(pixels), -1).view(np.uint8)
+
+
+class PngReader:
+    """Read a non-interlaced PNG a strip of rows at a time, decoding only the strips asked for."""
+
+    def __init__(self, path, width, height, mode, rawmode, data_offset, leading=(), trailing=(), copyable=True):
+        self.path = path
+        self.width = width
+        self.height = height
+        self.mode = mode
+        self.rawmode = rawmode
+        self._data_offset = data_offset
+        # COPY_CHUNKS before and after the image data as (type, data), and whether the file has no
+        # other chunks, so PngWriter can reproduce it
+        self.leading = leading
+        self.trailing = trailing
+        self.copyable = copyable
+        self._stride = width * _bytes_per_pixel(mode)
+        self._previous = bytes(self._stride)  # unfiltered row above the next strip
+
+    def _idat(self):
+        """Yield the compressed image data, READ_SIZE bytes at a time."""
+        with open(self.path, 'rb') as file:
+            file.seek(self._data_offset)
+            while True:
+                length, kind = struct.unpack(">I4s", file.read(8))
+                if kind == b"IEND":
+                    return
+                if kind != b"IDAT":
+                    file.seek(length + 4, 1)
+                    continue
+                while length:
+                    data = file.read(min(length, READ_SIZE))
+                    if not data:
+                        raise ValueError("PNG image data is truncated.")
+                    length -= len(data)
+                    yield data
+                file.seek(4, 1)  # CRC
+
+    def strips(self, rows):
+        """Yield the filtered scanlines (filter byte + row) of up to rows rows at a time."""
+        line = self._stride + 1
+        size = rows * line
+        decompressor = zlib.decompressobj()
+        pending = b""
+        for data in self._idat():
+            # max_length keeps the inflated backlog at one strip however well the data compresses
+            while data:
+                pending += decompressor.decompress(data, size)
+                data = decompressor.unconsumed_tail
+                while len(pending) >= size:
+                    yield pending[:size]
+                    pending = pending[size:]
+        pending += decompressor.flush()
+        pending = pending[:(len(pending) // line) * line]
+        for start in range(0, len(pending), size):
+            yield pending[start:start + size]
+
+    def unfilter(self, block):
+        """Decode one strip from strips() into a pixel array.
+
+        Filters refer to the row above, so strips have to be unfiltered in order from the first.
+        """
+        count = len(block) // (self._stride + 1)
+        # Let PIL's PNG decoder undo the filters, with the previous row in front as an unfiltered line
+        data = zlib.compress(b"\x00" + self._previous + block, 0)
+        strip = Image.frombytes(self.mode, (self.width, count + 1), data, "zip", self.rawmode)
+        pixels = np.asarray(strip)[1:]
+        self._previous = _raw_rows(pixels[-1:]).tobytes()
+        return pixels
+
+
+def _chunks(file):
+    """Return (chunks before the image data, chunks after it, whether all others are COPY_CHUNKS).
+
+    file is positioned after IHDR; only the chunk headers are read, besides the COPY_CHUNKS.
+    """
+    leading, trailing = [], []
+    copyable = True
+    seen_data = False
+    while True:
+        header = file.read(8)
+        if len(header) < 8:
+            raise ValueError("PNG file is truncated.")
+        length, kind = struct.unpack(">I4s", header)
+        if kind == b"IEND":
+            return leading, trailing, copyable
+        if kind == b"IDAT":
+            seen_data = True
+        elif kind in COPY_CHUNKS:
+            (trailing if seen_data else leading).append((kind, file.read(length)))
+            file.seek(4, 1)  # CRC
+            continue
+        else:
+            copyable = False
+        file.seek(length + 4, 1)
+
+
+def open_png(path):
+    """Return a PngReader for path, or None if it is not a PNG that can be read in strips."""
+    with open(path, 'rb') as file:
+        head = file.read(33)  # signature, IHDR length, type and data, CRC
+        if len(head) < 33 or head[:8] != PNG_SIGNATURE or head[12:16] != b"IHDR":
+            return None
+        width, height, depth, color_type, _, _, interlace = struct.unpack(">IIBBBBB", head[16:29])
+        if interlace or (depth, color_type) not in PNG_MODES:
+            return None
+        leading, trailing, copyable = _chunks(file)
+    mode, rawmode = PNG_MODES[depth, color_type]
+    return PngReader(path, width, height, mode, rawmode, 33, leading, trailing, copyable)
+
+
+class RawReader:
+    """Read an uncompressed image (e.g. a TIFF without compression) a strip of rows at a time."""
+
+    def __init__(self, path, width, height, mode, dtype, offset):
+        self.path = path
+        self.width = width
+        self.height = height
+        self.mode = mode
+        self._dtype = np.dtype(dtype)
+        self._offset = offset
+        bands = Image.getmodebands(mode)
+        self._shape = (width, bands) if bands > 1 else (width,)
+        self._row_values = width * bands
+
+    def strips(self, rows):
+        """Yield writable pixel arrays of up to rows rows, top to bottom."""
+        with open(self.path, 'rb') as file:
+            file.seek(self._offset)
+            for top in range(0, self.height, rows):
+                count = min(rows, self.height - top) * self._row_values
+                pixels = np.fromfile(file, dtype=self._dtype, count=count)
+                if pixels.size < count:
+                    raise ValueError("Image data is truncated.")
+                yield pixels.reshape((-1,) + self._shape)
+
+
+def open_raw(path):
+    """Return a RawReader for path, or None if it is not an uncompressed image that can be read in strips.
+
+    That takes a single top-down raw tile, as PIL reports for TIFFs without compression, in one
+    of the PNG_MODES modes.
+    """
+    with Image.open(path) as img:
+        if img.mode not in {mode for mode, _ in PNG_MODES.values()} or len(img.tile) != 1:
+            return None
+        codec, extents, offset, args = img.tile[0]
+        if codec != "raw" or tuple(extents) != (0, 0) + img.size:
+            return None
+        rawmode, stride, orientation = args if isinstance(args, tuple) else (args, 0, 1)
+        if stride or orientation != 1:
+            return None
+        dtype = {"I;16": "<u2", "I;16B": ">u2"}.get(rawmode)
+        if dtype is None and rawmode != img.mode:
+            return None
+        return RawReader(path, img.width, img.height, img.mode, dtype or np.uint8, offset)
+
+
+def _chunk(file, kind, data):
+    """Write one PNG chunk."""
+    file.write(struct.pack(">I", len(data)) + kind + data)
+    file.write(struct.pack(">I", zlib.crc32(kind + data)))
+
+
+class PngWriter:
+    """Write a PNG a strip of rows at a time.
+
+    chunks, as (type, data), are written before the image data, such as PngReader.leading.
+    """
+
+    def __init__(self, file, width, height, mode, chunks=()):
+        depth, color_type = next(key for key, value in PNG_MODES.items() if value[0] == mode)
+        self._file = file
+        self._previous = np.zeros((1, width * _bytes_per_pixel(mode)), dtype=np.uint8)  # last row written
+        self._compressor = zlib.compressobj()
+        file.write(PNG_SIGNATURE)
+        _chunk(file, b"IHDR", struct.pack(">IIBBBBB", width, height, depth, color_type, 0, 0, 0))
+        for kind, data in chunks:
+            _chunk(file, kind, data)
+
+    def _write(self, data):
+        data = self._compressor.compress(data)
+        if data:
+            _chunk(self._file, b"IDAT", data)
+
+    def write_pixels(self, pixels):
+        """Write a strip of pixel rows, each one with the Up filter."""
+        raw = _raw_rows(pixels)
+        lines = np.empty((len(raw), raw.shape[1] + 1), dtype=np.uint8)
+        # Once LSBs carry payload, adaptive filtering compresses no better than Up and costs far more
+        lines[:, 0] = 2
+        np.subtract(raw, np.vstack((self._previous, raw[:-1])), out=lines[:, 1:])
+        self._write(lines.tobytes())
+        self._previous = raw[-1:]
+
+    def write_filtered(self, block):
+        """Copy scanlines filtered by PngReader.strips() without decoding them.
+
+        Filters refer to the row above, so this is only valid while every row written so far is
+        identical to the source image; write_pixels() cannot follow it.
+        """
+        self._write(block)
+        self._previous = None
+
+    def close(self, chunks=()):
+        """Finish the image data and write the end of the file, with chunks after the image data."""
+        _chunk(self._file, b"IDAT", self._compressor.flush())
+        for kind, data in chunks:
+            _chunk(self._file, kind, data)
+        _chunk(self._file, b"IEND", b"")
@@ -1,146 +1,485 @@
-import tkinter as tk
-from tkinter import filedialog, messagebox
+import base64
+import binascii
+import contextlib
+import mmap
+import os
 import re
 
+import numpy as np
+
+from Bits import CHUNK_SIZE, NOT_FOUND
+from Container import HEADER, decode_payload, seal, unseal
+from Progress import atomic_output
+
 # Utility Functions for Steganography
 
-def comment_insert(html_content, secret_message):
-    """Insert the message into an HTML comment."""
+def _sealed_text(secret_message, passphrase):
+    """Return the text to embed: the message itself, or the base64 of its encrypted container."""
+    if passphrase is None:
+        return secret_message
+    return base64.b64encode(seal(secret_message, passphrase)).decode("ascii")
+
+
+def _opened_texts(texts, passphrase):
+    """Return the extracted texts, or with a passphrase the messages decrypted from them."""
+    if passphrase is None:
+        return texts
+    messages = []
+    for text in texts:
+        try:
+            data = base64.b64decode(text.strip(), validate=True)
+        except binascii.Error:
+            continue  # an ordinary comment or tag, not a hidden container
+        message = unseal(data, passphrase)
+        if message != NOT_FOUND:
+            messages.append(message if isinstance(message, str) else message.decode("utf-8", "replace"))
+    return messages
+
+
+def _patterns(start, end):
+    """Compile the str and bytes patterns for the text between start and the next end marker."""
+    pattern = f"{re.escape(start)}(.*?){re.escape(end)}"
+    return re.compile(pattern, re.DOTALL), re.compile(pattern.encode("utf-8"), re.DOTALL)
+
+
+# Compiled once; the bytes patterns scan memory-mapped files without decoding them
+COMMENT = _patterns("<!--", "-->")
+INVISIBLE_TAG = _patterns('<div style="display:none;">', "</div>")
+BODY_END = "</body>"
+COPY_SIZE = 1 << 20  # Bytes copied per step when a file is rewritten
+
+
+def _joined(messages, missing):
+    """Return the extracted messages one per line, or the missing text if there are none."""
+    return "\n".join(messages) if messages else missing
+
+
+@contextlib.contextmanager
+def _mapped(html_path):
+    """Map an HTML file read-only, so scanning it never loads the whole document."""
+    with open(html_path, 'rb') as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            yield b""  # empty files cannot be mapped
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            yield data
+
+
+def _copy_with(html_path, output_path, inserted, before=None):
+    """Copy an HTML file block by block, with inserted placed before the last before marker.
+
+    Without a marker, or if the file has none, inserted is appended on a new line. Returns the
+    text added, line break included.
+    """
+    # The source is unmapped before atomic_output moves the copy over it, which Windows requires in place
+    with atomic_output(output_path) as partial_path, _mapped(html_path) as data:
+        position = -1 if before is None else data.rfind(before.encode("utf-8"))
+        if position == -1:
+            position, inserted = len(data), "\n" + inserted
+        else:
+            inserted += "\n"
+        with open(partial_path, 'wb') as output:
+            for start in range(0, position, COPY_SIZE):
+                output.write(data[start:min(start + COPY_SIZE, position)])
+            output.write(inserted.encode("utf-8"))
+            for start in range(position, len(data), COPY_SIZE):
+                output.write(data[start:start + COPY_SIZE])
+    return inserted
+
+
+def _copy_without(html_path, output_path, removed):
+    """Copy an HTML file block by block, leaving out the last occurrence of removed if it has one."""
+    removed = removed.encode("utf-8")
+    with atomic_output(output_path) as partial_path, _mapped(html_path) as data:
+        position = data.rfind(removed)
+        skipped = (position, position + len(removed)) if position != -1 else (len(data), len(data))
+        with open(partial_path, 'wb') as output:
+            for start in range(0, skipped[0], COPY_SIZE):
+                output.write(data[start:min(start + COPY_SIZE, skipped[0])])
+            for start in range(skipped[1], len(data), COPY_SIZE):
+                output.write(data[start:start + COPY_SIZE])
+
+
+def _scan_file(html_path, patterns):
+    """Return the decoded text of every match of a _patterns() pair in an HTML file."""
+    with _mapped(html_path) as data:
+        return [match.group(1).decode("utf-8", "replace") for match in patterns[1].finditer(data)]
+
+
+def _comment(text):
+    """Return text wrapped in an HTML comment."""
+    return f"<!-- {text} -->"
+
+
+def _hidden_tag(text):
+    """Return text wrapped in a tag that browsers do not display."""
+    return f'<div style="display:none;">{text}</div>'
+
+
+def _insert_before_body(html_content, inserted):
+    """Return html_content with inserted before the last closing body tag, or appended without one."""
+    # Only the last closing body tag ends the document; earlier ones may sit in scripts or comments
+    position = html_content.rfind(BODY_END)
+    if position == -1:
+        return html_content + f"\n{inserted}"
+    return f"{html_content[:position]}{inserted}\n{html_content[position:]}"
+
+
+def comment_insert(html_content, secret_message, passphrase=None):
+    """Insert the message into an HTML comment, encrypted if a passphrase is given."""
     # Ensure no duplicate comments
-    return html_content + f"\n<!-- {secret_message} -->"
+    return html_content + "\n" + _comment(_sealed_text(secret_message, passphrase))
 
 #khaled fadel comment
-def comment_extract(html_content):
+def comment_extract(html_content, passphrase=None):
     """Extract hidden message from an HTML comment."""
-    comments = re.findall(r'<!--(.*?)-->', html_content, re.DOTALL)
-    if comments:
-        return "\n".join([comment.strip() for comment in comments])
-    return "No hidden message found in comments!"
+    comments = [comment.strip() for comment in COMMENT[0].findall(html_content)]
+    return _joined(_opened_texts(comments, passphrase), "No hidden message found in comments!")
 
 
-def invisible_tag_insert(html_content, secret_message):
-    """Hide the message in an invisible HTML span."""
-    hidden_tag = f'<div style="display:none;">{secret_message}</div>'
-    # Ensure it gets added before the closing body tag
-    if "</body>" in html_content:
-        return html_content.replace("</body>", f"{hidden_tag}\n</body>")
-    else:
-        return html_content + f"\n{hidden_tag}"
+def invisible_tag_insert(html_content, secret_message, passphrase=None):
+    """Hide the message in an invisible HTML span, encrypted if a passphrase is given."""
+    return _insert_before_body(html_content, _hidden_tag(_sealed_text(secret_message, passphrase)))
 
 
-def invisible_tag_extract(html_content):
+def invisible_tag_extract(html_content, passphrase=None):
     """Extract hidden message from an invisible HTML tag."""
-    matches = re.findall(r'<div style="display:none;">(.*?)</div>', html_content, re.DOTALL)
-    if matches:
-        return "\n".join(matches)
-    return "No hidden message found in invisible tags!"
-
-
-# Main GUI Application
-class HTMLSteganoApp:
-    def __init__(self, root):
-        self.root = root
-        self.root.title("HTML Stegano Tool")
-        self.root.configure(bg="black")
-        self.html_content = ""
-        self.file_path = ""
-
-        # Title
-        self.title_label = tk.Label(root, text="HTML Steganography Tool", fg="#00FF00", bg="black", font=("Courier", 18, "bold"))
-        self.title_label.pack(pady=10)
-
-        # File Section
-        self.file_frame = tk.Frame(root, bg="black")
-        self.file_frame.pack(pady=5)
-
-        self.file_label = tk.Label(self.file_frame, text="HTML File:", fg="#00FF00", bg="black")
-        self.file_label.grid(row=0, column=0)
-        self.file_entry = tk.Entry(self.file_frame, width=40)
-        self.file_entry.grid(row=0, column=1)
-        self.file_button = tk.Button(self.file_frame, text="Browse", command=self.load_file, fg="black", bg="#00FF00")
-        self.file_button.grid(row=0, column=2)
-
-        # Message Section
-        self.msg_label = tk.Label(root, text="Secret Message:", fg="#00FF00", bg="black")
-        self.msg_label.pack()
-        self.msg_entry = tk.Text(root, height=5, width=50)
-        self.msg_entry.pack()
-
-        # Technique Selection
-        self.technique_label = tk.Label(root, text="Select Technique:", fg="#00FF00", bg="black")
-        self.technique_label.pack(pady=5)
-        self.technique_var = tk.StringVar(value="COMMENT")
-
-        self.comment_rb = tk.Radiobutton(root, text="HTML Comments", variable=self.technique_var, value="COMMENT", fg="#00FF00", bg="black")
-        self.comment_rb.pack()
-        self.invisible_rb = tk.Radiobutton(root, text="Invisible Tags", variable=self.technique_var, value="INVISIBLE", fg="#00FF00", bg="black")
-        self.invisible_rb.pack()
-
-        # Buttons
-        self.encrypt_button = tk.Button(root, text="Hide Message", command=self.encrypt, fg="black", bg="#00FF00")
-        self.encrypt_button.pack(pady=5)
-        self.decrypt_button = tk.Button(root, text="Retrieve Message", command=self.decrypt, fg="black", bg="#00FF00")
-        self.decrypt_button.pack(pady=5)
-
-        # Result Section
-        self.result_label = tk.Label(root, text="", fg="#00FF00", bg="black", font=("Courier", 12, "bold"))
-        self.result_label.pack()
-
-    def load_file(self):
-        self.file_path = filedialog.askopenfilename(filetypes=[("HTML files", "*.html")])
-        if self.file_path:
-            self.file_entry.delete(0, tk.END)
-            self.file_entry.insert(0, self.file_path)
-            with open(self.file_path, 'r') as file:
-                self.html_content = file.read()
-
-    def save_file(self, content):
-        save_path = filedialog.asksaveasfilename(defaultextension=".html", filetypes=[("HTML files", "*.html")])
-        if save_path:
-            with open(save_path, 'w') as file:
-                file.write(content)
-            messagebox.showinfo("Success", f"File saved at: {save_path}")
-
-    def encrypt(self):
-        if not self.html_content:
-            messagebox.showerror("Error", "No HTML file loaded!")
-            return
-        secret_message = self.msg_entry.get("1.0", tk.END).strip()
-        if not secret_message:
-            messagebox.showerror("Error", "No secret message entered!")
-            return
+    matches = INVISIBLE_TAG[0].findall(html_content)
+    return _joined(_opened_texts(matches, passphrase), "No hidden message found in invisible tags!")
 
-        technique = self.technique_var.get()
-        if technique == "COMMENT":
-            stego_html = comment_insert(self.html_content, secret_message)
-        elif technique == "INVISIBLE":
-            stego_html = invisible_tag_insert(self.html_content, secret_message)
-        else:
-            messagebox.showerror("Error", "Invalid technique selected!")
-            return
 
-        self.save_file(stego_html)
-        self.result_label.config(text="Message hidden successfully!")
+def text_remove(html_content, added):
+    """Remove the last occurrence of added, the text comment_insert_file() and the like returned.
 
-    def decrypt(self):
-        if not self.html_content:
-            messagebox.showerror("Error", "No HTML file loaded!")
-            return
+    Nothing else is touched, so comments and hidden tags of the page itself stay; without added
+    the document is returned as it is.
+    """
+    position = html_content.rfind(added)
+    if position == -1:
+        return html_content
+    return html_content[:position] + html_content[position + len(added):]
 
-        technique = self.technique_var.get()
-        if technique == "COMMENT":
-            secret_message = comment_extract(self.html_content)
-        elif technique == "INVISIBLE":
-            secret_message = invisible_tag_extract(self.html_content)
-        else:
-            messagebox.showerror("Error", "Invalid technique selected!")
+
+# Text techniques that leave no markup behind: the sealed container (see Container) is written as
+# zero-width characters, trailing whitespace or look-alike letters. Bytes are turned into text with
+# one str.translate table lookup each, and the text back into carrier values, read by
+# decode_payload like the values of any other carrier.
+ZERO_WIDTH = "\u200b\u200c\u200d\u2060"  # Each character holds 2 bits, most significant first
+ZERO_WIDTH_ENCODE = {byte: "".join(ZERO_WIDTH[(byte >> shift) & 3] for shift in (6, 4, 2, 0))
+                     for byte in range(256)}
+ZERO_WIDTH_VALUES = str.maketrans(ZERO_WIDTH, "\0\1\2\3")
+ZERO_WIDTH_BYTES = [char.encode("utf-8") for char in ZERO_WIDTH]
+# Runs shorter than a container header are ordinary text, such as joiners inside emoji
+ZERO_WIDTH_RUN = (re.compile(f"([{ZERO_WIDTH}]{{{HEADER.size * 4},}})"),
+                  re.compile(b"((?:" + b"|".join(ZERO_WIDTH_BYTES) + b"){%d,})" % (HEADER.size * 4)))
+
+WHITESPACE_ENCODE = {byte: format(byte, "08b").translate(str.maketrans("01", " \t")) for byte in range(256)}
+WHITESPACE_VALUES = str.maketrans(" \t", "\0\1")
+LINES_PER_CHUNK = 1 << 14  # Lines whose trailing whitespace is read per step during extraction
+
+# Latin letters and their Cyrillic look-alikes: a carrier letter holds 0 in Latin and 1 in Cyrillic
+HOMOGLYPHS = "AА BВ CС EЕ HН KК MМ OО PР TТ XХ aа cс eе iі jј oо pр sѕ xх yу"
+CODE_LIMIT = 0x500  # Every homoglyph has a lower code point; the last table entry is no carrier
+HOMOGLYPH_BIT = np.full(CODE_LIMIT, 2, dtype=np.uint8)  # 2 marks characters that are no carrier
+HOMOGLYPH_FORMS = np.tile(np.arange(CODE_LIMIT, dtype=np.uint32), (2, 1))  # Latin and Cyrillic form
+for _latin, _cyrillic in HOMOGLYPHS.split():
+    HOMOGLYPH_BIT[[ord(_latin), ord(_cyrillic)]] = 0, 1
+    HOMOGLYPH_FORMS[:, [ord(_latin), ord(_cyrillic)]] = [[ord(_latin)], [ord(_cyrillic)]]
+# Markup whose letters must stay as they are: scripts, styles, comments and tags, then entities.
+# Each pattern starts with a literal character, which lets re skip ahead to it quickly.
+MARKUP = re.compile(r"(<(?:(?i:script)\b.*?</(?i:script)\s*>|(?i:style)\b.*?</(?i:style)\s*>|!--.*?-->|[^>]*>))",
+                    re.DOTALL)
+ENTITY = re.compile(r"(&#?\w+;)")
+
+
+def _translated(data, table):
+    """Return the text for bytes, with the translate table giving the characters of each byte."""
+    return data.decode("latin-1").translate(table)
+
+
+def _carrier_values(text, table):
+    """Return the carrier values of text as a uint8 array, the translate table giving each value."""
+    return np.frombuffer(text.translate(table).encode("latin-1"), dtype=np.uint8)
+
+
+def _hidden_message(candidates, passphrase, missing):
+    """Return the first message read from the candidate carrier chunk iterables, as text, or the missing text."""
+    for chunks in candidates:
+        message = decode_payload(chunks, legacy=False, passphrase=passphrase)
+        if message != NOT_FOUND:
+            return message if isinstance(message, str) else message.decode("utf-8", "replace")
+    return missing
+
+
+def _zero_width_runs(data, starts, pattern):
+    """Yield the runs of zero-width characters in a str, or in bytes for the bytes pattern.
+
+    Zero-width characters are rare, so each is looked for with find(), much faster than a scan
+    with the pattern; the pattern is only matched where one is found.
+    """
+    nexts = {start: data.find(start) for start in starts}
+    position = 0
+    while True:
+        for start, index in nexts.items():
+            if -1 < index < position:
+                nexts[start] = data.find(start, position)
+        found = [index for index in nexts.values() if index != -1]
+        if not found:
             return
+        match = pattern.match(data, min(found))
+        if match:
+            yield match.group(1)
+            position = match.end()
+        else:
+            position = min(found) + 1
+
+
+def _zero_width(secret_message, passphrase):
+    return _translated(seal(secret_message, passphrase, depth=2), ZERO_WIDTH_ENCODE)
+
+
+def zero_width_insert(html_content, secret_message, passphrase=None):
+    """Hide the message as zero-width characters before the closing body tag, encrypted if a passphrase is given."""
+    return _insert_before_body(html_content, _zero_width(secret_message, passphrase))
+
+
+def zero_width_extract(html_content, passphrase=None):
+    """Extract the hidden message from runs of zero-width characters."""
+    runs = _zero_width_runs(html_content, ZERO_WIDTH, ZERO_WIDTH_RUN[0])
+    return _hidden_message(([_carrier_values(run, ZERO_WIDTH_VALUES)] for run in runs), passphrase,
+                           "No hidden message found in zero-width characters!")
+
+
+def _lines(text):
+    """Return (line ending, lines) of text; the ending is CRLF if the text has any."""
+    ending = "\r\n" if "\r\n" in text else "\n"
+    return ending, text.split(ending)
+
+
+def whitespace_insert(html_content, secret_message, passphrase=None):
+    """Hide the message in spaces and tabs at the ends of lines, one bit per character.
+
+    The bytes are shared out evenly over the lines. Trailing whitespace already in the text is
+    removed first; browsers do not display it.
+    """
+    encoded = _translated(seal(secret_message, passphrase), WHITESPACE_ENCODE)
+    ending, lines = _lines(html_content)
+    lines = [line.rstrip(" \t") for line in lines]
+    step = 8 * -(-len(encoded) // 8 // len(lines))  # whole bytes per line
+    for index in range(-(-len(encoded) // step)):
+        lines[index] += encoded[index * step:(index + 1) * step]
+    return ending.join(lines)
 
-        self.result_label.config(text=f"Hidden Message: {secret_message}")
+
+def whitespace_extract(html_content, passphrase=None):
+    """Extract the hidden message from the trailing whitespace of the lines."""
+    lines = _lines(html_content)[1]
+
+    def chunks():
+        # Read only as far as the payload reaches
+        for start in range(0, len(lines), LINES_PER_CHUNK):
+            trailing = "".join(line[len(line.rstrip(" \t")):] for line in lines[start:start + LINES_PER_CHUNK])
+            yield _carrier_values(trailing, WHITESPACE_VALUES)
+
+    return _hidden_message([chunks()], passphrase, "No hidden message found in trailing whitespace!")
+
+
+def _code_points(text):
+    return np.frombuffer(text.encode("utf-32-le"), dtype="<u4")
+
+
+def _homoglyph_bits(codes):
+    """Return the carrier value of each code point: 0 or 1 for carrier letters, 2 for other characters."""
+    return HOMOGLYPH_BIT[np.minimum(codes, CODE_LIMIT - 1)]
+
+
+def _homoglyph_positions(text, count):
+    """Return the positions of the first count carrier letters of text, reading it a chunk at a time."""
+    found = []
+    for start in range(0, len(text), CHUNK_SIZE):
+        if count <= 0:
+            break
+        positions = np.flatnonzero(_homoglyph_bits(_code_points(text[start:start + CHUNK_SIZE])) < 2)[:count]
+        found.append(positions + start)
+        count -= len(positions)
+    if count > 0:
+        raise ValueError("Message too large to hide in this text.")
+    return np.concatenate(found) if found else np.empty(0, dtype=np.int64)
+
+
+def _split_markup(html_content):
+    """Return the document as a list alternating text and markup, text first."""
+    parts = MARKUP.split(html_content)
+    if "&" not in html_content:
+        return parts
+    # Entities only need looking for in the text between tags
+    return [piece for index, part in enumerate(parts)
+            for piece in (ENTITY.split(part) if index % 2 == 0 and "&" in part else (part,))]
+
+
+def _homoglyph_forms(html_content, bits, current=None):
+    """Return html_content with its first len(bits) carrier letters in the form of each bit.
+
+    With current, the letters are only rewritten if they hold the current bits; otherwise, or if
+    the text has fewer letters, html_content is returned as it is.
+    """
+    parts = _split_markup(html_content)
+    text = "".join(parts[0::2])
+    try:
+        positions = _homoglyph_positions(text, len(bits))
+    except ValueError:
+        if current is None:
+            raise
+        return html_content
+    end = int(positions[-1]) + 1 if len(positions) else 0
+    codes = _code_points(text[:end]).copy()
+    if current is not None and not np.array_equal(_homoglyph_bits(codes[positions]), current):
+        return html_content
+    codes[positions] = HOMOGLYPH_FORMS[bits, np.minimum(codes[positions], CODE_LIMIT - 1)]
+    text = codes.tobytes().decode("utf-32-le") + text[end:]
+    # Cut the changed text back into the pieces between the markup
+    start = 0
+    for index in range(0, len(parts), 2):
+        size = len(parts[index])
+        parts[index] = text[start:start + size]
+        start += size
+    return "".join(parts)
+
+
+def _sealed_bits(sealed):
+    return np.unpackbits(np.frombuffer(sealed, dtype=np.uint8))
+
+
+def homoglyph_insert(html_content, secret_message, passphrase=None):
+    """Hide the message by writing Latin letters of the text in their Cyrillic look-alikes.
+
+    Each letter with a look-alike holds one bit; letters inside tags, scripts, styles, comments
+    and entities are left alone, so the page displays the same text.
+    """
+    return _homoglyph_forms(html_content, _sealed_bits(seal(secret_message, passphrase)))
+
+
+def homoglyph_remove(html_content, stamp):
+    """Write the letters of the stamp homoglyph_insert_file() reported back in Latin.
+
+    The stamp is the hex of the container written. The letters are only changed if they still
+    hold it, so a page rewritten since keeps its own Cyrillic letters.
+    """
+    bits = _sealed_bits(bytes.fromhex(stamp))
+    return _homoglyph_forms(html_content, np.zeros_like(bits), current=bits)
+
+
+def homoglyph_extract(html_content, passphrase=None):
+    """Extract the hidden message from the Latin and Cyrillic forms of the letters of the text."""
+    text = "".join(_split_markup(html_content)[0::2])
+
+    def chunks():
+        # Read only as far as the payload reaches
+        for start in range(0, len(text), CHUNK_SIZE):
+            values = _homoglyph_bits(_code_points(text[start:start + CHUNK_SIZE]))
+            yield values[values < 2]
+
+    return _hidden_message([chunks()], passphrase, "No hidden message found in homoglyphs!")
+
+
+# The same methods on HTML files, memory-mapped and copied a block at a time, so exports of
+# hundreds of MB are scanned in one pass without being read into memory
+def comment_insert_file(html_path, secret_message, output_path, passphrase=None):
+    """Write a copy of the HTML file with the message appended in a comment.
+
+    Returns the text added, which text_remove_file() takes out again.
+    """
+    return _copy_with(html_path, output_path, _comment(_sealed_text(secret_message, passphrase)))
+
+
+def comment_extract_file(html_path, passphrase=None):
+    """Extract the hidden message from the comments of an HTML file."""
+    comments = [comment.strip() for comment in _scan_file(html_path, COMMENT)]
+    return _joined(_opened_texts(comments, passphrase), "No hidden message found in comments!")
+
+
+def invisible_tag_insert_file(html_path, secret_message, output_path, passphrase=None):
+    """Write a copy of the HTML file with the message in an invisible tag before the closing body tag.
+
+    Returns the text added, which text_remove_file() takes out again.
+    """
+    return _copy_with(html_path, output_path, _hidden_tag(_sealed_text(secret_message, passphrase)), BODY_END)
+
+
+def invisible_tag_extract_file(html_path, passphrase=None):
+    """Extract the hidden message from the invisible tags of an HTML file."""
+    return _joined(_opened_texts(_scan_file(html_path, INVISIBLE_TAG), passphrase),
+                   "No hidden message found in invisible tags!")
+
+
+def zero_width_insert_file(html_path, secret_message, output_path, passphrase=None):
+    """Write a copy of the HTML file with the message in zero-width characters before the closing body tag.
+
+    Returns the text added, which text_remove_file() takes out again.
+    """
+    return _copy_with(html_path, output_path, _zero_width(secret_message, passphrase), BODY_END)
+
+
+def zero_width_extract_file(html_path, passphrase=None):
+    """Extract the hidden message from the zero-width characters of an HTML file."""
+    with _mapped(html_path) as data:
+        runs = [run.decode("utf-8") for run in _zero_width_runs(data, ZERO_WIDTH_BYTES, ZERO_WIDTH_RUN[1])]
+    return _hidden_message(([_carrier_values(run, ZERO_WIDTH_VALUES)] for run in runs), passphrase,
+                           "No hidden message found in zero-width characters!")
+
+
+def text_remove_file(html_path, output_path, added):
+    """Write a copy of the HTML file without the last occurrence of added; see text_remove()."""
+    _copy_without(html_path, output_path, added)
+
+
+# Whitespace and homoglyphs change text throughout the document, so it is read whole. Line endings
+# are kept as they are.
+def _read_text(html_path):
+    with open(html_path, 'r', encoding="utf-8", newline="") as file:
+        return file.read()
+
+
+def _write_text(output_path, content):
+    with atomic_output(output_path) as partial_path:
+        with open(partial_path, 'w', encoding="utf-8", newline="") as file:
+            file.write(content)
+
+
+def whitespace_insert_file(html_path, secret_message, output_path, passphrase=None):
+    """Write a copy of the HTML file with the message in the trailing whitespace of its lines."""
+    _write_text(output_path, whitespace_insert(_read_text(html_path), secret_message, passphrase))
+
+
+def whitespace_extract_file(html_path, passphrase=None):
+    """Extract the hidden message from the trailing whitespace of an HTML file."""
+    return whitespace_extract(_read_text(html_path), passphrase)
+
+
+def homoglyph_insert_file(html_path, secret_message, output_path, passphrase=None):
+    """Write a copy of the HTML file with the message in look-alike letters of its text.
+
+    Returns the stamp written, as hex, which homoglyph_remove_file() takes out again.
+    """
+    sealed = seal(secret_message, passphrase)
+    _write_text(output_path, _homoglyph_forms(_read_text(html_path), _sealed_bits(sealed)))
+    return sealed.hex()
+
+
+def homoglyph_remove_file(html_path, output_path, stamp):
+    """Write a copy of the HTML file with the letters of the stamp back in Latin; see homoglyph_remove()."""
+    _write_text(output_path, homoglyph_remove(_read_text(html_path), stamp))
+
+
+def homoglyph_extract_file(html_path, passphrase=None):
+    """Extract the hidden message from the look-alike letters of an HTML file."""
+    return homoglyph_extract(_read_text(html_path), passphrase)
 
 
-# Run the application
 if __name__ == "__main__":
+    import tkinter as tk
+    from gui import HTMLSteganoApp
+
     root = tk.Tk()
     app = HTMLSteganoApp(root)
     root.mainloop()
@@ -1,160 +1,226 @@
+import os
+import re
+import subprocess
+
 import numpy as np
 import imageio
-import tkinter as tk
-from tkinter import filedialog, messagebox
+import imageio_ffmpeg
 
-END_MARKER = "#####END#####"  # Marker to indicate the end of the hidden message
+from Bits import BitStream, embed_bits, group_bits, values_needed
+from Container import encode_payload, decode_payload
+from Progress import atomic_output, report
+from Spread import Permutation
 
 
-# Convert video to frames using imageio
+# Stream video frames using imageio
 def video_to_frames(video_path):
-    """Convert video file to a list of frames."""
+    """Yield the frames of a video file one at a time."""
     reader = imageio.get_reader(video_path)
-    frames = []
-    for frame in reader:
-        frames.append(frame)
-    return frames
-
-
-# Convert frames back to video using imageio
-def frames_to_video(frames, output_path, fps=30):
-    """Convert list of frames back to a video file."""
-    writer = imageio.get_writer(output_path, fps=fps)
-    for frame in frames:
-        writer.append_data(frame)
-    writer.close()
+    try:
+        yield from reader
+    finally:
+        reader.close()
+
+
+# Patterns for the stream summary ffmpeg prints for its input
+DURATION_PATTERN = re.compile(r"Duration: (\d+):(\d+):(\d+(?:\.\d+)?)")
+SIZE_PATTERN = re.compile(r"Stream #.*Video: .*?, (\d+)x(\d+)")
+FPS_PATTERN = re.compile(r"Stream #.*Video: .*?([\d.]+) (?:fps|tbr)")
+
+
+def video_metadata(video_path, default_fps=30):
+    """Read size, frame rate, duration and frame count from the container, without decoding frames.
+
+    ffmpeg prints the stream summary and exits when no output is given, which is much
+    cheaper than starting (and then tearing down) a decoding reader.
+    """
+    result = subprocess.run([imageio_ffmpeg.get_ffmpeg_exe(), "-hide_banner", "-i", video_path],
+                            capture_output=True, text=True, errors="replace")
+    size = SIZE_PATTERN.search(result.stderr)
+    if size is None:
+        raise ValueError(f"Could not read video metadata from {video_path}")
+    fps = FPS_PATTERN.search(result.stderr)
+    fps = float(fps.group(1)) if fps else default_fps
+    duration = DURATION_PATTERN.search(result.stderr)
+    duration = int(duration.group(1)) * 3600 + int(duration.group(2)) * 60 + float(duration.group(3)) if duration else 0
+    return {
+        "size": (int(size.group(1)), int(size.group(2))),
+        "fps": fps,
+        "duration": duration,
+        "nframes": round(duration * fps),
+    }
+
+
+def video_fps(video_path, default=30):
+    """Read the frame rate of a video file from its container metadata."""
+    return video_metadata(video_path, default)["fps"]
+
+
+def frame_count(video_path):
+    """Estimate the number of frames from the container metadata, without decoding."""
+    return video_metadata(video_path)["nframes"]
+
+
+def _report_frames(frames, total, progress):
+    """Yield frames, reporting how many have been handed out out of total."""
+    for index, frame in enumerate(frames, 1):
+        report(progress, index, total)
+        yield frame
+
+
+# Lossless encoder settings for the imageio ffmpeg plugin. LSB payloads only survive
+# codecs that store RGB exactly, without chroma subsampling or quantization.
+LOSSLESS_CODECS = {
+    "ffv1": {"codec": "ffv1", "pixelformat": "bgr0"},
+    "huffyuv": {"codec": "huffyuv", "pixelformat": "rgb24"},
+    "rawvideo": {"codec": "rawvideo", "pixelformat": "bgr24"},  # uncompressed, AVI only
+}
+DEFAULT_STEGO_CODEC = "ffv1"
+# Containers each lossless codec can be written to, by extension
+CODEC_CONTAINERS = {"ffv1": (".avi", ".mkv"), "huffyuv": (".avi", ".mkv"), "rawvideo": (".avi",)}
+
+
+def _check_container(output_path, codec):
+    """Reject an unknown lossless codec, or an output extension whose container cannot hold it."""
+    if codec not in LOSSLESS_CODECS:
+        raise ValueError(f"Unknown lossless codec: {codec}")
+    extension = os.path.splitext(output_path)[1].lower()
+    if extension not in CODEC_CONTAINERS[codec]:
+        containers = " or ".join(CODEC_CONTAINERS[codec])
+        raise ValueError(f"The {codec} codec cannot be written to {extension or 'a file without extension'}; "
+                         f"use {containers}.")
+
+
+# Write frames to a video using imageio
+def frames_to_video(frames, output_path, fps=30, codec=None):
+    """Write an iterable of frames to a video file as they arrive.
+
+    codec selects one of LOSSLESS_CODECS; None keeps imageio's default (lossy) encoder.
+    """
+    options = {}
+    if codec is not None:
+        _check_container(output_path, codec)
+        # No quality setting and no resizing to macro blocks, either would alter pixels
+        options = dict(LOSSLESS_CODECS[codec], quality=None, macro_block_size=1)
+
+    writer = imageio.get_writer(output_path, fps=fps, **options)
+    try:
+        for frame in frames:
+            writer.append_data(frame)
+    finally:
+        writer.close()
+
+
+def _frame_permutation(key, size, index):
+    """Return the keyed permutation of one frame's values; every frame gets its own."""
+    return Permutation(key, size, tweak=b"%d" % index)
+
+
+def _carrier_values(frames, key=None):
+    """Yield the values of each frame in embedding order: as stored, or permuted by key."""
+    for index, frame in enumerate(frames):
+        values = frame.reshape(-1)
+        if key is not None:
+            values = values[_frame_permutation(key, values.size, index).positions(0, values.size)]
+        yield values
+
+
+def verify_video(video_path, binary_message, key=None, depth=1):
+    """Re-read only the payload-bearing frames and check the embedded bits are intact."""
+    frames = video_to_frames(video_path)
+    try:
+        stream = BitStream(_carrier_values(frames, key), depth)
+        return np.array_equal(stream.read_bits(len(binary_message)), binary_message)
+    finally:
+        frames.close()
+
+
+def capacity(video_path, method="lsb"):
+    """Return the number of bits the video can carry, from the container metadata alone."""
+    if method != "lsb":
+        raise ValueError(f"Unknown video method: {method}")
+    meta = video_metadata(video_path)
+    width, height = meta["size"]
+    return meta["nframes"] * height * width * 3
+
+
+def _embed_frame(frame, binary_message, key=None, index=0, depth=1):
+    """Write the leading bits into the low depth bits of the frame's RGB values and return how many fit.
+
+    With a key the bits go to keyed pseudo-random positions of the frame instead of its first values.
+    """
+    count = min(values_needed(binary_message, depth), frame.size)
+    bits = binary_message[:count * depth]
+    # The frame is a contiguous copy, so the flat view writes straight into it
+    values = frame.reshape(-1)
+    if key is None:
+        embed_bits(values, bits, depth)
+    else:
+        positions = _frame_permutation(key, values.size, index).positions(0, count)
+        values[positions] ^= (values[positions] ^ group_bits(bits, depth)) & ((1 << depth) - 1)
+    return len(bits)
+
+
+def _embed_frames(frames, binary_message, key=None, depth=1):
+    """Yield the frames with the message embedded, passing frames after the payload through untouched."""
+    offset = 0
+    for index, frame in enumerate(frames):
+        if offset < len(binary_message):
+            frame = np.array(frame)  # writable copy of the payload-bearing frame only
+            offset += _embed_frame(frame, binary_message[offset:], key, index, depth)
+        yield frame
+
+    if offset < len(binary_message):
+        raise ValueError("Message too large to hide in this video.")
 
 
 # LSB Steganography for Video using imageio
-def lsb_hide_video(video_path, message, output_path):
-    """Hide a message in a video file using LSB."""
-    message += END_MARKER
-    binary_message = ''.join(format(ord(char), '08b') for char in message)
-
-    frames = video_to_frames(video_path)
-
-    if len(binary_message) > len(frames) * frames[0].shape[0] * frames[0].shape[1]:
+def lsb_hide_video(video_path, message, output_path, codec=DEFAULT_STEGO_CODEC, key=None, passphrase=None,
+                   fec=None, depth=1, progress=None):
+    """Hide a message (str or bytes) in a video file using LSB, written with a lossless codec.
+
+    The payload fills the frames in order; with a key the bits inside each frame are scattered
+    over keyed pseudo-random positions, with a different permutation per frame. A passphrase
+    encrypts the message, fec adds that many error correction bytes per 255-byte block and
+    depth (1-4) sets how many low bits of each value carry the message, so fewer frames do.
+    """
+    # Checked before the source is probed or decoded, as the encoder would only fail at the end
+    _check_container(output_path, codec)
+    binary_message = encode_payload(message, passphrase, fec, depth)
+    meta = video_metadata(video_path)
+    width, height = meta["size"]
+    # Reject oversized messages from the metadata before decoding a single frame
+    if values_needed(binary_message, depth) > meta["nframes"] * height * width * 3:
         raise ValueError("Message too large to hide in this video.")
 
-    binary_message_index = 0
-    for i, frame in enumerate(frames):
-        for x in range(frame.shape[0]):
-            for y in range(frame.shape[1]):
-                for c in range(frame.shape[2]):  # Loop through RGB channels
-                    if binary_message_index < len(binary_message):
-                        frame[x, y, c] = (frame[x, y, c] & 0xFE) | int(binary_message[binary_message_index])
-                        binary_message_index += 1
-
-    frames_to_video(frames, output_path)
-    messagebox.showinfo("Success", f"Message hidden successfully in {output_path}")
+    # Frames are decoded, embedded and encoded one at a time, at the source frame rate
+    frames = _embed_frames(video_to_frames(video_path), binary_message, key, depth)
+    frames = _report_frames(frames, meta["nframes"], progress)
+    # A truncated or damaged video is never left behind at output_path
+    with atomic_output(output_path) as partial_path:
+        frames_to_video(frames, partial_path, fps=meta["fps"], codec=codec)
+        if not verify_video(partial_path, binary_message, key, depth):
+            raise ValueError("The hidden message did not survive video encoding.")
 
 
-def lsb_extract_video(video_path):
-    """Extract the hidden message from a video file using LSB."""
+def lsb_extract_video(video_path, key=None, passphrase=None, progress=None):
+    """Extract the hidden message from a video file using LSB, with the key and passphrase it was hidden with."""
     frames = video_to_frames(video_path)
-
-    binary_message = ""
-    for frame in frames:
-        for x in range(frame.shape[0]):
-            for y in range(frame.shape[1]):
-                for c in range(frame.shape[2]):
-                    binary_message += str(frame[x, y, c] & 1)  # Extract the LSB
-
-    hidden_message = ''.join(chr(int(binary_message[i:i + 8], 2)) for i in range(0, len(binary_message), 8))
-
-    end_index = hidden_message.find(END_MARKER)
-    if end_index != -1:
-        return hidden_message[:end_index]
-    return "No hidden message found!"
-
-
-# GUI Application
-class VideoSteganoApp:
-    def __init__(self, root):
-        self.root = root
-        self.root.title("Video Steganography Tool")
-        self.root.configure(bg="black")
-        self.file_path = ""
-        self.message_file_path = ""
-
-        # Title
-        self.title_label = tk.Label(root, text="Video Steganography Tool", fg="#00FF00", bg="black",
-                                    font=("Courier", 18, "bold"))
-        self.title_label.pack(pady=10)
-
-        # File Section
-        self.file_frame = tk.Frame(root, bg="black")
-        self.file_frame.pack(pady=5)
-
-        self.file_label = tk.Label(self.file_frame, text="Video File (AVI):", fg="#00FF00", bg="black")
-        self.file_label.grid(row=0, column=0)
-        self.file_entry = tk.Entry(self.file_frame, width=40)
-        self.file_entry.grid(row=0, column=1)
-        self.file_button = tk.Button(self.file_frame, text="Browse", command=self.load_video_file, fg="black",
-                                     bg="#00FF00")
-        self.file_button.grid(row=0, column=2)
-
-        # Message Section
-        self.message_frame = tk.Frame(root, bg="black")
-        self.message_frame.pack(pady=5)
-
-        self.message_label = tk.Label(self.message_frame, text="Select Text File for Hidden Message:", fg="#00FF00",
-                                      bg="black")
-        self.message_label.grid(row=0, column=0)
-        self.message_button = tk.Button(self.message_frame, text="Browse", command=self.load_message_file, fg="black",
-                                        bg="#00FF00")
-        self.message_button.grid(row=0, column=1)
-
-        # Buttons
-        self.encrypt_button = tk.Button(root, text="Hide Message", command=self.encrypt, fg="black", bg="#00FF00")
-        self.encrypt_button.pack(pady=5)
-        self.decrypt_button = tk.Button(root, text="Retrieve Message", command=self.decrypt, fg="black", bg="#00FF00")
-        self.decrypt_button.pack(pady=5)
-
-        # Result Section
-        self.result_label = tk.Label(root, text="", fg="#00FF00", bg="black", font=("Courier", 12, "bold"))
-        self.result_label.pack()
-
-    def load_video_file(self):
-        self.file_path = filedialog.askopenfilename(filetypes=[("Video files", "*.avi")])
-        if self.file_path:
-            self.file_entry.delete(0, tk.END)
-            self.file_entry.insert(0, self.file_path)
-
-    def load_message_file(self):
-        self.message_file_path = filedialog.askopenfilename(filetypes=[("Text files", "*.txt")])
-        if self.message_file_path:
-            messagebox.showinfo("File Selected", f"Message File: {self.message_file_path}")
-
-    def encrypt(self):
-        if not self.file_path:
-            messagebox.showerror("Error", "No video file selected!")
-            return
-        if not self.message_file_path:
-            messagebox.showerror("Error", "No message file selected!")
-            return
-
-        with open(self.message_file_path, 'r') as file:
-            message = file.read().strip()
-
-        if not message:
-            messagebox.showerror("Error", "No message found in the file!")
-            return
-
-        output_path = filedialog.asksaveasfilename(defaultextension=".avi", filetypes=[("AVI", "*.avi")])
-        lsb_hide_video(self.file_path, message, output_path)
-
-    def decrypt(self):
-        if not self.file_path:
-            messagebox.showerror("Error", "No video file selected!")
-            return
-
-        hidden_message = lsb_extract_video(self.file_path)
-
-        self.result_label.config(text=f"Hidden Message: {hidden_message}")
+    try:
+        tracked = frames
+        # Counting the frames may start a probe of the whole file, so only for a progress callback
+        if progress is not None:
+            tracked = _report_frames(frames, frame_count(video_path), progress)
+        # Frames are decoded lazily, so decoding stops at the last frame holding payload
+        return decode_payload(_carrier_values(tracked, key), legacy=key is None, passphrase=passphrase)
+    finally:
+        frames.close()
 
 
 if __name__ == "__main__":
+    import tkinter as tk
+    from gui import VideoSteganoApp
+
     root = tk.Tk()
     app = VideoSteganoApp(root)
     root.mainloop()
@@ -0,0 +1,764 @@
+import collections
+import os
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+import wave
+
+import numpy as np
+from PIL import Image
+
+MESSAGE = "benchmark payload " * 64
+
+
+def timed(func, *args):
+    """Run func once and return (seconds, result)."""
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def random_image(path, width, height, mode="RGB"):
+    """Write a noise PNG of the given size and return its path."""
+    channels = {"L": 1, "RGB": 3, "RGBA": 4}[mode]
+    rng = np.random.default_rng(0)
+    pixels = rng.integers(0, 256, size=(height, width, channels), dtype=np.uint8)
+    Image.fromarray(pixels.squeeze(axis=2) if channels == 1 else pixels).save(path)
+    return path
+
+
+# Reference copy of the original per-pixel implementation, kept only for comparison
+def legacy_lsb_hide(image_path, message, output_path):
+    message += "#####END#####"
+    binary_message = ''.join(format(ord(char), '08b') for char in message)
+    img = Image.open(image_path)
+    pixels = list(img.getdata())
+    data_index = 0
+    new_pixels = []
+    for pixel in pixels:
+        if data_index < len(binary_message):
+            new_pixel = list(pixel)
+            for i in range(3):
+                if data_index < len(binary_message):
+                    new_pixel[i] = (new_pixel[i] & ~1) | int(binary_message[data_index])
+                    data_index += 1
+            new_pixels.append(tuple(new_pixel))
+        else:
+            new_pixels.append(pixel)
+    img.putdata(new_pixels)
+    img.save(output_path, format="PNG")
+
+
+def legacy_lsb_extract(image_path):
+    img = Image.open(image_path)
+    pixels = list(img.getdata())
+    binary_message = ""
+    for pixel in pixels:
+        for color in pixel[:3]:
+            binary_message += str(color & 1)
+    hidden_message = ''.join(chr(int(binary_message[i:i + 8], 2)) for i in range(0, len(binary_message), 8))
+    end_index = hidden_message.find("#####END#####")
+    return hidden_message[:end_index] if end_index != -1 else None
+
+
+# Original sample loop, with its read-only buffer and int16 overflow bugs patched so it can run
+def legacy_lsb_hide_audio(wav_path, message, output_path):
+    message += "#####END#####"
+    binary_message = ''.join(format(ord(char), '08b') for char in message)
+    with wave.open(wav_path, 'rb') as wav:
+        params = wav.getparams()
+        audio_data = np.frombuffer(wav.readframes(params.nframes), dtype=np.int16).copy()
+    binary_message_index = 0
+    for i in range(len(audio_data)):
+        if binary_message_index < len(binary_message):
+            audio_data[i] = (audio_data[i] & ~1) | int(binary_message[binary_message_index])
+            binary_message_index += 1
+    with wave.open(output_path, 'wb') as output_wav:
+        output_wav.setparams(params)
+        output_wav.writeframes(audio_data.tobytes())
+
+
+def random_wav(path, seconds, channels=2, rate=44100):
+    """Write a 16-bit noise WAV of the given duration, one second at a time."""
+    rng = np.random.default_rng(0)
+    with wave.open(path, 'wb') as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        for _ in range(seconds):
+            wav.writeframes(rng.integers(-2000, 2000, rate * channels, dtype=np.int16).tobytes())
+    return path
+
+
+# Original per-channel frame loops, kept only for comparison
+def legacy_embed_frame(frame, binary_message):
+    binary_message_index = 0
+    for x in range(frame.shape[0]):
+        for y in range(frame.shape[1]):
+            for c in range(frame.shape[2]):
+                if binary_message_index < len(binary_message):
+                    frame[x, y, c] = (frame[x, y, c] & 0xFE) | int(binary_message[binary_message_index])
+                    binary_message_index += 1
+
+
+def legacy_extract_frame(frame):
+    binary_message = ""
+    for x in range(frame.shape[0]):
+        for y in range(frame.shape[1]):
+            for c in range(frame.shape[2]):
+                binary_message += str(frame[x, y, c] & 1)
+    return binary_message
+
+
+def timed_rss(statement):
+    """Run a statement in a fresh interpreter; return (the last number it prints, peak RSS in MB)."""
+    # VmHWM belongs to the new address space; ru_maxrss would keep the parent's peak across exec
+    script = f"{statement}\nprint(open('/proc/self/status').read().split('VmHWM:')[1].split()[0])"
+    result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__)))
+    output = result.stdout.split()
+    return (float(output[-2]) if len(output) > 1 else None), int(output[-1]) / 1024  # VmHWM is in kB
+
+
+def peak_rss_mb(statement):
+    """Run a statement in a fresh interpreter and return its peak resident set size in MB."""
+    return timed_rss(statement)[1]
+
+
+def raw_wav(path, seconds, format_tag, sampwidth, channels=2, rate=44100):
+    """Write a noise WAV with any sample format by building the RIFF chunks directly."""
+    rng = np.random.default_rng(0)
+    data = rng.integers(0, 256, size=seconds * rate * channels * sampwidth, dtype=np.uint8)
+    if format_tag == 3:  # keep float samples finite and in [-1, 1)
+        data = rng.uniform(-1, 1, size=seconds * rate * channels).astype("<f4").view(np.uint8)
+    fmt = struct.pack("<HHIIHH", format_tag, channels, rate, rate * channels * sampwidth,
+                      channels * sampwidth, sampwidth * 8)
+    with open(path, 'wb') as file:
+        file.write(struct.pack("<4sI4s", b"RIFF", 4 + 8 + len(fmt) + 8 + data.size, b"WAVE"))
+        file.write(struct.pack("<4sI", b"fmt ", len(fmt)) + fmt)
+        file.write(struct.pack("<4sI", b"data", data.size))
+        file.write(data.tobytes())
+    return path
+
+
+def bench_image_lsb(workdir):
+    """Compare the per-pixel and the vectorized image LSB engines."""
+    import Img
+
+    print("== Image LSB (Img.lsb_hide / Img.lsb_extract) ==")
+    for megapixels, with_legacy in ((0.1, True), (0.5, True), (4, False), (24, False)):
+        side = int((megapixels * 1_000_000) ** 0.5)
+        src = random_image(os.path.join(workdir, f"img_{megapixels}mp.png"), side, side)
+        out = os.path.join(workdir, f"img_{megapixels}mp_out.png")
+
+        hide_time, _ = timed(Img.lsb_hide, src, MESSAGE, out)
+        extract_time, message = timed(Img.lsb_extract, out)
+        assert message == MESSAGE
+        line = f"{megapixels:>4} MP  vectorized hide {hide_time:7.3f}s  extract {extract_time:7.3f}s"
+
+        if with_legacy:
+            legacy_hide, _ = timed(legacy_lsb_hide, src, MESSAGE, out)
+            legacy_extract, _ = timed(legacy_lsb_extract, out)
+            line += (f"  | legacy hide {legacy_hide:7.3f}s  extract {legacy_extract:7.3f}s"
+                     f"  | speedup {legacy_hide / hide_time:5.1f}x / {legacy_extract / extract_time:5.1f}x")
+        print(line)
+
+
+def bench_image_memory(workdir):
+    """Peak memory of hiding in and extracting from a 100 MP image, per image mode."""
+    print("== Image memory (100 MP, peak RSS of Img.lsb_hide / Img.lsb_extract) ==")
+    rng = np.random.default_rng(0)
+    for mode, shape, dtype in (("L", (), np.uint8), ("RGB", (3,), np.uint8), ("RGBA", (4,), np.uint8),
+                               ("I;16", (), np.uint16)):
+        src = os.path.join(workdir, f"mem_{mode.replace(';', '')}.png")
+        out = os.path.join(workdir, f"mem_{mode.replace(';', '')}_out.png")
+        pixels = rng.integers(0, np.iinfo(dtype).max + 1, size=(10000, 10000) + shape, dtype=dtype)
+        Image.fromarray(pixels).save(src, compress_level=1)
+        del pixels
+
+        setup = "import warnings; warnings.simplefilter('ignore'); import Img"
+        hide = peak_rss_mb(f"{setup}; Img.lsb_hide({src!r}, {MESSAGE!r}, {out!r})")
+        extract = peak_rss_mb(f"{setup}; assert Img.lsb_extract({out!r}) == {MESSAGE!r}")
+        # What the engine used to do: a full NumPy copy of the decoded image, written back whole
+        full_copy = peak_rss_mb(f"{setup}; import numpy as np; from PIL import Image; "
+                                f"Image.fromarray(np.array(Image.open({src!r}))).save({out!r}, compress_level=1)")
+        print(f"  {mode:<5} hide {hide:7.1f} MB  extract {extract:7.1f} MB  | full array copy {full_copy:7.1f} MB")
+
+
+def bench_image_strips(workdir):
+    """Strip-wise hide/extract on a 100 MP PNG and uncompressed TIFF against decoding the whole image."""
+    print("== Image strips (100 MP RGB, Img.lsb_hide / Img.lsb_extract) ==")
+    rng = np.random.default_rng(0)
+    pixels = rng.integers(0, 256, size=(10000, 10000, 3), dtype=np.uint8)
+    png = os.path.join(workdir, "strips.png")
+    tiff = os.path.join(workdir, "strips.tif")
+    Image.fromarray(pixels).save(png, compress_level=1)
+    Image.fromarray(pixels).save(tiff)
+    del pixels
+
+    out = os.path.join(workdir, "strips_out.png")
+    setup = "import time, warnings; warnings.simplefilter('ignore'); import Img; start = time.perf_counter()"
+    report = "; print(time.perf_counter() - start)"
+    for name, src in (("PNG", png), ("TIFF", tiff)):
+        hide = f"{setup}; Img.lsb_hide({src!r}, {MESSAGE!r}, {out!r}){report}"
+        extract = f"{setup}; assert Img.lsb_extract({out!r}) == {MESSAGE!r}{report}"
+        # Decoding everything first, as a whole-image engine has to
+        decode = f"{setup}; from PIL import Image; Image.MAX_IMAGE_PIXELS = None; Image.open({src!r}).load(){report}"
+        line = f"  {name:<4}"
+        for label, statement in (("hide", hide), ("extract", extract), ("full decode", decode)):
+            seconds, peak = timed_rss(statement)
+            line += f"  {label} {seconds:6.2f}s {peak:6.1f} MB"
+        print(line)
+
+
+def bench_spread(workdir):
+    """Sequential against keyed embedding of a 1 MB payload in a 50 MP image and a 30 min WAV."""
+    import Aud
+    import Img
+
+    print("== Keyed spreading (1 MB payload, sequential vs. key='benchmark') ==")
+    payload = np.random.default_rng(0).integers(0, 256, size=1 << 20, dtype=np.uint8).tobytes()
+    png = random_image(os.path.join(workdir, "spread.png"), 10000, 5000)
+    wav = random_wav(os.path.join(workdir, "spread.wav"), 30 * 60)
+    cases = (("50 MP PNG", Img.lsb_hide, Img.lsb_extract, png, os.path.join(workdir, "spread_out.png")),
+             ("30 min WAV", Aud.lsb_hide_audio, Aud.lsb_extract_audio, wav, os.path.join(workdir, "spread_out.wav")))
+    for name, hide, extract, src, out in cases:
+        line = f"  {name:<10}"
+        for key in (None, "benchmark"):
+            hide_time, _ = timed(lambda: hide(src, payload, out, key=key))
+            extract_time, message = timed(lambda: extract(out, key=key))
+            assert message == payload
+            line += f"  {'keyed' if key else 'sequential'} hide {hide_time:6.2f}s extract {extract_time:6.2f}s"
+        print(line)
+
+
+def bench_payload(workdir):
+    """Container size and cost of compression and encryption, and how fast a wrong passphrase fails."""
+    import Container
+    import Img
+
+    print("== Payload pipeline (Container.seal, Img.lsb_hide / Img.lsb_extract on a 24 MP PNG) ==")
+    rng = np.random.default_rng(0)
+    words = np.array(["frame", "sensor", "value", "ok", "error", "retry", "timeout", "node"])
+    text = " ".join(rng.choice(words, size=200_000))  # about 1 MB of log-like text
+    noise = rng.integers(0, 256, size=1 << 20, dtype=np.uint8).tobytes()
+    png = random_image(os.path.join(workdir, "payload.png"), 6000, 4000)
+    out = os.path.join(workdir, "payload_out.png")
+    for name, message in (("1 MB text", text), ("1 MB random", noise)):
+        for passphrase in (None, "correct horse"):
+            seal_time, sealed = timed(Container.seal, message, passphrase)
+            hide_time, _ = timed(lambda: Img.lsb_hide(png, message, out, passphrase=passphrase))
+            extract_time, result = timed(lambda: Img.lsb_extract(out, passphrase=passphrase))
+            assert result == message
+            line = (f"  {name:<11} {'encrypted' if passphrase else 'plain':<9}  {len(sealed) / 1e6:6.3f} MB sealed"
+                    f" in {seal_time:5.2f}s  hide {hide_time:5.2f}s  extract {extract_time:5.2f}s")
+            if passphrase:
+                def wrong():
+                    try:
+                        Img.lsb_extract(out, passphrase="wrong")
+                    except ValueError:
+                        pass
+                reject_time, _ = timed(wrong)
+                line += f"  wrong passphrase rejected in {reject_time * 1000:5.1f} ms"
+            print(line)
+
+
+def bench_depth(workdir):
+    """Hide/extract time and carrier values used per depth for a 1 MB payload in a 50 MP PNG and a 30 min WAV."""
+    import Aud
+    import Img
+
+    print("== k-LSB depth (1 MB payload) ==")
+    payload = np.random.default_rng(0).integers(0, 256, size=1 << 20, dtype=np.uint8).tobytes()
+    png = random_image(os.path.join(workdir, "depth.png"), 10000, 5000)
+    wav = random_wav(os.path.join(workdir, "depth.wav"), 30 * 60)
+    cases = (("50 MP PNG", Img.lsb_hide, Img.lsb_extract, png, os.path.join(workdir, "depth_out.png")),
+             ("30 min WAV", Aud.lsb_hide_audio, Aud.lsb_extract_audio, wav, os.path.join(workdir, "depth_out.wav")))
+    for name, hide, extract, src, out in cases:
+        for depth in (1, 2, 3, 4):
+            hide_time, _ = timed(lambda: hide(src, payload, out, depth=depth))
+            extract_time, message = timed(lambda: extract(out))
+            assert message == payload
+            values = -(-(len(payload) + 12) * 8 // depth)
+            print(f"  {name:<10}  depth {depth}  {values / 1e6:5.2f} M carrier values"
+                  f"  hide {hide_time:6.2f}s  extract {extract_time:6.2f}s")
+
+
+def bench_parity(workdir):
+    """Changed values per payload bit and throughput of matrix-embedding parity against plain LSB."""
+    import Img
+
+    print("== Parity (Hamming matrix embedding) vs. LSB on a 24 MP PNG ==")
+    rng = np.random.default_rng(0)
+    png = random_image(os.path.join(workdir, "parity.png"), 6000, 4000)
+    out = os.path.join(workdir, "parity_out.png")
+    original = np.asarray(Image.open(png))
+    for size in (64 << 10, 1 << 20):
+        payload = rng.integers(0, 256, size=size, dtype=np.uint8).tobytes()
+        for name, hide, extract in (("lsb", Img.lsb_hide, Img.lsb_extract),
+                                    ("parity", Img.parity_hide, Img.parity_extract)):
+            for key in (None, "benchmark"):
+                hide_time, _ = timed(hide, png, payload, out, key)
+                extract_time, message = timed(extract, out, key)
+                assert message == payload
+                changed = np.count_nonzero(np.asarray(Image.open(out)) != original)
+                print(f"  {size >> 10:>5} KB {name:<6} {'keyed' if key else 'sequential':<10}"
+                      f"  {changed / (size * 8):5.3f} changes/bit  {changed:>8} values"
+                      f"  hide {hide_time:6.2f}s  extract {extract_time:6.2f}s")
+
+
+def bench_fec(workdir):
+    """Overhead and throughput of the Reed-Solomon layer per parity setting, and the bit error rates it survives."""
+    import Fec
+
+    print("== Forward error correction (1 MB payload, Fec.protect / Fec.repair) ==")
+    rng = np.random.default_rng(0)
+    data = rng.integers(0, 256, size=1 << 20, dtype=np.uint8).tobytes()
+    megabytes = len(data) / 1e6
+    for parity in (4, 8, 16, 32, 64):
+        encode_time, protected = timed(Fec.protect, data, parity)
+        body = np.frombuffer(protected[Fec.FRAME.size * Fec.REPEAT:], dtype=np.uint8)
+        clean_time, _ = timed(Fec.repair, body.tobytes(), parity, len(data))
+        line = (f"  parity {parity:>2}  overhead {len(protected) / len(data) - 1:6.1%}  encode {megabytes / encode_time:6.1f} MB/s"
+                f"  decode clean {megabytes / clean_time:6.1f} MB/s")
+        for rate in (1e-4, 1e-3, 1e-2):
+            bits = np.unpackbits(body)
+            bits[rng.random(bits.size) < rate] ^= 1
+            try:
+                repair_time, repaired = timed(Fec.repair, np.packbits(bits).tobytes(), parity, len(data))
+                line += f"  BER {rate:.0e} {megabytes / repair_time:6.1f} MB/s" if repaired == data else f"  BER {rate:.0e} wrong"
+            except ValueError:
+                line += f"  BER {rate:.0e}   failed  "
+        print(line)
+
+
+def html_export(path, megabytes):
+    """Write an HTML page of about the given size with many ordinary comments, a block at a time."""
+    row = ("<tr><td class=\"id\">{0}</td><td>sensor reading ok</td><td>"
+           "<a href=\"/items/{0}\">details</a></td></tr><!-- row {0} -->\n")
+    with open(path, 'w') as file:
+        file.write("<html><head><title>export</title></head><body><table>\n")
+        written = 0
+        index = 0
+        while written < megabytes << 20:
+            block = "".join(row.format(index + i) for i in range(10000))
+            file.write(block)
+            written += len(block)
+            index += 10000
+        file.write("</table></body></html>\n")
+    return path
+
+
+def bench_html(workdir):
+    """MB/s and peak RSS of the memory-mapped HTML methods against reading the document into a string."""
+    print("== HTML scanning (256 MB export with 2.6M ordinary comments; RSS includes mapped file pages) ==")
+    html = html_export(os.path.join(workdir, "export.html"), 256)
+    out = os.path.join(workdir, "export_out.html")
+    megabytes = os.path.getsize(html) / 1e6
+    setup = "import re, time; import Txt; start = time.perf_counter()"
+    report = "; print(time.perf_counter() - start)"
+    # The string engine as it was: whole-document read, regex scan and replace of every </body>
+    patterns = {"comment": r"<!--(.*?)-->", "invisible_tag": r'<div style="display:none;">(.*?)</div>'}
+    inserts = {"comment": "html + '<!-- secret -->'",
+               "invisible_tag": "html.replace('</body>', '<div style=\"display:none;\">secret</div></body>')"}
+    for method, pattern in patterns.items():
+        cases = (
+            ("read insert", f"{setup}; html = open({html!r}).read(); open({out!r}, 'w').write({inserts[method]}){report}"),
+            ("read+regex extract", f"{setup}; '\\n'.join(text.strip() for text in "
+                                   f"re.findall({pattern!r}, open({out!r}).read(), re.DOTALL)){report}"),
+            ("mmap insert", f"{setup}; Txt.{method}_insert_file({html!r}, 'secret', {out!r}){report}"),
+            ("mmap extract", f"{setup}; Txt.{method}_extract_file({out!r}){report}"),
+        )
+        line = f"  {method:<13}"
+        for label, statement in cases:
+            seconds, peak = timed_rss(statement)
+            line += f"  {label} {megabytes / seconds:5.0f} MB/s {peak:4.0f} MB"
+        print(line)
+
+
+def text_corpus(megabytes):
+    """Return about the given number of MB of plain prose-like text, one sentence per line."""
+    rng = np.random.default_rng(0)
+    words = ("the of and to in is was for on that with as by at from this have are which one had not "
+             "but what all were when we there can an your said each she do how their if will up other "
+             "about out many then them these so some her would make like him into time has look two more "
+             "write go see number way could people my than first water been call who oil its now find").split()
+    lines = []
+    size = 0
+    while size < megabytes << 20:
+        indices = rng.integers(0, len(words), size=(10000, 12))
+        block = "".join(" ".join(words[i] for i in row).capitalize() + ".\n" for row in indices)
+        lines.append(block)
+        size += len(block)
+    return "".join(lines)
+
+
+def legacy_zero_width(data):
+    """Reference per-character encoder and decoder for comparison with the translate tables."""
+    import Txt
+
+    text = ""
+    for byte in data:
+        for shift in (6, 4, 2, 0):
+            text += Txt.ZERO_WIDTH[(byte >> shift) & 3]
+    decoded = bytearray()
+    for start in range(0, len(text), 4):
+        byte = 0
+        for char in text[start:start + 4]:
+            byte = byte << 2 | Txt.ZERO_WIDTH.index(char)
+        decoded.append(byte)
+    return text, bytes(decoded)
+
+
+def bench_text(workdir):
+    """Insert/extract throughput of the text techniques on a 100 MB corpus, and cover bytes added per payload byte."""
+    import base64
+    import Txt
+
+    print("== Text techniques (100 MB plain-text corpus, 64 KB incompressible payload) ==")
+    corpus = text_corpus(100)
+    megabytes = len(corpus) / 1e6
+    payload = base64.b64encode(np.random.default_rng(1).bytes(48 << 10)).decode("ascii")
+    for name in ("comment", "invisible_tag", "zero_width", "whitespace", "homoglyph"):
+        insert, extract = getattr(Txt, f"{name}_insert"), getattr(Txt, f"{name}_extract")
+        insert_time, stego = timed(insert, corpus, payload)
+        extract_time, message = timed(extract, stego)
+        assert message == payload
+        added = len(stego.encode("utf-8")) - len(corpus.encode("utf-8"))
+        print(f"  {name:<13}  insert {megabytes / insert_time:7.1f} MB/s  extract {megabytes / extract_time:7.1f} MB/s"
+              f"  {added / len(payload):5.2f} cover bytes per payload byte")
+
+    data = Txt.seal(payload)
+    table_time, encoded = timed(Txt._translated, data, Txt.ZERO_WIDTH_ENCODE)
+    values_time, _ = timed(Txt._carrier_values, encoded, Txt.ZERO_WIDTH_VALUES)
+    legacy_time, (legacy_text, legacy_data) = timed(legacy_zero_width, data)
+    assert legacy_text == encoded and legacy_data == data
+    print(f"  zero-width coding of {len(data) >> 10} KB: translate tables {(table_time + values_time) * 1000:7.2f} ms"
+          f"  per character {legacy_time * 1000:8.2f} ms  speedup {legacy_time / (table_time + values_time):5.0f}x")
+
+
+def site_tree(root, files, kilobytes):
+    """Write a site build of HTML pages spread over nested directories and return its root."""
+    rng = np.random.default_rng(0)
+    paragraph = "<p>" + "lorem ipsum dolor sit amet " * 8 + "</p>\n"
+    body = paragraph * max(kilobytes * 1024 // len(paragraph), 1)
+    for index in range(files):
+        directory = os.path.join(root, f"section{index % 20}", f"part{index % 7}")
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, f"page{index}.html"), 'w') as file:
+            file.write(f"<html><head><title>{index} {rng.integers(1 << 30)}</title></head><body>\n{body}</body></html>\n")
+    return root
+
+
+def bench_stamp(workdir):
+    """Full and incremental stamping of a site tree (Stamp.stamp_tree), serial and on a thread pool."""
+    import shutil
+    import Stamp
+    import Txt
+
+    files, kilobytes = 4000, 32
+    print(f"== HTML tree stamping ({files} pages of {kilobytes} KB, Txt.comment_insert_file) ==")
+    source = site_tree(os.path.join(workdir, "site"), files, kilobytes)
+    pages = sorted(os.path.join(dirpath, name) for dirpath, _, names in os.walk(source) for name in names)
+
+    def run(message, workers):
+        results = list(Stamp.stamp_tree(source, message, Txt.comment_insert_file, "comment", output, None, None,
+                                        workers))
+        assert all(result.error is None for result in results)
+        return sum(result.status == "stamped" for result in results)
+
+    for workers in (1, None):
+        output = os.path.join(workdir, "public")
+        shutil.rmtree(output, ignore_errors=True)
+        label = "1 thread " if workers == 1 else f"{(os.cpu_count() or 1) + 4} threads"
+        steps = [("full build", "build 1", None),
+                 ("rerun, nothing changed", "build 1", None),
+                 ("rerun, every source touched", "build 1", lambda: [os.utime(page) for page in pages]),
+                 ("rerun, 5% of sources edited", "build 1",
+                  lambda: [open(page, 'a').write("<!-- edit -->\n") for page in pages[::20]]),
+                 ("rerun, new payload", "build 2", None)]
+        for name, message, change in steps:
+            if change:
+                change()
+            seconds, stamped = timed(run, message, workers)
+            print(f"  {label}  {name:<28} {seconds:7.3f}s  {stamped:>5} stamped  {files / seconds:8.0f} files/s")
+
+
+def natural_image(path, width, height, seed=0):
+    """Write a smooth, photo-like RGB PNG (a few waves plus sensor noise) and return its path.
+
+    Steganalysis needs neighbouring pixels that are close in value, which noise images lack.
+    """
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[0:height, 0:width] / 100.0
+    pixels = 128 + rng.normal(0, 2.5, (height, width, 3))
+    for channel in range(3):
+        for _ in range(6):
+            fx, fy, phase = rng.uniform(0.1, 2), rng.uniform(0.1, 2), rng.uniform(0, 6)
+            pixels[..., channel] += rng.uniform(10, 40) * np.sin(fx * x + fy * y + phase)
+    Image.fromarray(np.clip(np.round(pixels), 0, 255).astype(np.uint8)).save(path)
+    return path
+
+
+def natural_wav(path, seconds, seed=0, channels=2, rate=44100):
+    """Write a 16-bit WAV of tones and noise, peak-normalized like a mastered recording, and return its path.
+
+    The gain leaves the comb-shaped histogram of real processed audio, which noise WAVs lack.
+    """
+    rng = np.random.default_rng(seed)
+    t = np.arange(seconds * rate) / rate
+    signal = rng.normal(0, 30, (len(t), channels))
+    for _ in range(8):
+        envelope = 0.6 + 0.4 * np.sin(2 * np.pi * rng.uniform(0.1, 1) * t + rng.uniform(0, 6))
+        tone = rng.uniform(300, 3000) * envelope * np.sin(2 * np.pi * rng.uniform(60, 2000) * t + rng.uniform(0, 6))
+        signal += tone[:, None] * rng.uniform(0.5, 1, channels)
+    recorded = np.round(signal)
+    samples = np.round(recorded * (20000 / np.abs(recorded).max())).astype(np.int16)
+    with wave.open(path, 'wb') as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(samples.tobytes())
+    return path
+
+
+def bench_analysis(workdir):
+    """Files per minute and detection rates of Analysis.scan_files on synthetic clean-vs-stego corpora."""
+    import Analysis
+    import Aud
+    import Img
+
+    count, width, height = 60, 640, 480
+    print(f"== Steganalysis ({count} clean and {3 * count} stego {width}x{height} PNGs, Analysis.scan_files) ==")
+    rng = np.random.default_rng(0)
+    capacity_bytes = width * height * 3 // 8
+    rates = (0.05, 0.1, 0.25)  # share of the carrier values the message takes
+    methods = (("lsb", Img.lsb_hide, None), ("lsb keyed", Img.lsb_hide, "key"), ("parity", Img.parity_hide, None))
+    corpus = []
+    for index in range(count):
+        clean = natural_image(os.path.join(workdir, f"clean{index}.png"), width, height, seed=index)
+        corpus.append((clean, "clean"))
+        rate = rates[index % len(rates)]
+        message = rng.bytes(int(capacity_bytes * rate))
+        for kind, hide, key in methods:
+            stego = os.path.join(workdir, f"{kind.replace(' ', '_')}{index}.png")
+            hide(clean, message, stego, key)
+            corpus.append((stego, f"{kind} {rate:.0%}"))
+
+    kinds = {path: kind for path, kind in corpus}
+    for workers in sorted({1, os.cpu_count() or 1}):
+        seconds, results = timed(lambda: list(Analysis.scan_files([path for path, _ in corpus], workers)))
+        assert all(result.error is None for result in results)
+        print(f"  {workers:>2} processes  {len(corpus) / seconds * 60:8.0f} files/min"
+              f"  {len(corpus) * width * height / seconds / 1e6:6.1f} MP/s")
+
+    flagged = collections.defaultdict(list)
+    estimates = collections.defaultdict(list)
+    for result in results:
+        kind = kinds[result.job[0]]
+        flagged[kind].append(result.value["suspicious"])
+        estimates[kind].append(result.value["rs"])
+    for kind in ["clean"] + [f"{kind} {rate:.0%}" for kind, _, _ in methods for rate in rates]:
+        print(f"  {kind:<16} flagged {np.mean(flagged[kind]):6.1%}  mean RS estimate {np.mean(estimates[kind]):.3f}")
+
+    count, seconds = 12, 10
+    print(f"== Steganalysis ({count} clean and {4 * count} stego {seconds} s 16-bit WAVs) ==")
+    capacity_bytes = seconds * 44100 * 2 // 8
+    rates = (0.1, 0.5, 0.96)
+    corpus = []
+    for index in range(count):
+        clean = natural_wav(os.path.join(workdir, f"clean{index}.wav"), seconds, seed=index)
+        corpus.append((clean, "clean"))
+        for rate in rates:
+            stego = os.path.join(workdir, f"lsb{index}_{rate}.wav")
+            # Leave room for the container header and length
+            Aud.lsb_hide_audio(clean, rng.bytes(int(capacity_bytes * rate) - 64), stego)
+            corpus.append((stego, f"lsb {rate:.0%}"))
+        stego = os.path.join(workdir, f"keyed{index}.wav")
+        Aud.lsb_hide_audio(clean, rng.bytes(capacity_bytes - 64), stego, key="key")
+        corpus.append((stego, "lsb keyed 100%"))
+    kinds = {path: kind for path, kind in corpus}
+    flagged = collections.defaultdict(list)
+    for result in Analysis.scan_files([path for path, _ in corpus]):
+        assert result.error is None
+        flagged[kinds[result.job[0]]].append(result.value["suspicious"])
+    for kind in ["clean"] + [f"lsb {rate:.0%}" for rate in rates] + ["lsb keyed 100%"]:
+        print(f"  {kind:<16} flagged {np.mean(flagged[kind]):6.1%}")
+
+
+def bench_cache(workdir):
+    """First against repeated extraction through the decode cache, switching methods on the same carrier."""
+    import Aud
+    import Cache
+    import Img
+
+    print("== Decode cache (24 MP PNG and 10 min WAV, 10 kB payload) ==")
+    payload = np.random.default_rng(0).integers(0, 256, size=10 << 10, dtype=np.uint8).tobytes()
+    png = random_image(os.path.join(workdir, "cache.png"), 6000, 4000)
+    wav = random_wav(os.path.join(workdir, "cache.wav"), 10 * 60)
+    stego_png = os.path.join(workdir, "cache_out.png")
+    stego_wav = os.path.join(workdir, "cache_out.wav")
+    # Each case is (name, the extractions a reviewer switches between, the one that finds the payload)
+    cases = (("PNG parity", lambda: Img.parity_hide(png, payload, stego_png),
+              (lambda: Img.lsb_extract(stego_png), lambda: Img.parity_extract(stego_png)), 1),
+             ("PNG keyed", lambda: Img.lsb_hide(png, payload, stego_png, key="key"),
+              (lambda: Img.parity_extract(stego_png, key="key"), lambda: Img.lsb_extract(stego_png, key="key")), 1),
+             ("WAV keyed", lambda: Aud.lsb_hide_audio(wav, payload, stego_wav, key="key"),
+              (lambda: Aud.lsb_extract_audio(stego_wav, key="key"),), 0))
+    for name, hide, extractions, found in cases:
+        hide()
+        Cache.PLANES.clear()
+        first = []
+        for extract in extractions:
+            seconds, _ = timed(extract)
+            first.append(seconds)
+        again = []
+        for extract in extractions:
+            seconds, _ = timed(extract)
+            again.append(seconds)
+        assert extractions[found]() == payload
+        print(f"  {name:<10}  first {sum(first):6.2f}s  repeated {sum(again):6.3f}s  {Cache.cache_stats()}")
+
+
+def bench_audio_lsb(workdir):
+    """Compare the per-sample and the memory-mapped, vectorized WAV embedding."""
+    import Aud
+
+    print("== Audio LSB (Aud.lsb_hide_audio / Aud.lsb_extract_audio) ==")
+    for minutes, with_legacy in ((1, True), (10, False), (60, False)):
+        src = random_wav(os.path.join(workdir, f"audio_{minutes}min.wav"), minutes * 60)
+        out = os.path.join(workdir, f"audio_{minutes}min_out.wav")
+
+        hide_time, _ = timed(Aud.lsb_hide_audio, src, MESSAGE, out)
+        extract_time, message = timed(Aud.lsb_extract_audio, out)
+        assert message == MESSAGE
+        line = f"{minutes:>3} min  vectorized hide {hide_time:7.3f}s  extract {extract_time:7.3f}s"
+        rss = peak_rss_mb(f"import Aud; Aud.lsb_hide_audio({src!r}, {MESSAGE!r}, {out!r})")
+        line += f"  peak RSS {rss:6.1f} MB"
+
+        if with_legacy:
+            legacy_hide, _ = timed(legacy_lsb_hide_audio, src, MESSAGE, out)
+            line += f"  | legacy hide {legacy_hide:7.3f}s  | speedup {legacy_hide / hide_time:5.1f}x"
+        print(line)
+        os.remove(src)
+        os.remove(out)
+
+
+def bench_audio_formats(workdir):
+    """Embed/extract throughput per WAV sample format, with a payload filling every sample."""
+    import Aud
+
+    print("== Audio sample formats (Aud.lsb_hide_audio, full-capacity payload) ==")
+    seconds = 5 * 60
+    for (format_tag, sampwidth), name in Aud.SAMPLE_FORMATS.items():
+        src = raw_wav(os.path.join(workdir, f"format_{sampwidth}_{format_tag}.wav"), seconds, format_tag, sampwidth)
+        out = src[:-4] + "_out.wav"
+        message = bytes(Aud.capacity(src) // 8 - 64)
+        for spread in Aud.SPREAD_MODES:
+            hide_time, _ = timed(Aud.lsb_hide_audio, src, message, out, spread)
+            extract_time, extracted = timed(Aud.lsb_extract_audio, out, spread)
+            assert extracted == message
+            samples = Aud.capacity(src)
+            print(f"  {name:<20} {spread:<12} hide {samples / hide_time / 1e6:7.1f} Msamples/s"
+                  f"  extract {samples / extract_time / 1e6:7.1f} Msamples/s")
+        os.remove(src)
+        os.remove(out)
+
+
+def bench_video_frames(workdir):
+    """Frames per second of the per-frame embed/extract kernels on synthetic frame stacks."""
+    import VID
+    from Container import decode_payload
+
+    print("== Video frame kernels (VID._embed_frames / full-scan extraction) ==")
+    rng = np.random.default_rng(0)
+    for name, (height, width) in (("720p", (720, 1280)), ("1080p", (1080, 1920))):
+        stack = rng.integers(0, 256, size=(8, height, width, 3), dtype=np.uint8)
+        # A payload that fills every frame of the stack
+        bits = rng.integers(0, 2, size=stack.size, dtype=np.uint8)
+
+        embed_time, embedded = timed(lambda: list(VID._embed_frames(iter(stack), bits)))
+        extract_time, _ = timed(lambda: decode_payload(frame.reshape(-1) for frame in embedded))
+        line = (f"{name:>6}  vectorized embed {len(stack) / embed_time:8.1f} fps"
+                f"  extract {len(stack) / extract_time:8.1f} fps")
+
+        legacy_embed, _ = timed(legacy_embed_frame, stack[0].copy(), bits)
+        legacy_extract, _ = timed(legacy_extract_frame, stack[0])
+        line += f"  | legacy embed {1 / legacy_embed:6.3f} fps  extract {1 / legacy_extract:6.3f} fps"
+        print(line)
+
+
+def bench_batch(workdir):
+    """Throughput of Batch.run_batch on a CPU-bound corpus of PNG embeds."""
+    import Img
+    from Batch import run_batch
+
+    print("== Batch embedding (Batch.run_batch over Img.lsb_hide) ==")
+    sources = [random_image(os.path.join(workdir, f"batch_{i}.png"), 1000, 1000) for i in range(32)]
+    jobs = [(src, MESSAGE, src[:-4] + "_out.png") for src in sources]
+    baseline = None
+    for workers in sorted({1, 2, 4, os.cpu_count() or 1}):
+        elapsed, results = timed(lambda: list(run_batch(Img.lsb_hide, jobs, workers=workers, ordered=False)))
+        assert all(result.error is None for result in results)
+        baseline = baseline or elapsed
+        print(f"{workers:>3} workers  {len(jobs) / elapsed:7.1f} files/s  scaling {baseline / elapsed:5.2f}x")
+
+
+def bench_capacity(workdir):
+    """Header-only capacity queries against decoding the carrier to measure it."""
+    import Aud
+    import Img
+    import VID
+
+    print("== Capacity (Img/Aud/VID.capacity vs. full decode) ==")
+    png = random_image(os.path.join(workdir, "capacity.png"), 6000, 4000)
+    header_time, bits = timed(Img.capacity, png)
+    decode_time, _ = timed(lambda: np.asarray(Image.open(png))[..., :3].size)
+    print(f"  24 MP PNG     capacity {header_time * 1000:8.2f} ms  decode {decode_time * 1000:9.2f} ms  {bits} bits")
+
+    wav = random_wav(os.path.join(workdir, "capacity.wav"), 30 * 60)
+    header_time, bits = timed(Aud.capacity, wav)
+    with wave.open(wav, 'rb') as file:
+        decode_time, _ = timed(lambda: len(np.frombuffer(file.readframes(file.getnframes()), dtype=np.int16)))
+    print(f"  30 min WAV    capacity {header_time * 1000:8.2f} ms  decode {decode_time * 1000:9.2f} ms  {bits} bits")
+
+    video = os.path.join(workdir, "capacity.avi")
+    rng = np.random.default_rng(0)
+    frames = (rng.integers(0, 256, size=(720, 1280, 3), dtype=np.uint8) for _ in range(60))
+    VID.frames_to_video(frames, video, fps=30, codec="ffv1")
+    header_time, bits = timed(VID.capacity, video)
+    decode_time, _ = timed(lambda: sum(frame.size for frame in VID.video_to_frames(video)))
+    print(f"  720p 60 frame capacity {header_time * 1000:8.2f} ms  decode {decode_time * 1000:9.2f} ms  {bits} bits")
+
+
+BENCHMARKS = {
+    "image": bench_image_lsb,
+    "image-memory": bench_image_memory,
+    "image-strips": bench_image_strips,
+    "spread": bench_spread,
+    "payload": bench_payload,
+    "fec": bench_fec,
+    "depth": bench_depth,
+    "parity": bench_parity,
+    "audio": bench_audio_lsb,
+    "audio-formats": bench_audio_formats,
+    "video": bench_video_frames,
+    "batch": bench_batch,
+    "capacity": bench_capacity,
+    "html": bench_html,
+    "text": bench_text,
+    "stamp": bench_stamp,
+    "analysis": bench_analysis,
+    "cache": bench_cache,
+}
+
+
+if __name__ == "__main__":
+    warnings.simplefilter("ignore", DeprecationWarning)
+    selected = sys.argv[1:] or list(BENCHMARKS)
+    with tempfile.TemporaryDirectory() as workdir:
+        for name in selected:
+            BENCHMARKS[name](workdir)
@@ -0,0 +1,491 @@
+import queue
+import threading
+import tkinter as tk
+from tkinter import filedialog, messagebox, ttk
+
+from Progress import Cancelled
+
+POLL_INTERVAL_MS = 50  # How often the Tk thread picks up progress from the worker thread
+
+
+# Background worker shared by the carrier GUIs
+class TaskRunner:
+    def __init__(self, root):
+        self.root = root
+        self.thread = None
+        self.events = queue.Queue()  # (kind, value) messages from the worker thread
+        self.cancel_event = threading.Event()
+
+        # Progress Section
+        self.progress_bar = ttk.Progressbar(root, length=300, mode="determinate", maximum=1.0)
+        self.progress_bar.pack(pady=5)
+        self.cancel_button = tk.Button(root, text="Cancel", command=self.cancel, fg="black", bg="#00FF00",
+                                       state=tk.DISABLED)
+        self.cancel_button.pack(pady=5)
+
+    def start(self, function, args, on_success):
+        """Run function(*args, progress=...) on a worker thread and call on_success with its result."""
+        if self.thread is not None and self.thread.is_alive():
+            messagebox.showerror("Error", "Another operation is still running!")
+            return
+        self.cancel_event.clear()
+        self.progress_bar["value"] = 0
+        self.cancel_button.config(state=tk.NORMAL)
+        self.thread = threading.Thread(target=self.work, args=(function, args), daemon=True)
+        self.thread.start()
+        self.root.after(POLL_INTERVAL_MS, self.poll, on_success)
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def report(self, done, total):
+        """Progress callback, called on the worker thread between chunks."""
+        if self.cancel_event.is_set():
+            raise Cancelled()
+        self.events.put(("progress", done / total if total else 0))
+
+    def work(self, function, args):
+        try:
+            result = function(*args, progress=self.report)
+        except Cancelled:
+            self.events.put(("cancelled", None))
+        except Exception as e:
+            self.events.put(("error", e))
+        else:
+            self.events.put(("done", result))
+
+    def poll(self, on_success):
+        """Apply the worker's messages on the Tk thread; Tk widgets must not be touched from the worker."""
+        while True:
+            try:
+                kind, value = self.events.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "progress":
+                self.progress_bar["value"] = value
+                continue
+
+            self.cancel_button.config(state=tk.DISABLED)
+            if kind == "done":
+                self.progress_bar["value"] = 1.0
+                on_success(value)
+            elif kind == "error":
+                messagebox.showerror("Error", str(value))
+            else:
+                self.progress_bar["value"] = 0
+                messagebox.showinfo("Cancelled", "Operation cancelled, no file was written.")
+            return
+        self.root.after(POLL_INTERVAL_MS, self.poll, on_success)
+
+
+# Image Steganography GUI
+class ImageSteganoApp:
+    def __init__(self, root):
+        # Each window imports its engine when it opens, so one missing an optional dependency
+        # (imageio for video) does not keep the others from opening
+        import Img
+        self.engine = Img
+        self.root = root
+        self.root.title("Image Steganography Tool")
+        self.root.configure(bg="black")
+        self.file_path = ""
+
+        # Title
+        self.title_label = tk.Label(root, text="Image Steganography Tool", fg="#00FF00", bg="black",
+                                    font=("Courier", 18, "bold"))
+        self.title_label.pack(pady=10)
+
+        # File Section
+        self.file_frame = tk.Frame(root, bg="black")
+        self.file_frame.pack(pady=5)
+
+        self.file_label = tk.Label(self.file_frame, text="Image File:", fg="#00FF00", bg="black")
+        self.file_label.grid(row=0, column=0)
+        self.file_entry = tk.Entry(self.file_frame, width=40)
+        self.file_entry.grid(row=0, column=1)
+        self.file_button = tk.Button(self.file_frame, text="Browse", command=self.load_file, fg="black", bg="#00FF00")
+        self.file_button.grid(row=0, column=2)
+
+        # Message Section
+        self.msg_label = tk.Label(root, text="Secret Message:", fg="#00FF00", bg="black")
+        self.msg_label.pack()
+        self.msg_entry = tk.Text(root, height=5, width=50)
+        self.msg_entry.pack()
+
+        # Technique Selection
+        self.technique_label = tk.Label(root, text="Select Technique:", fg="#00FF00", bg="black")
+        self.technique_label.pack(pady=5)
+        self.technique_var = tk.StringVar(value="LSB")
+
+        self.lsb_rb = tk.Radiobutton(root, text="LSB", variable=self.technique_var, value="LSB", fg="#00FF00",
+                                     bg="black")
+        self.lsb_rb.pack()
+        self.parity_rb = tk.Radiobutton(root, text="Parity", variable=self.technique_var, value="PARITY", fg="#00FF00",
+                                        bg="black")
+        self.parity_rb.pack()
+
+        # Buttons
+        self.encrypt_button = tk.Button(root, text="Hide Message", command=self.encrypt, fg="black", bg="#00FF00")
+        self.encrypt_button.pack(pady=5)
+        self.decrypt_button = tk.Button(root, text="Retrieve Message", command=self.decrypt, fg="black", bg="#00FF00")
+        self.decrypt_button.pack(pady=5)
+
+        # Result Section
+        self.result_label = tk.Label(root, text="", fg="#00FF00", bg="black", font=("Courier", 12, "bold"))
+        self.result_label.pack()
+
+        # Hide and retrieve run on a worker thread so the window stays responsive
+        self.task = TaskRunner(root)
+
+    def load_file(self):
+        self.file_path = filedialog.askopenfilename(filetypes=[("PNG files", "*.png")])
+        if self.file_path:
+            self.file_entry.delete(0, tk.END)
+            self.file_entry.insert(0, self.file_path)
+
+    def encrypt(self):
+        if not self.file_path:
+            messagebox.showerror("Error", "No image file selected!")
+            return
+        message = self.msg_entry.get("1.0", tk.END).strip()
+        if not message:
+            messagebox.showerror("Error", "No secret message entered!")
+            return
+        output_path = filedialog.asksaveasfilename(defaultextension=".png", filetypes=[("PNG files", "*.png")])
+        if not output_path:
+            return
+
+        technique = self.technique_var.get()
+        if technique == "LSB":
+            self.task.start(self.engine.lsb_hide, (self.file_path, message, output_path),
+                            lambda _: messagebox.showinfo("Success", f"Message hidden successfully in {output_path}"))
+        elif technique == "PARITY":
+            self.task.start(self.engine.parity_hide, (self.file_path, message, output_path),
+                            lambda _: messagebox.showinfo(
+                                "Success", f"Message hidden successfully with parity in {output_path}"))
+
+    def decrypt(self):
+        if not self.file_path:
+            messagebox.showerror("Error", "No image file selected!")
+            return
+
+        technique = self.technique_var.get()
+        extract = self.engine.lsb_extract if technique == "LSB" else self.engine.parity_extract
+        self.task.start(extract, (self.file_path,), self.show_message)
+
+    def show_message(self, message):
+        self.result_label.config(text=f"Hidden Message: {message}")
+
+
+# Audio Steganography GUI
+class AudioSteganoApp:
+    def __init__(self, root):
+        import Aud
+        self.engine = Aud
+        self.root = root
+        self.root.title("Audio Steganography Tool")
+        self.root.configure(bg="black")
+        self.file_path = ""
+        self.message_file_path = ""
+
+        # Title
+        self.title_label = tk.Label(root, text="Audio Steganography Tool", fg="#00FF00", bg="black",
+                                    font=("Courier", 18, "bold"))
+        self.title_label.pack(pady=10)
+
+        # File Section
+        self.file_frame = tk.Frame(root, bg="black")
+        self.file_frame.pack(pady=5)
+
+        self.file_label = tk.Label(self.file_frame, text="Audio File (WAV):", fg="#00FF00", bg="black")
+        self.file_label.grid(row=0, column=0)
+        self.file_entry = tk.Entry(self.file_frame, width=40)
+        self.file_entry.grid(row=0, column=1)
+        self.file_button = tk.Button(self.file_frame, text="Browse", command=self.load_audio_file, fg="black",
+                                     bg="#00FF00")
+        self.file_button.grid(row=0, column=2)
+
+        # Message Section
+        self.message_frame = tk.Frame(root, bg="black")
+        self.message_frame.pack(pady=5)
+
+        self.message_label = tk.Label(self.message_frame, text="Select Text File for Hidden Message:", fg="#00FF00",
+                                      bg="black")
+        self.message_label.grid(row=0, column=0)
+        self.message_button = tk.Button(self.message_frame, text="Browse", command=self.load_message_file, fg="black",
+                                        bg="#00FF00")
+        self.message_button.grid(row=0, column=1)
+
+        # Buttons
+        self.encrypt_button = tk.Button(root, text="Hide Message", command=self.encrypt, fg="black", bg="#00FF00")
+        self.encrypt_button.pack(pady=5)
+        self.decrypt_button = tk.Button(root, text="Retrieve Message", command=self.decrypt, fg="black", bg="#00FF00")
+        self.decrypt_button.pack(pady=5)
+
+        # Result Section
+        self.result_label = tk.Label(root, text="", fg="#00FF00", bg="black", font=("Courier", 12, "bold"))
+        self.result_label.pack()
+
+        # Hide and retrieve run on a worker thread so the window stays responsive
+        self.task = TaskRunner(root)
+
+    def load_audio_file(self):
+        self.file_path = filedialog.askopenfilename(filetypes=[("WAV files", "*.wav")])
+        if self.file_path:
+            self.file_entry.delete(0, tk.END)
+            self.file_entry.insert(0, self.file_path)
+
+    def load_message_file(self):
+        self.message_file_path = filedialog.askopenfilename(filetypes=[("Text files", "*.txt")])
+        if self.message_file_path:
+            messagebox.showinfo("File Selected", f"Message File: {self.message_file_path}")
+
+    def encrypt(self):
+        if not self.file_path:
+            messagebox.showerror("Error", "No audio file selected!")
+            return
+        if not self.message_file_path:
+            messagebox.showerror("Error", "No message file selected!")
+            return
+
+        with open(self.message_file_path, 'r') as file:
+            message = file.read().strip()
+
+        output_path = filedialog.asksaveasfilename(defaultextension=".wav", filetypes=[("WAV", "*.wav")])
+        if not output_path:
+            return
+        self.task.start(self.engine.lsb_hide_audio, (self.file_path, message, output_path),
+                        lambda _: messagebox.showinfo("Success", f"Message hidden successfully in {output_path}"))
+
+    def decrypt(self):
+        if not self.file_path:
+            messagebox.showerror("Error", "No audio file selected!")
+            return
+
+        self.task.start(self.engine.lsb_extract_audio, (self.file_path,), self.show_message)
+
+    def show_message(self, hidden_message):
+        self.result_label.config(text=f"Hidden Message: {hidden_message}")
+
+
+# Video Steganography GUI
+class VideoSteganoApp:
+    def __init__(self, root):
+        import VID
+        self.engine = VID
+        self.root = root
+        self.root.title("Video Steganography Tool")
+        self.root.configure(bg="black")
+        self.file_path = ""
+        self.message_file_path = ""
+
+        # Title
+        self.title_label = tk.Label(root, text="Video Steganography Tool", fg="#00FF00", bg="black",
+                                    font=("Courier", 18, "bold"))
+        self.title_label.pack(pady=10)
+
+        # File Section
+        self.file_frame = tk.Frame(root, bg="black")
+        self.file_frame.pack(pady=5)
+
+        self.file_label = tk.Label(self.file_frame, text="Video File (AVI):", fg="#00FF00", bg="black")
+        self.file_label.grid(row=0, column=0)
+        self.file_entry = tk.Entry(self.file_frame, width=40)
+        self.file_entry.grid(row=0, column=1)
+        self.file_button = tk.Button(self.file_frame, text="Browse", command=self.load_video_file, fg="black",
+                                     bg="#00FF00")
+        self.file_button.grid(row=0, column=2)
+
+        # Message Section
+        self.message_frame = tk.Frame(root, bg="black")
+        self.message_frame.pack(pady=5)
+
+        self.message_label = tk.Label(self.message_frame, text="Select Text File for Hidden Message:", fg="#00FF00",
+                                      bg="black")
+        self.message_label.grid(row=0, column=0)
+        self.message_button = tk.Button(self.message_frame, text="Browse", command=self.load_message_file, fg="black",
+                                        bg="#00FF00")
+        self.message_button.grid(row=0, column=1)
+
+        # Buttons
+        self.encrypt_button = tk.Button(root, text="Hide Message", command=self.encrypt, fg="black", bg="#00FF00")
+        self.encrypt_button.pack(pady=5)
+        self.decrypt_button = tk.Button(root, text="Retrieve Message", command=self.decrypt, fg="black", bg="#00FF00")
+        self.decrypt_button.pack(pady=5)
+
+        # Result Section
+        self.result_label = tk.Label(root, text="", fg="#00FF00", bg="black", font=("Courier", 12, "bold"))
+        self.result_label.pack()
+
+        # Hide and retrieve run on a worker thread so the window stays responsive
+        self.task = TaskRunner(root)
+
+    def load_video_file(self):
+        self.file_path = filedialog.askopenfilename(filetypes=[("Video files", "*.avi")])
+        if self.file_path:
+            self.file_entry.delete(0, tk.END)
+            self.file_entry.insert(0, self.file_path)
+
+    def load_message_file(self):
+        self.message_file_path = filedialog.askopenfilename(filetypes=[("Text files", "*.txt")])
+        if self.message_file_path:
+            messagebox.showinfo("File Selected", f"Message File: {self.message_file_path}")
+
+    def encrypt(self):
+        if not self.file_path:
+            messagebox.showerror("Error", "No video file selected!")
+            return
+        if not self.message_file_path:
+            messagebox.showerror("Error", "No message file selected!")
+            return
+
+        with open(self.message_file_path, 'r') as file:
+            message = file.read().strip()
+
+        if not message:
+            messagebox.showerror("Error", "No message found in the file!")
+            return
+
+        output_path = filedialog.asksaveasfilename(defaultextension=".avi", filetypes=[("AVI", "*.avi")])
+        if not output_path:
+            return
+        self.task.start(self.engine.lsb_hide_video, (self.file_path, message, output_path),
+                        lambda _: messagebox.showinfo("Success", f"Message hidden successfully in {output_path}"))
+
+    def decrypt(self):
+        if not self.file_path:
+            messagebox.showerror("Error", "No video file selected!")
+            return
+
+        self.task.start(self.engine.lsb_extract_video, (self.file_path,), self.show_message)
+
+    def show_message(self, hidden_message):
+        self.result_label.config(text=f"Hidden Message: {hidden_message}")
+
+
+# HTML Steganography GUI
+class HTMLSteganoApp:
+    def __init__(self, root):
+        import Txt
+        self.engine = Txt
+        self.root = root
+        self.root.title("HTML Stegano Tool")
+        self.root.configure(bg="black")
+        self.html_content = ""
+        self.file_path = ""
+
+        # Title
+        self.title_label = tk.Label(root, text="HTML Steganography Tool", fg="#00FF00", bg="black", font=("Courier", 18, "bold"))
+        self.title_label.pack(pady=10)
+
+        # File Section
+        self.file_frame = tk.Frame(root, bg="black")
+        self.file_frame.pack(pady=5)
+
+        self.file_label = tk.Label(self.file_frame, text="HTML File:", fg="#00FF00", bg="black")
+        self.file_label.grid(row=0, column=0)
+        self.file_entry = tk.Entry(self.file_frame, width=40)
+        self.file_entry.grid(row=0, column=1)
+        self.file_button = tk.Button(self.file_frame, text="Browse", command=self.load_file, fg="black", bg="#00FF00")
+        self.file_button.grid(row=0, column=2)
+
+        # Message Section
+        self.msg_label = tk.Label(root, text="Secret Message:", fg="#00FF00", bg="black")
+        self.msg_label.pack()
+        self.msg_entry = tk.Text(root, height=5, width=50)
+        self.msg_entry.pack()
+
+        # Technique Selection
+        self.technique_label = tk.Label(root, text="Select Technique:", fg="#00FF00", bg="black")
+        self.technique_label.pack(pady=5)
+        self.technique_var = tk.StringVar(value="COMMENT")
+
+        self.comment_rb = tk.Radiobutton(root, text="HTML Comments", variable=self.technique_var, value="COMMENT", fg="#00FF00", bg="black")
+        self.comment_rb.pack()
+        self.invisible_rb = tk.Radiobutton(root, text="Invisible Tags", variable=self.technique_var, value="INVISIBLE", fg="#00FF00", bg="black")
+        self.invisible_rb.pack()
+        self.zero_width_rb = tk.Radiobutton(root, text="Zero-Width Characters", variable=self.technique_var, value="ZERO_WIDTH", fg="#00FF00", bg="black")
+        self.zero_width_rb.pack()
+        self.whitespace_rb = tk.Radiobutton(root, text="Trailing Whitespace", variable=self.technique_var, value="WHITESPACE", fg="#00FF00", bg="black")
+        self.whitespace_rb.pack()
+        self.homoglyph_rb = tk.Radiobutton(root, text="Homoglyphs", variable=self.technique_var, value="HOMOGLYPH", fg="#00FF00", bg="black")
+        self.homoglyph_rb.pack()
+
+        # Buttons
+        self.encrypt_button = tk.Button(root, text="Hide Message", command=self.encrypt, fg="black", bg="#00FF00")
+        self.encrypt_button.pack(pady=5)
+        self.decrypt_button = tk.Button(root, text="Retrieve Message", command=self.decrypt, fg="black", bg="#00FF00")
+        self.decrypt_button.pack(pady=5)
+
+        # Result Section
+        self.result_label = tk.Label(root, text="", fg="#00FF00", bg="black", font=("Courier", 12, "bold"))
+        self.result_label.pack()
+
+    def load_file(self):
+        self.file_path = filedialog.askopenfilename(filetypes=[("HTML files", "*.html")])
+        if self.file_path:
+            self.file_entry.delete(0, tk.END)
+            self.file_entry.insert(0, self.file_path)
+            # Zero-width characters and look-alike letters need UTF-8; line endings are kept for whitespace
+            with open(self.file_path, 'r', encoding="utf-8", newline="") as file:
+                self.html_content = file.read()
+
+    def save_file(self, content):
+        save_path = filedialog.asksaveasfilename(defaultextension=".html", filetypes=[("HTML files", "*.html")])
+        if save_path:
+            with open(save_path, 'w', encoding="utf-8", newline="") as file:
+                file.write(content)
+            messagebox.showinfo("Success", f"File saved at: {save_path}")
+
+    def encrypt(self):
+        if not self.html_content:
+            messagebox.showerror("Error", "No HTML file loaded!")
+            return
+        secret_message = self.msg_entry.get("1.0", tk.END).strip()
+        if not secret_message:
+            messagebox.showerror("Error", "No secret message entered!")
+            return
+
+        technique = self.technique_var.get()
+        if technique == "COMMENT":
+            stego_html = self.engine.comment_insert(self.html_content, secret_message)
+        elif technique == "INVISIBLE":
+            stego_html = self.engine.invisible_tag_insert(self.html_content, secret_message)
+        elif technique == "ZERO_WIDTH":
+            stego_html = self.engine.zero_width_insert(self.html_content, secret_message)
+        elif technique == "WHITESPACE":
+            stego_html = self.engine.whitespace_insert(self.html_content, secret_message)
+        elif technique == "HOMOGLYPH":
+            try:
+                stego_html = self.engine.homoglyph_insert(self.html_content, secret_message)
+            except ValueError as error:
+                messagebox.showerror("Error", str(error))
+                return
+        else:
+            messagebox.showerror("Error", "Invalid technique selected!")
+            return
+
+        self.save_file(stego_html)
+        self.result_label.config(text="Message hidden successfully!")
+
+    def decrypt(self):
+        if not self.html_content:
+            messagebox.showerror("Error", "No HTML file loaded!")
+            return
+
+        technique = self.technique_var.get()
+        if technique == "COMMENT":
+            secret_message = self.engine.comment_extract(self.html_content)
+        elif technique == "INVISIBLE":
+            secret_message = self.engine.invisible_tag_extract(self.html_content)
+        elif technique == "ZERO_WIDTH":
+            secret_message = self.engine.zero_width_extract(self.html_content)
+        elif technique == "WHITESPACE":
+            secret_message = self.engine.whitespace_extract(self.html_content)
+        elif technique == "HOMOGLYPH":
+            secret_message = self.engine.homoglyph_extract(self.html_content)
+        else:
+            messagebox.showerror("Error", "Invalid technique selected!")
+            return
+
+        self.result_label.config(text=f"Hidden Message: {secret_message}")
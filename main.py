@@ -1,6 +1,7 @@
 import tkinter as tk
 from tkinter import messagebox
-import subprocess
+
+from gui import ImageSteganoApp, AudioSteganoApp, VideoSteganoApp, HTMLSteganoApp
 
 class StegToolsGUI:
     def __init__(self, root):
@@ -26,33 +27,28 @@ class StegToolsGUI:
         self.text_button = tk.Button(root, text="Text Steganography", command=self.text_tool, fg="black", bg="#00FF00", font=("Courier", 12))
         self.text_button.pack(pady=10)
 
-    def audio_tool(self):
-        """Runs the audio steganography tool."""
+    def open_tool(self, app_class, name):
+        """Opens a steganography tool in its own window."""
         try:
-            subprocess.run(["python", "aud.py"])
+            app_class(tk.Toplevel(self.root))
         except Exception as e:
-            messagebox.showerror("Error", f"Error running audio tool: {e}")
+            messagebox.showerror("Error", f"Error running {name} tool: {e}")
+
+    def audio_tool(self):
+        """Runs the audio steganography tool."""
+        self.open_tool(AudioSteganoApp, "audio")
 
     def video_tool(self):
         """Runs the video steganography tool."""
-        try:
-            subprocess.run(["python", "vd.py"])
-        except Exception as e:
-            messagebox.showerror("Error", f"Error running video tool: {e}")
+        self.open_tool(VideoSteganoApp, "video")
 
     def image_tool(self):
         """Runs the image steganography tool."""
-        try:
-            subprocess.run(["python", "img.py"])
-        except Exception as e:
-            messagebox.showerror("Error", f"Error running image tool: {e}")
+        self.open_tool(ImageSteganoApp, "image")
 
     def text_tool(self):
         """Runs the text steganography tool."""
-        try:
-            subprocess.run(["python", "txt.py"])
-        except Exception as e:
-            messagebox.showerror("Error", f"Error running text tool: {e}")
+        self.open_tool(HTMLSteganoApp, "text")
 
 if __name__ == "__main__":
     root = tk.Tk()
@@ -0,0 +1,334 @@
+"""Headless command-line interface for the steganography tools.
+
+    python stegtool.py hide -m "secret" photos/*.png --output-dir out/
+    python stegtool.py extract out/
+    python stegtool.py capacity --carrier audio recordings/
+    python stegtool.py analyze -j 0 incoming/
+    python stegtool.py stamp -m "build 42" site/ --output-dir public/
+
+Carrier modules are only imported once a file of that type is processed, so
+starting the CLI does not load tkinter, PIL, imageio or numpy.
+"""
+import argparse
+import glob
+import importlib
+import os
+import sys
+
+from Batch import run_batch
+
+# Carrier type -> implementing module, recognised extensions, output extension and
+# the (hide, extract) function names of each method. The first method is the default.
+CARRIERS = {
+    "image": {
+        "module": "Img",
+        "extensions": (".png", ".bmp", ".tif", ".tiff"),
+        "output_extension": ".png",
+        "methods": {"lsb": ("lsb_hide", "lsb_extract"), "parity": ("parity_hide", "parity_extract")},
+    },
+    "audio": {
+        "module": "Aud",
+        "extensions": (".wav",),
+        "output_extension": ".wav",
+        "methods": {"lsb": ("lsb_hide_audio", "lsb_extract_audio")},
+    },
+    "video": {
+        "module": "VID",
+        "extensions": (".avi", ".mp4", ".mkv", ".mov"),
+        "output_extension": ".avi",  # stego video is always written with a lossless codec
+        "methods": {"lsb": ("lsb_hide_video", "lsb_extract_video")},
+    },
+    "html": {
+        "module": "Txt",
+        "extensions": (".html", ".htm"),
+        "output_extension": ".html",
+        "methods": {
+            "comment": ("comment_insert_file", "comment_extract_file"),
+            "invisible": ("invisible_tag_insert_file", "invisible_tag_extract_file"),
+            "zero-width": ("zero_width_insert_file", "zero_width_extract_file"),
+            "whitespace": ("whitespace_insert_file", "whitespace_extract_file"),
+            "homoglyph": ("homoglyph_insert_file", "homoglyph_extract_file"),
+        },
+    },
+}
+# Functions that take the stamp an insert function returned back out of an HTML file
+STAMP_REMOVE = {"comment": "text_remove_file", "invisible": "text_remove_file", "zero-width": "text_remove_file",
+                "homoglyph": "homoglyph_remove_file"}
+
+
+def detect_carrier(path):
+    """Return the carrier type for a file extension, or None if it is not supported."""
+    extension = os.path.splitext(path)[1].lower()
+    for carrier, spec in CARRIERS.items():
+        if extension in spec["extensions"]:
+            return carrier
+    return None
+
+
+def expand_paths(patterns, carrier=None):
+    """Expand files, directories (recursively) and glob patterns into (path, carrier) pairs."""
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            for dirpath, dirnames, filenames in os.walk(pattern):
+                dirnames.sort()
+                for filename in sorted(filenames):
+                    path = os.path.join(dirpath, filename)
+                    detected = detect_carrier(path)
+                    # Only pick up files of the requested carrier type from directories
+                    if detected and carrier in (None, detected):
+                        yield path, detected
+            continue
+
+        matches = sorted(glob.glob(pattern, recursive=True)) if glob.has_magic(pattern) else [pattern]
+        for path in matches:
+            yield path, carrier or detect_carrier(path)
+
+
+def load_function(carrier, name):
+    """Import the carrier module on first use and return one of its functions."""
+    module = importlib.import_module(CARRIERS[carrier]["module"])
+    return getattr(module, name)
+
+
+def carrier_method(carrier, method):
+    """Return the method name to use for a carrier, defaulting to its first method."""
+    methods = CARRIERS[carrier]["methods"]
+    if method is None:
+        return next(iter(methods))
+    if method not in methods:
+        raise ValueError(f"{carrier} carriers support the methods: {', '.join(methods)}")
+    return method
+
+
+def output_path_for(path, carrier, args):
+    """Build the output file name for a stego copy of path."""
+    if args.output:
+        return args.output
+    stem = os.path.splitext(os.path.basename(path))[0]
+    directory = args.output_dir or os.path.dirname(path)
+    return os.path.join(directory, stem + args.suffix + CARRIERS[carrier]["output_extension"])
+
+
+def check_options(carrier, method, key=None, fec=None, depth=1):
+    """Reject options the carrier or method cannot use: html payloads are not bits in carrier values."""
+    if carrier == "html":
+        for option, value in (("--key", key), ("--fec", fec), ("--depth", depth != 1 or None)):
+            if value is not None:
+                raise ValueError(f"html carriers do not support {option}")
+    if depth != 1 and method != "lsb":
+        raise ValueError("--depth only applies to the lsb method")
+
+
+def hide_file(path, carrier, method, message, output_path, key=None, passphrase=None, fec=None, depth=1):
+    """Hide message in one carrier file with the optional key, passphrase, error correction and depth."""
+    check_options(carrier, method, key, fec, depth)
+    hide = load_function(carrier, CARRIERS[carrier]["methods"][method][0])
+    if carrier == "html":
+        if isinstance(message, bytes):
+            message = message.decode("utf-8")
+        hide(path, message, output_path, passphrase=passphrase)
+    else:
+        options = {"depth": depth} if depth != 1 else {}
+        hide(path, message, output_path, key=key, passphrase=passphrase, fec=fec, **options)
+
+
+def extract_file(path, carrier, method, key=None, passphrase=None):
+    """Extract the hidden message from one carrier file; the depth is read from the payload header."""
+    check_options(carrier, method, key)
+    extract = load_function(carrier, CARRIERS[carrier]["methods"][method][1])
+    if carrier == "html":
+        return extract(path, passphrase=passphrase)
+    return extract(path, key=key, passphrase=passphrase)
+
+
+def file_capacity(path, carrier, method, depth=1):
+    """Return the payload capacity of one carrier file in bytes at depth bits per value, or None if unbounded."""
+    check_options(carrier, method, depth=depth)
+    if carrier == "html":
+        return None
+    carrier_bits = load_function(carrier, "capacity")(path, method)
+    from Container import payload_capacity
+
+    return payload_capacity(carrier_bits * depth)
+
+
+def analyze_carrier(path, carrier):
+    """Return the steganalysis scores of one image or audio file as a report line."""
+    if carrier not in ("image", "audio"):
+        raise ValueError("only image and audio carriers can be analysed")
+    from Analysis import analyze_file
+
+    scores = analyze_file(path)
+    rates = "  ".join(f"{name} {'n/a' if scores[name] is None else format(scores[name], '.3f')}"
+                      for name in ("rs", "spa"))
+    return (f"chi-square {scores['chi_square']:.3f} (first {scores['chi_square_extent']:.0%})  {rates}  "
+            f"{'suspicious' if scores['suspicious'] else 'clean'}")
+
+
+def read_message(args):
+    """Return the message given on the command line or read from --message-file."""
+    if args.message is not None:
+        return args.message
+    with open(args.message_file, 'rb') as file:
+        return file.read()
+
+
+def write_payload(path, message, output_dir):
+    """Save an extracted payload to output_dir, as .txt for text and .bin for bytes."""
+    stem = os.path.splitext(os.path.basename(path))[0]
+    extension = ".bin" if isinstance(message, bytes) else ".txt"
+    output_path = os.path.join(output_dir, stem + extension)
+    with open(output_path, 'wb') as file:
+        file.write(message if isinstance(message, bytes) else message.encode("utf-8"))
+    return output_path
+
+
+def process_file(args, message, path, carrier):
+    """Apply the selected command to one file and return the line to report for it."""
+    if carrier is None:
+        raise ValueError("unsupported file type, use --carrier to choose one")
+    if args.command == "hide":
+        output_path = output_path_for(path, carrier, args)
+        hide_file(path, carrier, carrier_method(carrier, args.method), message, output_path, args.key,
+                  args.passphrase, args.fec, args.depth)
+        return f"hidden in {output_path}"
+    if args.command == "extract":
+        result = extract_file(path, carrier, carrier_method(carrier, args.method), args.key, args.passphrase)
+        if args.output_dir:
+            return f"saved to {write_payload(path, result, args.output_dir)}"
+        return result
+    if args.command == "analyze":
+        return analyze_carrier(path, carrier)
+    size = file_capacity(path, carrier, carrier_method(carrier, args.method), args.depth)
+    return "unlimited" if size is None else f"{size} bytes"
+
+
+def run_stamp(args):
+    """Stamp the changed HTML files of a directory tree and return the exit status."""
+    from Stamp import stamp_tree
+
+    if not os.path.isdir(args.source):
+        print(f"{args.source}: not a directory", file=sys.stderr)
+        return 1
+    message = read_message(args)
+    if isinstance(message, bytes):
+        message = message.decode("utf-8")
+    method = carrier_method("html", args.method)
+    insert = load_function("html", CARRIERS["html"]["methods"][method][0])
+    # Every remover is loaded, as an earlier run may have used another method
+    removers = {name: load_function("html", function) for name, function in STAMP_REMOVE.items()}
+
+    counts = {"stamped": 0, "unchanged": 0}
+    failures = 0
+    for result in stamp_tree(args.source, message, insert, method, args.output_dir, args.passphrase,
+                             args.manifest, args.workers or None, removers):
+        if result.error is not None:
+            failures += 1
+            print(f"{result.path}: error: {result.error}", file=sys.stderr)
+            continue
+        counts[result.status] += 1
+        if result.status == "stamped" or args.verbose:
+            print(f"{result.path}: {result.status}")
+    print(f"{counts['stamped']} stamped, {counts['unchanged']} unchanged, {failures} failed")
+    return 1 if failures else 0
+
+
+def run(args):
+    """Apply the selected command to every input file and return the exit status."""
+    if args.command == "stamp":
+        return run_stamp(args)
+    files = list(expand_paths(args.paths, args.carrier))
+    if not files:
+        print("No carrier files found.", file=sys.stderr)
+        return 1
+    if getattr(args, "output", None) and len(files) > 1:
+        print("--output can only be used with a single input file; use --output-dir.", file=sys.stderr)
+        return 1
+    if getattr(args, "output_dir", None):
+        os.makedirs(args.output_dir, exist_ok=True)
+
+    message = read_message(args) if args.command == "hide" else None
+    jobs = ((args, message, path, carrier) for path, carrier in files)
+
+    failures = 0
+    for result in run_batch(process_file, jobs, workers=args.workers, ordered=not args.unordered):
+        path = result.job[2]
+        if result.error is None:
+            print(f"{path}: {result.value}")
+        else:
+            failures += 1
+            print(f"{path}: error: {result.error}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+def build_parser():
+    """Create the argument parser for the hide, extract and capacity commands."""
+    parser = argparse.ArgumentParser(prog="stegtool", description="Hide and extract messages in image, "
+                                     "audio, video and HTML files.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def add_inputs(command):
+        command.add_argument("paths", nargs="+", help="carrier files, directories or glob patterns")
+        command.add_argument("-c", "--carrier", choices=CARRIERS, help="carrier type (default: from the extension)")
+        command.add_argument("-j", "--workers", type=int, default=1,
+                             help="worker processes, 0 for one per CPU (default: 1)")
+        command.add_argument("--unordered", action="store_true",
+                             help="report files as they finish instead of in input order")
+
+    hide = commands.add_parser("hide", help="hide a message in carrier files")
+    add_inputs(hide)
+    source = hide.add_mutually_exclusive_group(required=True)
+    source.add_argument("-m", "--message", help="message text")
+    source.add_argument("-f", "--message-file", help="file whose bytes are hidden")
+    hide.add_argument("--method", help="lsb or parity for images; comment, invisible, zero-width, whitespace or homoglyph for HTML")
+    hide.add_argument("-o", "--output", help="output file (single input only)")
+    hide.add_argument("-d", "--output-dir", help="directory for the stego files (default: next to the input)")
+    hide.add_argument("-s", "--suffix", default="_stego", help="suffix added to output file names")
+    hide.add_argument("-k", "--key", help="spread the message over the carrier at positions chosen by this key")
+    hide.add_argument("-p", "--passphrase", help="encrypt and authenticate the message with this passphrase")
+    hide.add_argument("--fec", type=int, metavar="BYTES",
+                      help="add BYTES error correction bytes per 255-byte block, repairing up to BYTES/2 "
+                      "damaged bytes each (extraction detects it)")
+    hide.add_argument("--depth", type=int, choices=range(1, 5), default=1,
+                      help="low bits per carrier value used by the lsb method (default: 1)")
+
+    extract = commands.add_parser("extract", help="extract hidden messages from carrier files")
+    add_inputs(extract)
+    extract.add_argument("--method", help="lsb or parity for images; comment, invisible, zero-width, whitespace or homoglyph for HTML")
+    extract.add_argument("-d", "--output-dir", help="save each payload to a file instead of printing it")
+    extract.add_argument("-k", "--key", help="key the message was hidden with")
+    extract.add_argument("-p", "--passphrase", help="passphrase the message was encrypted with")
+
+    capacity = commands.add_parser("capacity", help="report how many payload bytes each carrier can hold")
+    add_inputs(capacity)
+    capacity.add_argument("--method", help="lsb or parity for images")
+    capacity.add_argument("--depth", type=int, choices=range(1, 5), default=1,
+                          help="low bits per carrier value, as for hide (default: 1)")
+
+    analyze = commands.add_parser("analyze", help="score image and audio files for hidden LSB content "
+                                  "(chi-square, RS and sample pair analysis)")
+    add_inputs(analyze)
+
+    stamp = commands.add_parser("stamp", help="hide a message in every HTML file of a directory tree, "
+                                "skipping files unchanged since the last run")
+    stamp.add_argument("source", help="directory tree of HTML files")
+    source = stamp.add_mutually_exclusive_group(required=True)
+    source.add_argument("-m", "--message", help="message text")
+    source.add_argument("-f", "--message-file", help="file whose UTF-8 text is hidden")
+    stamp.add_argument("--method", help="comment, invisible, zero-width, whitespace or homoglyph (default: comment)")
+    stamp.add_argument("-d", "--output-dir", help="directory for the stamped tree (default: stamp in place)")
+    stamp.add_argument("-p", "--passphrase", help="encrypt and authenticate the message with this passphrase")
+    stamp.add_argument("--manifest", help="manifest of stamped files (default: .stamp-manifest.json in the "
+                       "output directory)")
+    stamp.add_argument("-j", "--workers", type=int, default=0,
+                       help="worker threads, 0 for the number of CPUs + 4 (default: 0)")
+    stamp.add_argument("-v", "--verbose", action="store_true", help="also list the unchanged files")
+    return parser
+
+
+def main(argv=None):
+    return run(build_parser().parse_args(argv))
+
+
+if __name__ == "__main__":
+    sys.exit(main())